@@ -104,9 +104,13 @@ def send(emails, mta, report_progress=True,
     ...Values are either strings or lists of strings;
     in the latter case the values are converted into a single
     comma separated string.
+    <emails> can be any iterable (such as pipeline.email_source.)
     """
     counter = 0
-    n_emails = len(emails)
+    try:
+        n_emails = len(emails)
+    except TypeError:  # a generator: number not known in advance.
+        n_emails = '?'
     ret = []
     if mta != 'clubg':
         response = input(
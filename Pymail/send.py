@@ -213,8 +213,12 @@ def send(emails, mta, report_progress=True,
     ...Values are either strings or lists of strings;
     in the latter case the values are converted into a single
     comma separated string.
+    <emails> can be any iterable (such as pipeline.email_source.)
     """
-    n_emails = len(emails)
+    try:
+        n_emails = len(emails)
+    except TypeError:  # a generator: number not known in advance.
+        n_emails = '?'
     counter = 0
     print("Using {} as MTA...".format(mta))
     server = config.config[mta]
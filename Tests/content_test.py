@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# File: Tests/content_test.py
+
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import helpers
+import content
+
+record = dict(
+    first="Jane",
+    last="Doe",
+    address="nnn An Ave.",
+    town="Any Town",
+    postal_code="CODE",
+    state="CA",
+    country="USA",
+    email="myemail@provider.com",
+    dues=100,
+    extra="A lot more junk:\nCertainly nothing very serious!",
+    )
+
+
+def test_template_matches_str_format():
+    which = content.content_types["for_testing"]
+    lpr = content.printers["X6505_e1"]
+    letter = content.prepare_letter_template(which, lpr)
+    email = content.prepare_email_template(which)
+    assert (content.Template(letter, lpr["indent"]).render(record) ==
+            helpers.indent(letter.format(**record), lpr["indent"]))
+    assert content.Template(email).format(**record) == (
+        email.format(**record))
+    template = "{{x}} {dues:>5} {last!r}\n{extra}"
+    assert content.Template(template, 2).render(record) == (
+        helpers.indent(template.format(**record), 2))
+
+
+def test_template_variables():
+    which = content.content_types["for_testing"]
+    email = content.Template(content.prepare_email_template(which))
+    variables = email.variables(record)
+    assert set(variables) <= set(record)
+    assert email.text.format(**variables) == email.render(record)
+    template = content.Template("{{x}} {dues:>5} {last!r} {last}")
+    assert template.names == ("dues", "last")
+
+
+def test_compile_template(tmp_path, monkeypatch):
+    templates_file = str(tmp_path / "templates.pickle")
+    monkeypatch.setattr(content, "_templates", None)
+    template = content.compile_template("Dear {first},", 3,
+                                        templates_file)
+    assert template.render(record) == "   Dear Jane,"
+    monkeypatch.setattr(content, "_templates", None)
+    assert content.compile_template(
+        "Dear {first},", 3, templates_file).literals == template.literals
+    assert os.path.exists(templates_file)
@@ -6,6 +6,12 @@
 Have so far written tests for:
     parse_applicant_data_line
     parse_sponsor_data_line
+    ck_applicants
+    projected_records
+    GroupIndex
+    parse_lines (applicants, sponsors and extra fees)
+    get_extra_fees
+    ApplicantTimeline
 """
 
 # Must first add the parent directory of the
@@ -72,3 +78,146 @@ def test_parse_applicant_data_line(line, expected):
 ])
 def test_parse_sponsor_data_line(line, expected):
     assert data.parse_sponsor_data_line(line) == expected
+
+
+def test_ck_applicants_leaves_ms_by_status_as_is():
+    club = data.Club()
+    club.ms_by_status = {'a1': ['Doe, John'], 'm': ['Roe, Jane']}
+    report = data.ck_applicants(club, {'applicants': {'a1': ['Doe, John']}},
+                                False)
+    assert report == dict(ok=["No applicant problem."])
+    assert club.ms_by_status == {'a1': ['Doe, John'], 'm': ['Roe, Jane']}
+
+
+def test_email_checks_report_addresses_as_found():
+    club = data.Club()
+    club.MEMBER_GROUP = 'LIST'
+    club.email_by_m = {'Doe, John': 'John.Doe+club@Gmail.com',
+                       'Roe, Jane': 'jane@x.org'}
+    club.ms_by_email = {'johndoe@gmail.com': ['Doe, John'],
+                        'jane@x.org': ['Roe, Jane']}
+    club.member_with_email_set = {'Doe, John', 'Roe, Jane'}
+    club.gmail_by_name = {'John Doe': 'johndoe@gmail.com',
+                          'Old Friend': 'Old.Friend@X.org'}
+    club.g_by_group = {'LIST': {'John Doe', 'Old Friend'}}
+    missing = data.ck_emails_missing_from_contacts(club, {}, False)
+    assert 'Roe, Jane: jane@x.org' in missing['problems']
+    assert not any('John' in line for line in missing['problems'])
+    non_members = data.ck_non_member_contacts(club, {}, False)
+    assert 'Old Friend: Old.Friend@X.org' in non_members['problems']
+
+
+def test_projected_records():
+    import io
+    contacts = io.StringIO(
+        "Name,Given Name,Additional Name,Family Name,Yomi,Name Suffix,"
+        + "E-mail 1 - Value,Group Membership\n"
+        + "John Doe,John,,Doe,,,jd@x.org,LIST ::: * myContacts\n"
+        + "\n"
+        + "Ann Loe,Ann\n")
+    records = list(data.projected_records(contacts,
+                                          data.CONTACTS_FIELDS))
+    assert len(records) == 2
+    assert records[0]["E-mail 1 - Value"] == 'jd@x.org'
+    assert set(records[0].keys()) == set(data.CONTACTS_FIELDS)
+    assert records[1]["Family Name"] == ''
+    g_rec = data.get_gmail_record(records[0])
+    assert g_rec['gname'] == 'Doe, John'
+    assert g_rec['groups'] == {'LIST'}
+    with pytest.raises(ValueError, match="Group Membership"):
+        list(data.projected_records(io.StringIO("Given Name\n"),
+                                    data.CONTACTS_FIELDS))
+
+
+def test_group_index():
+    index = data.GroupIndex()
+    index.add('Doe, John', {'LIST', 'Kayak'})
+    index.add('Roe, Jane', {'LIST'})
+    index.add('Poe, Ed', {'applicant'})
+    assert index['LIST'] == {'Doe, John', 'Roe, Jane'}
+    assert sorted(index) == ['Kayak', 'LIST', 'applicant']
+    both = index.group_bits('LIST') & index.group_bits('Kayak')
+    assert index.names_in(both) == {'Doe, John'}
+    assert index.count(index.group_bits('LIST')) == 2
+    members = {'Doe, John', 'Loe, Al', 'Poe, Ed'}
+    assert index.check_sets('LIST', members, 'in 1st', 'in 2nd') == (
+        data.helpers.check_sets(index['LIST'], members,
+                                'in 1st', 'in 2nd'))
+
+
+def test_parse_spots_collects_errors(tmp_path):
+    applicants = tmp_path / "applicants.txt"
+    applicants.write_text(
+        "# comment\n"
+        "Ann Loe | 200727 | 200727 | 201002 |\n"
+        "Bob | 200727 |\n"
+        "Ed Poe | 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8 | 9 |\n")
+    sponsors = tmp_path / "sponsors.txt"
+    sponsors.write_text("Ann Loe: Jane Doe,John Roe\nno sponsors\n")
+    fees = tmp_path / "extra_fees.txt"
+    fees.write_text("Jane Doe: 70\nKayak Fees:\nJane Doe: 70\n"
+                    "Dock:\nJohn Roe: lots\n")
+    errors = []
+    entries = list(data.parse_lines(str(applicants),
+                                    data.parse_applicant_line, errors))
+    assert entries == [data.ApplicantEntry("Loe, Ann", "a1",
+                                           ("201002",))]
+    assert [error.line_number for error in errors] == [3, 4]
+    errors = []
+    assert data.get_applicant_data(str(applicants), errors=errors) == {
+        "Loe, Ann": {"status": "a1", "dates": ("201002",)}}
+    assert data.get_sponsor_data(str(sponsors), errors) == {
+        "Loe, Ann": ("Jane Doe", "John Roe")}
+    assert list(data.parse_fee_lines(str(fees))) == [
+        data.FeeEntry("Doe, Jane", "Kayak", 70)]
+    data.get_extra_fees(str(fees), str(tmp_path / "compiled.json"),
+                        errors)
+    assert [(error.spot, error.line_number) for error in errors] == [
+        (str(applicants), 3), (str(applicants), 4),
+        (str(sponsors), 2), (str(fees), 1), (str(fees), 5)]
+    data._extra_fees.clear()  # Now from the compiled file...
+    errors = []
+    data.get_extra_fees(str(fees), str(tmp_path / "compiled.json"),
+                        errors)
+    assert [error.line_number for error in errors] == [1, 5]
+
+
+def test_get_extra_fees(tmp_path, monkeypatch):
+    fees = tmp_path / "extra_fees.txt"
+    fees.write_text("Kayak:\nJane Doe: 70\nDock:\nJane Doe: 75\n"
+                    "John Roe: 75\nMooring:\n")
+    compiled = str(tmp_path / "extra_fees.compiled.json")
+    extra_fees = data.get_extra_fees(str(fees), compiled)
+    assert extra_fees[rbc.Club.NAME_KEY] == {
+        "Doe, Jane": [("Kayak", 70), ("Dock", 75)],
+        "Roe, John": [("Dock", 75)]}
+    assert extra_fees.by_category["Mooring"] == []
+    assert data.get_extra_fees(str(fees), compiled) is extra_fees
+    data._extra_fees.clear()
+    monkeypatch.setattr(data, "parse_fee_lines", None)  # Not to be used.
+    assert data.get_extra_fees(str(fees), compiled) == extra_fees
+    by_name = tmp_path / "by_name.json"  # eg: by extra_charges -j
+    by_name.write_text('{"Doe, John": [["Kayak", 70]]}')
+    data._extra_fees.clear()
+    monkeypatch.undo()
+    assert data.get_extra_fees(str(fees), str(by_name)) == extra_fees
+    assert by_name.read_text() == '{"Doe, John": [["Kayak", 70]]}'
+
+
+def test_applicant_timeline(tmp_path):
+    import datetime
+    applicants = tmp_path / "applicants.txt"
+    applicants.write_text(
+        "Ann Loe  | 200101 | 200101 | 200207 | 200306 |\n"
+        "Bob Noe  | 200101 | 200102 |\n"
+        "Ed Poe   | 190101 | 190101 | 190201 | 190301 | 190401 |"
+        + " 190501 | 190601 |\n"
+        "Al Roe   | 200101 | 200101 | 200207 | Application expired.\n")
+    timeline = data.get_applicant_timeline(str(applicants))
+    assert timeline.active() == ["Loe, Ann", "Noe, Bob"]
+    assert timeline.meetings("Loe, Ann") == (datetime.date(2020, 2, 7),
+                                             datetime.date(2020, 3, 6))
+    may = datetime.date(2020, 5, 1)
+    assert timeline.stalled(days=90, as_of=may) == ["Noe, Bob"]
+    assert data.get_meeting_dates(str(applicants)) == {
+        "Loe, Ann": "2020-02-07, 2020-03-06", "Noe, Bob": ""}
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+# File: Tests/database_test.py
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import database
+import member
+import rbc
+import pytest
+
+csv_text = (
+    "first,last,phone,address,town,state,postal_code," +
+    "country,email,dues,dock,kayak,mooring,status\n" +
+    "Jane,Doe,555-1212,PO Box 1,Bolinas,CA,94924,USA,jd@x.com," +
+    "100,,75,,\n" +
+    'John,Roe,,"PO Box 2, Unit 3",Bolinas,CA,94924,USA,,0,75,,114,' +
+    "a2|be\n" +
+    "Joe,Soe,,PO Box 3,Bolinas,CA,94924,USA,js@x.com,,,,,a2,extra\n" +
+    "Short,Row\n")
+
+
+@pytest.fixture
+def files(tmp_path):
+    csv_file = tmp_path / "memlist.csv"
+    csv_file.write_text(csv_text)
+    db_file = str(tmp_path / "memlist.db")
+    database.import_csv(str(csv_file), db_file)
+    return str(csv_file), db_file
+
+
+def test_export_is_lossless(files, tmp_path):
+    csv_file, db_file = files
+    exported = tmp_path / "exported.csv"
+    database.export_csv(db_file, str(exported))
+    assert exported.read_text() == csv_text
+
+
+def test_traverse_records_against_database(files):
+    csv_file, db_file = files
+    funcs = [member.add2malformed, member.get_payables,
+             member.add2ms_by_status]
+    from_csv = rbc.Club()
+    member.traverse_records(csv_file, funcs, from_csv)
+    from_db = rbc.Club()
+    member.traverse_records(db_file, funcs, from_db)
+    for name in ("fieldnames", "malformed", "still_owing",
+                 "ms_by_status"):
+        assert getattr(from_db, name) == getattr(from_csv, name)
+
+
+def test_indexed_queries(files):
+    csv_file, db_file = files
+    assert database.owing(db_file, 'dock') == [("Roe", "John", 75)]
+    assert database.with_status(db_file, 'a2') == [("Roe", "John"),
+                                                   ("Soe", "Joe")]
+    assert database.with_email(db_file, 'jd@x.com') == [("Doe", "Jane")]
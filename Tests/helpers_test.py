@@ -247,3 +247,32 @@ if __name__ == '__main__':
     assert helpers.get_datestamp(date_obj) == expected
     print(
     "'assert helpers.get_datestamp(date_obj) == expected' passes")
+
+
+def test_keyed_diff():
+    left = {'Doe, John': [('Dock', 75), ('Kayak', 70)],
+            'Roe, Jane': [('Mooring', 200)],
+            'Poe, Ed': [('Kayak', 70)]}
+    right = {'Doe, John': [('Kayak', 70), ('Dock', 50)],
+             'Roe, Jane': [('Mooring', 200)],
+             'Loe, Al': [('Dock', 75)]}
+    assert helpers.keyed_diff(left, right) == {
+        "missing_left": ['Loe, Al'],
+        "missing_right": ['Poe, Ed'],
+        "changed": [{"key": 'Doe, John',
+                     "fields": {'Dock': [75, 50]}}],
+        }
+    assert not any(helpers.keyed_diff(
+        {'a': [('Dock', 1), ('Kayak', 2)]},
+        {'a': [('Kayak', 2), ('Dock', 1)]}).values())
+
+
+def test_keyed_diff_with_key():
+    left = [{'name': 'a', 'email': 'a@x'}, {'name': 'b', 'email': 'b@x'}]
+    right = [{'name': 'b', 'email': 'b@y'}]
+    diff = helpers.keyed_diff(left, right, key=lambda rec: rec['name'])
+    assert diff["missing_right"] == ['a']
+    assert diff["changed"] == [
+        {"key": 'b', "fields": {'email': ['b@x', 'b@y']}}]
+    assert helpers.diff_lines(diff) == [
+        "In left but not right:", "    a", "b: email: b@x != b@y"]
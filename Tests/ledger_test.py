@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# File: Tests/ledger_test.py
+
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import ledger
+
+
+def entry(payer, amount, category=''):
+    return "{:<23}{:>5} {}".format(payer, amount, category).rstrip()
+
+
+RECEIPTS = "\n".join((
+    "Date: Jan 3, 2021",
+    entry("Jane Doe", 100, "dues"),
+    entry("John Roe", 75, "dock"),
+    "{:<24}---".format(''),
+    "Date: Feb 7, 2021",
+    entry("Ann Loe", 12500, "mooring"),
+    entry("Ed Poe", -70, "kayak"),
+    )) + "\n"
+
+
+def test_parse_receipt_line():
+    assert ledger.parse_receipt_line(
+        entry("Jane Doe", 100, "dues"), "Date: x") == (
+            ledger.ReceiptEntry("Date: x", "Jane Doe", "dues", 100))
+    assert ledger.parse_receipt_line("Jane Doe  100") is None
+    assert ledger.parse_receipt_line(
+        "{:<23}{}".format("Ann Loe", 123456))[3] == 123456
+    assert ledger.parse_receipt_line(  # right aligned to column 27
+        "{:<17}{:>11} {}".format("Fay Fox", 123456, "dues")) == (
+            ledger.ReceiptEntry("", "Fay Fox", "dues", 123456))
+    assert ledger.parse_receipt_line(
+        "{:<17}{:>11}".format("Fay Fox", -1234567))[3] == -1234567
+    assert ledger.parse_receipt_line("Jane Doe 2             ") is None
+
+
+def test_ledger(tmp_path):
+    receipts = tmp_path / "receipts.txt"
+    receipts.write_text(RECEIPTS)
+    checkpoint = str(tmp_path / "ledger.pickle")
+    first = ledger.get_ledger(str(receipts), checkpoint)
+    assert first.report() == [
+        "Fees taken in to date:",
+        ledger.subtotal_line(175),
+        ledger.subtotal_line(12430),
+        "\nGrand Total to Date:    --- ---- {:>10}".format(
+            "$12,605.00")]
+    assert first.by_category["mooring"] == 12500
+    assert len(first.invalid_lines) == 3
+    with open(str(receipts), 'a') as file_obj:
+        file_obj.write(entry("Al Noe", 25, "kayak"))
+    second = ledger.get_ledger(str(receipts), checkpoint)
+    assert second.total == 12630
+    with open(str(receipts), 'a') as file_obj:
+        file_obj.write("\n")
+    third = ledger.get_ledger(str(receipts), checkpoint)
+    assert third.offset == len(RECEIPTS) + len(entry("Al Noe", 25,
+                                                     "kayak")) + 1
+    assert third.total == 12630
+    receipts.write_text(RECEIPTS.replace("-70", "-60"))
+    assert ledger.get_ledger(str(receipts), checkpoint).total == 12615
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+# File: Tests/member_test.py
+
+"""
+Have so far written tests for:
+    MemberRecord
+    traverse_records
+    traverse_records_in_parallel
+    traverse_records_incrementally
+    name keys and NameIndex
+"""
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import member
+import rbc
+import pytest
+
+fieldnames = ("first,last,phone,address,town,state,postal_code," +
+              "country,email,dues,dock,kayak,mooring,status")
+
+rows = [
+    "Jane,Doe,555-1212,PO Box 1,Bolinas,CA,94924,USA,jd@x.com,100,,75,,",
+    "John,Roe,,PO Box 2,Bolinas,CA,94924,USA,,0,75,,114,be|z4_treasurer",
+    "Joe,Soe,,PO Box 3,Bolinas,CA,94924,USA,js@x.com,,,,,a1",
+    ]
+
+
+@pytest.fixture
+def memlist(tmp_path):
+    path = tmp_path / "memlist.csv"
+    path.write_text('\n'.join([fieldnames] + rows) + '\n')
+    return str(path)
+
+
+def get_record(row):
+    names = fieldnames.split(',')
+    index = {name: n for n, name in enumerate(names)}
+    return member.MemberRecord(index, row.split(','))
+
+
+def test_member_record_parses_money_and_status():
+    record = get_record(rows[1])
+    assert record.money == (0, 75, None, 114)
+    assert record.stati == {'be', 'z4_treasurer'}
+    assert member.get_money(record, 'mooring') == 114
+    assert member.get_money(record, 'kayak') is None
+    assert member.get_status_set(record) == {'be', 'z4_treasurer'}
+
+
+def test_member_record_formats_like_a_dict():
+    record = get_record(rows[0])
+    record['extra'] = "Statement"
+    assert ("{first} {last}: {dues} {extra}".format(**record)
+            == "Jane Doe: 100 Statement")
+    assert len(record) == member.N_FIELDS + 1
+    assert dict(record)['extra'] == "Statement"
+
+
+def test_member_record_reparses_on_assignment():
+    record = get_record(rows[0])
+    record['dues'] = 25
+    record['status'] = 'm'
+    assert member.get_money(record, 'dues') == 25
+    assert member.is_new_member(record)
+
+
+def test_traverse_records(memlist):
+    club = rbc.Club()
+    member.traverse_records(memlist, [member.get_payables,
+                                      member.get_zeros_and_nulls,
+                                      member.add2fee_data, ], club)
+    assert club.n_fields == member.N_FIELDS
+    assert len(club.still_owing) == 2
+    assert club.zeros == ["Roe, John: 0"]
+    assert club.nulls == ["Soe, Joe: "]
+    assert club.ms_by_fee_category == {
+        "Kayak": [("Doe, Jane", 75)],
+        "Dock": [("Roe, John", 75)],
+        "Mooring": [("Roe, John", 114)],
+        }
+
+
+def test_traverse_fused_runs_shared_collectors_once(memlist):
+    club = rbc.Club()
+    funcs = member.traverse_fused(
+        memlist,
+        [[member.add2ms_by_status, member.increment_napplicants],
+         member.get_payables,
+         (member.increment_napplicants, member.add2ms_by_status), ],
+        club)
+    assert funcs == [member.add2ms_by_status,
+                     member.increment_napplicants,
+                     member.get_payables]
+    assert club.napplicants == 1
+    assert club.ms_by_status['be'] == ["Roe, John"]
+    assert len(club.still_owing) == 2
+
+
+
+def test_traverse_fused_in_parallel(memlist):
+    func_lists = [[member.add2ms_by_status, member.increment_napplicants],
+                  member.get_payables]
+    serial = rbc.Club()
+    member.traverse_fused(memlist, func_lists, serial)
+    parallel = rbc.Club()
+    member.traverse_fused(memlist, func_lists, parallel, parallel=True)
+    for name in ("ms_by_status", "napplicants", "still_owing"):
+        assert getattr(parallel, name) == getattr(serial, name), name
+
+@pytest.mark.parametrize("status, member_, applicant, dues_paying", [
+    ("", True, False, True),
+    ("m", True, False, True),
+    ("be|z4_treasurer", True, False, True),
+    ("a1", False, True, False),
+    ("ai", False, True, True),
+    ("h", False, False, False),
+    ("w", True, False, False),
+    ("zae", False, False, False),
+    ])
+def test_status_predicates(status, member_, applicant, dues_paying):
+    record = {"status": status}
+    assert member.is_member(record) == member_
+    assert member.is_applicant(record) == applicant
+    assert member.is_dues_paying(record) == dues_paying
+
+
+def test_classify_file(memlist):
+    res = member.classify_file(memlist)
+    assert res['member'] == ["Doe, Jane", "Roe, John"]
+    assert res['applicant'] == ["Soe, Joe"]
+    assert res['special_notice'] == ["Roe, John"]
+
+
+def test_traverse_records_in_parallel_matches_serial(tmp_path):
+    lines = []
+    for n, last in enumerate(("Abe", "Ada", "Bee", "Bo", "Bye", "Cox",
+                              "Cy", "Ax", "Dee", "Di", "Doe", "Eby")):
+        lines.append(
+            "F{0},{1},,PO Box {0},Bolinas,CA,94924,USA,{2},{3},,,,{4}"
+            .format(n, last, "f{}@x.com".format(n) if n % 3 else "",
+                    n * 10 if n % 4 else "x", "a1" if n == 5 else ""))
+    path = tmp_path / "memlist.csv"
+    path.write_text('\n'.join([fieldnames] + lines) + '\n')
+    funcs = [member.add2malformed, member.add2lists,
+             member.increment_napplicants, member.get_payables,
+             member.add2ms_by_email, member.populate_non0balance_func]
+    serial = rbc.Club()
+    serial.for_web = True
+    member.traverse_records(str(path), funcs, serial)
+    parallel = rbc.Club()
+    parallel.for_web = True
+    member.traverse_records_in_parallel(str(path), funcs, parallel,
+                                        n_workers=3)
+    assert len(member.get_shards(str(path), 3)) == 3
+    for name in ("malformed", "members", "nmembers", "napplicants",
+                 "by_n_meetings", "still_owing", "ms_by_email",
+                 "non0balance", "previous_name", "first_letter"):
+        assert getattr(parallel, name) == getattr(serial, name), name
+
+
+def test_traverse_records_incrementally(memlist, tmp_path, capsys):
+    journal = str(tmp_path / "journal.pickle")
+    funcs = [member.add2malformed, member.get_payables,
+             member.add2ms_by_status, member.increment_napplicants]
+    club = rbc.Club()
+    member.traverse_records_incrementally(memlist, funcs, club, journal,
+                                          block_size=1)
+    serial = rbc.Club()
+    member.traverse_records(memlist, funcs, serial)
+    for name in ("malformed", "still_owing", "advance_payments",
+                 "ms_by_status", "napplicants"):
+        assert getattr(club, name) == getattr(serial, name), name
+    with open(memlist, 'w') as file_obj:  # change one row, drop one
+        file_obj.write('\n'.join([fieldnames, rows[0].replace(
+            "100", "50"), rows[2]]) + '\n')
+    capsys.readouterr()
+    club = rbc.Club()
+    member.traverse_records_incrementally(memlist, funcs, club, journal,
+                                          block_size=1)
+    assert "1 of 2 records (re)processed" in capsys.readouterr().out
+    assert club.still_owing[0].startswith("Doe, Jane")
+    assert "50" in club.still_owing[0]
+    assert len(club.still_owing) == 1
+    assert 'be' not in club.ms_by_status
+    assert club.napplicants == 1
+    capsys.readouterr()
+    again = rbc.Club()  # Unchanged: the journal is used as is.
+    member.traverse_records_incrementally(memlist, funcs, again, journal,
+                                          block_size=1)
+    assert "0 of 2 records (re)processed" in capsys.readouterr().out
+    for name in ("malformed", "still_owing", "advance_payments",
+                 "ms_by_status", "napplicants"):
+        assert getattr(again, name) == getattr(club, name), name
+    os.remove(journal)  # Too few rows for the default block size...
+    member.traverse_records_incrementally(memlist, funcs, rbc.Club(),
+                                          journal)
+    assert "(re)processed" not in capsys.readouterr().out
+    assert not os.path.exists(journal)  # ...so there's no journal.
+    with pytest.raises(ValueError):
+        member.traverse_records_incrementally(
+            memlist, [member.add2lists], rbc.Club(), journal)
+    club = rbc.Club()
+    club.incremental = True  # ...is ignored for add2lists.
+    club.for_web = False
+    capsys.readouterr()
+    member.traverse_records(memlist, [member.add2lists], club)
+    assert "incrementally" not in capsys.readouterr().out
+    assert club.nmembers == 1
+
+
+def test_name_keys():
+    record = get_record(rows[0])
+    key = member.get_name_key(record)
+    assert key == "Doe, Jane"
+    assert key is member.name_key_from_words("Jane Doe")
+    assert member.member_name(record, rbc.Club()) is key
+    record['first'] = "Janet"
+    assert member.get_name_key(record) == "Doe, Janet"
+
+
+def test_name_index(memlist):
+    index = member.get_name_index(memlist)
+    assert len(index) == 3
+    assert "Roe, John" in index
+    assert index.offsets["Soe, Joe"] == 2
+    assert index.with_prefix("Roe, ") == ["Roe, John"]
+    assert index.with_prefix("") == ["Doe, Jane", "Roe, John",
+                                     "Soe, Joe"]
+    assert index.with_prefix("X") == []
+
+
+@pytest.mark.parametrize("email, expected", [
+    (" Jane.Doe+club@GMail.com ", "janedoe@gmail.com"),
+    ("j.doe@googlemail.com", "jdoe@gmail.com"),
+    ("Jane.Doe+club@Example.org", "jane.doe+club@example.org"),
+    ("", ""),
+    ])
+def test_canonical_email(email, expected):
+    assert member.canonical_email(email) == expected
+
+
+def test_shared_emails():
+    club = rbc.Club()
+    club.ms_by_email = {}
+    for last, first, email in (("Doe", "Jane", "JaneDoe@gmail.com"),
+                               ("Doe", "John", "jane.doe@gmail.com"),
+                               ("Roe", "Ann", ""),
+                               ("Poe", "Ed", "")):
+        member.add2ms_by_email(dict(last=last, first=first,
+                                    email=email), club)
+    assert member.get_shared_emails(club.ms_by_email) == {
+        "janedoe@gmail.com": ["Doe, Jane", "Doe, John"]}
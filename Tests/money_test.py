@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+# File: Tests/money_test.py
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import member
+import money
+import rbc
+import pytest
+
+csv_text = (
+    "first,last,phone,address,town,state,postal_code," +
+    "country,email,dues,dock,kayak,mooring,status\n" +
+    "Jane,Doe,,PO Box 1,Bolinas,CA,94924,USA,,100,,75,,\n" +
+    "John,Roe,,PO Box 2,Bolinas,CA,94924,USA,,0,-75,,114,be\n" +
+    "Joe,Soe,,PO Box 3,Bolinas,CA,94924,USA,,,,,,a1\n" +
+    "Ret,Toe,,PO Box 4,Bolinas,CA,94924,USA,,100,,,,r\n" +
+    "Bad,Woe,,PO Box 5,Bolinas,CA,94924,USA,,x,,-5,,\n")
+
+
+@pytest.fixture(params=["lists", "numpy"])
+def columns(request, tmp_path, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(money, 'numpy', None)
+    infile = tmp_path / "memlist.csv"
+    infile.write_text(csv_text)
+    club = rbc.Club()
+    member.traverse_records(str(infile), [
+        member.get_payables, member.get_zeros_and_nulls,
+        member.populate_non0balance_func], club)
+    return money.load_columns(str(infile)), club
+
+
+def test_matches_collectors(columns):
+    columns, club = columns
+    assert money.get_payables(columns) == (club.still_owing,
+                                           club.advance_payments)
+    assert money.get_zeros_and_nulls(columns) == (club.zeros,
+                                                  club.nulls)
+    assert money.get_non0balance(columns) == club.non0balance
+
+
+def test_totals_and_still_owing(columns):
+    columns, club = columns
+    totals = money.get_totals(columns)
+    assert totals['dues'] == (100, 0)
+    assert totals['kayak'] == (75, -5)
+    assert totals['total'] == (289, -80)
+    assert money.still_owing(columns) == ["Doe, Jane", "Roe, John"]
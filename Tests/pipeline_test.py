@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# File: Tests/pipeline_test.py
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import json
+import content
+import pipeline
+import pytest
+
+emails = [
+    {"To": "jd@x.com", "Subject": "Dues", "body": "Dear Jane,\n[1, 2]"},
+    {"To": "js@x.com", "Subject": "Dues", "body": 'Say "hi" {}'},
+    {"To": "", "Subject": "", "body": ""},
+    ]
+
+
+def test_json_sink_matches_json_dumps(tmp_path):
+    json_file = tmp_path / "emails.json"
+    assert pipeline.json_sink(iter(emails), str(json_file)) == 3
+    assert json_file.read_text() == json.dumps(emails)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_json_source_streams_the_array(tmp_path, chunk_size):
+    json_file = tmp_path / "emails.json"
+    json_file.write_text(json.dumps(emails, indent=2))
+    assert list(pipeline.json_source(str(json_file),
+                                     chunk_size)) == emails
+
+
+def test_csv_pipeline(tmp_path):
+    infile = tmp_path / "in.csv"
+    infile.write_text("first,last,dues\nJane,Doe,100\nJoe,Soe,0\n")
+    outfile = tmp_path / "out.csv"
+    seen = []
+    n = pipeline.csv_sink(
+        pipeline.pipe(pipeline.csv_source(str(infile)),
+                      pipeline.tee(lambda rec: seen.append(rec['last'])),
+                      pipeline.filter_by(lambda rec: rec['dues'] != '0'),
+                      pipeline.map_with(lambda rec, n: dict(
+                          rec, dues=str(int(rec['dues']) + n)), 50)),
+        str(outfile), ["first", "last", "dues"])
+    assert n == 1
+    assert seen == ["Doe", "Soe"]
+    assert outfile.read_text().split() == ["first,last,dues",
+                                           "Jane,Doe,150"]
+
+
+def test_letter_spool(tmp_path):
+    spool_file = str(tmp_path / "letters.spool")
+    records = [dict(first="Jane", last="Doe"),
+               dict(first="John", last="Roe")]
+    assert pipeline.spool_sink(records, spool_file,
+                               "Dear {first},\nPlease pay.") == 2
+    with open(spool_file, 'r') as file_obj:
+        assert file_obj.read().split('\f') == [
+            "Dear Jane,\nPlease pay.", "Dear John,\nPlease pay."]
+    assert list(pipeline.read_spool(spool_file, ["Roe_John"])) == [
+        ("Roe_John", "Dear John,\nPlease pay.")]
+
+
+def test_letter_writer(tmp_path):
+    names = ["Roe_{}".format(n) for n in range(20)]
+    with pipeline.LetterWriter(str(tmp_path),
+                               content.Template("Dear {first},"),
+                               workers=3, max_pending=2) as writer:
+        for n, name in enumerate(names):
+            record = dict(first=str(n))
+            writer.submit(name, record)
+            record["first"] = "changed"
+    assert writer.count == 20
+    assert writer.written == [str(tmp_path / name) for name in names]
+    assert (tmp_path / "Roe_7").read_text() == "Dear 7,"
+
+
+def test_email_source_reads_either_format(tmp_path):
+    jsonl_file = str(tmp_path / "emails.jsonl")
+    json_file = str(tmp_path / "emails.json")
+    with pipeline.email_sink(jsonl_file) as sink:
+        for email in emails:
+            sink.append(email)
+    assert sink.count == 3
+    assert pipeline.json_sink(iter(emails), json_file) == 3
+    assert list(pipeline.email_source(jsonl_file)) == emails
+    assert list(pipeline.email_source(json_file)) == emails
+
+
+def test_jsonl_source_skips_interrupted_last_line(tmp_path):
+    jsonl_file = tmp_path / "emails.jsonl"
+    jsonl_file.write_text(json.dumps(emails[0]) + '\n' +
+                          json.dumps(emails[1])[:-5])
+    assert list(pipeline.email_source(str(jsonl_file))) == emails[:1]
+
+
+def test_templated_emails_are_rendered_when_read(tmp_path):
+    email_file = str(tmp_path / "emails.jsonl")
+    template = content.Template("Dear {first},\n{extra}")
+    records = [dict(first="Jane", last="Doe", extra="Pay up."),
+               dict(first="John", last="Roe", extra="Thanks!")]
+    with pipeline.email_sink(email_file) as sink:
+        for record in records:
+            sink.append_templated({"To": record["last"]}, template.text,
+                                  template.variables(record))
+        sink.append(emails[0])
+    assert sink.count == 3
+    with open(email_file, 'r') as file_obj:
+        assert file_obj.read().count("Dear {first}") == 1
+    assert list(pipeline.email_source(email_file)) == [
+        {"To": "Doe", "body": "Dear Jane,\nPay up."},
+        {"To": "Roe", "body": "Dear John,\nThanks!"},
+        emails[0]]
+
+
+def test_templated_emails_share_their_headers(tmp_path):
+    email_file = str(tmp_path / "emails.jsonl")
+    template = content.Template("Dear {first},\n{extra}")
+    with pipeline.email_sink(email_file) as sink:
+        for to, subject in (("jd@x.com", "Dues"), ("jr@x.com", "Dues"),
+                            ("js@x.com", "Fees")):
+            sink.append_templated(
+                {"From": "club@x.com", "To": to, "Subject": subject,
+                 "attachments": []}, template.text,
+                dict(first="Jo", extra=""))
+    with open(email_file, 'r') as file_obj:
+        lines = file_obj.read().splitlines()
+    assert len(lines) == 5  # A second template line for the "Fees".
+    assert sum("club@x.com" in line for line in lines) == 2
+    rendered = list(pipeline.email_source(email_file))
+    assert rendered[1] == {"From": "club@x.com", "To": "jr@x.com",
+                           "Subject": "Dues", "attachments": [],
+                           "body": "Dear Jo,\n"}
+    assert list(rendered[2]) == ["From", "To", "Subject",
+                                 "attachments", "body"]
+    assert rendered[2]["Subject"] == "Fees"
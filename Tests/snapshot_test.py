@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+# File: Tests/snapshot_test.py
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import stat
+import snapshot
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_write_pickle_is_read_back(tmp_path):
+    path = str(tmp_path / "state.pickle")
+    assert snapshot.read_pickle(path, {}) == {}
+    snapshot.write_pickle({"offset": 10}, path)
+    assert snapshot.read_pickle(path) == {"offset": 10}
+    assert os.listdir(str(tmp_path)) == ["state.pickle"]
+
+
+def test_write_pickle_mode(tmp_path):
+    new = str(tmp_path / "new.pickle")
+    old = str(tmp_path / "old.pickle")
+    with open(str(tmp_path / "plain.txt"), 'w'):
+        pass  # a file created as any other would be
+    snapshot.write_pickle([], new)
+    assert mode(new) == mode(str(tmp_path / "plain.txt"))
+    snapshot.write_pickle([], old)
+    os.chmod(old, 0o640)
+    snapshot.write_pickle([1], old)
+    assert mode(old) == 0o640
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+# File: Tests/utils_test.py
+
+"""
+utils.py parses its command line when imported so it is run
+here as a script (in a scratch directory with its own Data/
+and dummy ~/.pw.* files.)
+"""
+
+# Must first add the parent directory of the
+# currently running script to the system path:
+import os
+import sys
+sys.path.insert(0, os.path.split(sys.path[0])[0])
+
+import subprocess
+import helpers
+import pytest
+
+UTILS = os.path.join(os.path.split(os.path.abspath(__file__))[0],
+                     os.pardir, 'utils.py')
+
+memlist = (
+    "first,last,phone,address,town,state,postal_code,country," +
+    "email,dues,dock,kayak,mooring,status\n" +
+    "Jane,Doe,,PO Box 1,Bolinas,CA,94924,USA,jd@x.com,0,,,,\n" +
+    "John,Roe,,PO Box 2,Bolinas,CA,94924,USA,jr@x.com,10,,,,\n" +
+    "Joe,Soe,,PO Box 3,Bolinas,CA,94924,USA,js@x.com,50,,,,a1\n" +
+    "Ret,Toe,,PO Box 4,Bolinas,CA,94924,USA,rt@x.com,0,,,,r\n")
+
+
+@pytest.fixture
+def run_utils(tmp_path):
+    docopt = pytest.importorskip("docopt")
+    home = tmp_path / "home"
+    home.mkdir()
+    for service in ("sonic", "easy", "akg", "clubg"):
+        (home / ".pw.{}".format(service)).write_text("pw")
+    data_dir = tmp_path / "Data"
+    data_dir.mkdir()
+    (data_dir / "memlist.csv").write_text(memlist)
+    (data_dir / "applicants.txt").write_text(
+        "Joe Soe | 200101 | 200101 | 200207 |\n")
+    (data_dir / "sponsors.txt").write_text("Joe Soe: Jane Doe, John Roe\n")
+    env = dict(os.environ, HOME=str(home),
+               PYTHONPATH=os.path.dirname(docopt.__file__))
+
+    def run(*argv):
+        out_file = tmp_path / "out.txt"
+        subprocess.run(
+            [sys.executable, UTILS] + list(argv) + ['-o', str(out_file)],
+            cwd=str(tmp_path), env=env, check=True,
+            stdout=subprocess.DEVNULL)
+        return out_file.read_text()
+    return run
+
+
+def test_batch_matches_separate_reports(run_utils):
+    separately = helpers.FORMFEED.join(
+        [run_utils('report'), run_utils('stati')])
+    assert run_utils('batch', 'report', 'stati') == separately
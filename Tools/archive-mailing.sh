@@ -10,9 +10,16 @@ STAMP=`date +%y-%m-%d`
 MAILING_ARCHIVES='../Archives/Mailings'
 TARFILE=${STAMP}.tar.gz
 MAILING_DIR='Data/MailingDir'
-EMAILS_JSON='Data/emails.json'
-echo "Moving email json file into Mailing Directory..."
-mv $EMAILS_JSON ${MAILING_DIR}/$EMAIL_JSON 
+EMAIL_FILES='Data/emails.jsonl Data/emails.json'  # new & old format
+mkdir -p $MAILING_DIR
+for EMAIL_FILE in $EMAIL_FILES
+do
+    if [ -f $EMAIL_FILE ]
+    then
+        echo "Moving email file $EMAIL_FILE into Mailing Directory..."
+        mv $EMAIL_FILE ${MAILING_DIR}/
+    fi
+done
 echo "Renaming Mailing Directory to date stamp..."
 mv $MAILING_DIR $STAMP
 
@@ -8,13 +8,16 @@
 # This script is useful when testing and contents 
 # of Data/MailingDir can be discarded.
 
-if [ -f Data/emails.json ]
-    then
-        echo "Removing Data/emails.json"
-        rm Data/emails.json
-    else
-        echo "emails.json not found."
-fi
+for EMAIL_FILE in Data/emails.jsonl Data/emails.json
+do
+    if [ -f $EMAIL_FILE ]
+        then
+            echo "Removing $EMAIL_FILE"
+            rm $EMAIL_FILE
+        else
+            echo "$EMAIL_FILE not found."
+    fi
+done
 
 if [ -d Data/MailingDir ]
     then
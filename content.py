@@ -30,15 +30,20 @@ Other items:
     email_header
     func: prepare_letter_template(which_letter, printer):
     func: prepare_email_template(which_letter):
+    class: Template (see compile_template.)
 
 Printing Letters:
 Both the printer and the windowed envelope being used must be taken
 into consideration.
 """
 
+import re
+import string
+import hashlib
 import helpers
 import member
 import rbc
+import snapshot
 
 address_format = """{first} {last}
 {address}
@@ -768,7 +773,7 @@ content_types = dict(  # which_letter
         "funcs": (member.assign_statement2extra_func,
                   member.std_mailing_func),
         "test": lambda record: True if (
-            member.is_duespaying(record) and
+            member.is_dues_paying(record) and
             member.not_paid_up(record)
             ) else False,
         "e_and_or_p": "one_only",
@@ -826,9 +831,7 @@ content_types = dict(  # which_letter
         "body": letter_bodies["bad_email"],
         "post_scripts": (),
         "funcs": (member.std_mailing_func,),
-        "test": (lambda record: True if
-                 'be' in record["status"].split(member.SEPARATOR)
-                 else False),
+        "test": (lambda record: member.has_status(record, 'be')),
         "e_and_or_p": "usps",
         },
     new_applicant_welcome={
@@ -837,10 +840,7 @@ content_types = dict(  # which_letter
         "body": letter_bodies["new_applicant_welcome"],
         "post_scripts": (post_scripts["covid19"],),
         "funcs": (member.std_mailing_func,),
-        "test": (lambda record: True if
-                 (record["status"]
-                  and 'a0' in record["status"].split("|"))
-                 else False),
+        "test": (lambda record: member.has_status(record, 'a0')),
         "e_and_or_p": "one_only",
         },
     covid_welcome={
@@ -1132,6 +1132,102 @@ def prepare_email_template(which_letter):
     return '\n'.join(ret)
 
 
+class Template(object):
+    """
+    A (str.format style) template parsed only once into literal and
+    field segments. If <indent> is provided, each line is indented
+    by that many spaces (as helpers.indent would the letter): this
+    is done to the literal segments when compiling and to only those
+    field values containing line feeds when rendering.
+    Render with template.render(record) or, as with the str it
+    replaces, template.format(**record).
+    The <text> it was made from and the <names> of the record fields
+    it uses are kept so it can be rendered later from just those
+    (see variables and pipeline.TemplatedEmailSink.)
+    """
+
+    __slots__ = ('text', 'names', 'literals', 'fields', 'indentation')
+
+    def __init__(self, template, indent=0):
+        self.text = template
+        self.indentation = '\n' + ' ' * indent if indent else ''
+        names = []
+        literals = []
+        fields = []
+        literal = ' ' * indent
+        for text, name, spec, conversion in (
+                string.Formatter().parse(template)):
+            literal += text
+            if name is None:
+                continue
+            if self.indentation:
+                literal = literal.replace('\n', self.indentation)
+            literals.append(literal)
+            names.append(re.split(r'[.\[]', name)[0])
+            if name.isidentifier() and not spec and not conversion:
+                fields.append(name)
+            else:  # Let str.format deal with it.
+                fields.append((''.join(('{', name,
+                                        '!' + conversion if conversion
+                                        else '',
+                                        ':' + spec if spec else '',
+                                        '}'))))
+            literal = ''
+        if self.indentation:
+            literal = literal.replace('\n', self.indentation)
+        literals.append(literal)
+        self.literals = tuple(literals)
+        self.fields = tuple(fields)
+        self.names = tuple(sorted(set(names)))
+
+    def render(self, record):
+        pieces = [self.literals[0]]
+        for n, field in enumerate(self.fields, 1):
+            if field.startswith('{'):
+                value = field.format(**record)
+            else:
+                value = record[field]
+                if not isinstance(value, str):
+                    value = format(value)
+            if self.indentation and '\n' in value:
+                value = value.replace('\n', self.indentation)
+            pieces.append(value)
+            pieces.append(self.literals[n])
+        return ''.join(pieces)
+
+    def format(self, **record):
+        return self.render(record)
+
+    def variables(self, record):
+        """
+        Returns a dict of the values (from <record>) of the fields
+        used: self.text.format(**variables) is what render(record)
+        returns (if not indented.)
+        """
+        return {name: record[name] for name in self.names}
+
+
+_templates = None  # Compiled templates read from disk when needed.
+
+
+def compile_template(template, indent=0,
+                     templates_file=rbc.Club.TEMPLATES_FILE):
+    """
+    Returns the Template for <template> (with <indent>), using (and
+    adding to) those kept (pickled) in <templates_file>: keyed by
+    a hash of the template along with the indent.
+    """
+    global _templates
+    if _templates is None:
+        _templates = snapshot.read_pickle(templates_file, {})
+    key = (hashlib.sha1(template.encode('utf-8')).hexdigest(), indent)
+    ret = _templates.get(key)
+    if not isinstance(ret, Template) or not hasattr(ret, 'names'):
+        ret = _templates[key] = Template(template, indent)
+        snapshot.write_pickle(_templates, templates_file)
+    return ret
+
+
 def contents():
     """
     Provides a way of getting a quick glimpse
@@ -22,9 +22,19 @@ files containing membership related data.
 import os
 import sys
 import csv
+import re
 import json
+import bisect
+import datetime
+import functools
+import collections
+import collections.abc
+import concurrent.futures
 import helpers
 import member
+import money
+import pipeline
+import snapshot
 import sys_globals as glbs
 from rbc import Club
 
@@ -37,6 +47,21 @@ def get_fieldnames(csv_file: "name of csv file"
         return dict_reader.fieldnames
 
 
+MEMBERSHIP_DATA_FUNCS = (
+    member.add2db_emails,
+#   member.add2email_data,
+    member.add2email_by_m,
+    member.add2ms_by_email,
+    member.add2fee_data,
+    member.add2stati_by_m,
+    member.add2ms_by_status,
+    member.increment_napplicants,
+    member.add2malformed,
+    member.add2member_with_email_set,
+    member.add2applicant_with_email_set,
+    )
+
+
 def gather_membership_data(club):
     """
     Gathers the info we want from the membership csv file
@@ -49,35 +74,170 @@ def gather_membership_data(club):
     [1] except both 'fee_category' collectors are populated by
     member.add2fee_data function and
     both 'email' collectors.
+    The collectors are listed in MEMBERSHIP_DATA_FUNCS so they can
+    also be included in a member.traverse_fused call.
     """
     err_code = member.traverse_records(club.MEMBERSHIP_SPoT,
-                                       (member.add2db_emails,
-#                                       member.add2email_data,
-                                        member.add2email_by_m,
-                                        member.add2fee_data,
-                                        member.add2stati_by_m,
-                                        member.add2ms_by_status,
-                                        member.increment_napplicants,
-                                        member.add2malformed,
-                                        member.add2member_with_email_set,
-                                        member.add2applicant_with_email_set,
-                                        ), club)
+                                       MEMBERSHIP_DATA_FUNCS, club)
     if err_code:
         print("Error condition! #{}".format(err_code))
 
 
+# The only columns of the gmail contacts file get_gmail_record uses:
+CONTACTS_FIELDS = (
+    "Given Name",
+    "Additional Name",
+    "Family Name",
+    "Name Suffix",
+    "E-mail 1 - Value",
+    "Group Membership",
+    )
+
+
+def projected_records(file_obj, fields):
+    """
+    A generator: yields, for each record of the csv <file_obj>, a
+    dict with only the (named) <fields>; the column of each is
+    looked up (in the header) only once. Missing values are ''.
+    As with csv.DictReader, blank rows are skipped.
+    Raises ValueError if any of the <fields> isn't in the header.
+    """
+    reader = csv.reader(file_obj)
+    header = next(reader, [])
+    missing = [field for field in fields if field not in header]
+    if missing:
+        raise ValueError('"{}": no {} column(s).'.format(
+            getattr(file_obj, 'name', file_obj),
+            ', '.join(repr(field) for field in missing)))
+    indexes = [header.index(field) for field in fields]
+    n_needed = max(indexes) + 1 if indexes else 0
+    padding = [''] * n_needed
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < n_needed:
+            row = row + padding
+        yield {field: row[index]
+               for field, index in zip(fields, indexes)}
+
+
+@functools.lru_cache(maxsize=None)
+def split_groups(group_membership):
+    """
+    Returns a frozenset of the groups listed in a gmail contacts
+    "Group Membership" value (less the '* myContacts' every contact
+    has.) Cached since the same few values recur.
+    """
+    groups = group_membership.split(" ::: ")
+    if groups and groups[-1] == '* myContacts':
+        groups = groups[:-1]
+    return frozenset(groups)
+
+
+class GroupIndex(collections.abc.Mapping):
+    """
+    The contacts of each gmail group, kept as a bitset (an int)
+    over contact ids (each name is assigned an integer id as first
+    seen) so group intersections, differences and counts are
+    bitwise operations.
+    Can be used as was the dict (of sets of names) it replaces:
+    index[group] returns the set of names in that group.
+    """
+
+    def __init__(self):
+        self.names = []  # indexed by id
+        self.ids = {}  # keyed by name
+        self.bits = {}  # keyed by group
+
+    def get_id(self, name):
+        """
+        Returns the id of <name>, assigning one if necessary.
+        """
+        try:
+            return self.ids[name]
+        except KeyError:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            return self.ids[name]
+
+    def add(self, name, groups):
+        """
+        Adds <name> to each of <groups>.
+        """
+        bit = 1 << self.get_id(name)
+        for group in groups:
+            self.bits[group] = self.bits.get(group, 0) | bit
+
+    def mask(self, names):
+        """
+        Returns the bitset of those of <names> (any iterable of
+        names) which have an id; others are ignored (so the index
+        isn't changed by a check.)
+        """
+        ret = 0
+        for name in names:
+            n = self.ids.get(name)
+            if n is not None:
+                ret |= 1 << n
+        return ret
+
+    def group_bits(self, group):
+        return self.bits.get(group, 0)
+
+    def names_in(self, bits):
+        """
+        Returns the set of names in the bitset <bits>.
+        """
+        return {self.names[n] for n, bit
+                in enumerate(reversed(bin(bits)[2:])) if bit == '1'}
+
+    @staticmethod
+    def count(bits):
+        return bin(bits).count('1')
+
+    def __getitem__(self, group):
+        return self.names_in(self.bits[group])
+
+    def __iter__(self):
+        return iter(self.bits)
+
+    def __len__(self):
+        return len(self.bits)
+
+    def check_sets(self, group, names,
+                   header_in1st_not2nd="In 1st but not 2nd set:",
+                   header_in2nd_not1st="In 2nd but not 1st set:"):
+        """
+        Returns what helpers.check_sets(self[<group>], set(<names>),
+        ...) would but does the differences on bitsets.
+        """
+        names = set(names)
+        bits1 = self.group_bits(group)
+        bits2 = self.mask(names)
+        ret = []
+        in1st_not2nd = bits1 & ~bits2
+        in2nd_not1st = (self.names_in(bits2 & ~bits1) |
+                        (names - self.ids.keys()))  # no id: no group
+        if in1st_not2nd:
+            helpers.add_header2list(header_in1st_not2nd,
+                                    ret, underline_char='-',
+                                    extra_line=True)
+            ret.extend(sorted(self.names_in(in1st_not2nd)))
+        if in2nd_not1st:
+            helpers.add_header2list(header_in2nd_not1st,
+                                    ret, underline_char='-',
+                                    extra_line=True)
+            ret.extend(sorted(in2nd_not1st))
+        return ret
+
+
 def get_gmail_record(g_rec):
     """
     <g_rec> is a record from the gmail contacts file.
     Returns a dict with only the info we need.
     """
     g_email = g_rec["E-mail 1 - Value"]
-    group_membership = (
-        g_rec["Group Membership"].split(" ::: "))
-    if (group_membership and
-            group_membership[-1] == '* myContacts'):
-        group_membership = group_membership[:-1]
-    group_membership = set(group_membership)
+    group_membership = split_groups(g_rec["Group Membership"])
     first_name = " ".join((
         g_rec["Given Name"],
         g_rec["Additional Name"],
@@ -86,7 +246,7 @@ def get_gmail_record(g_rec):
         g_rec["Family Name"],
         g_rec["Name Suffix"],
         )).strip()
-    gname = "{}, {}".format(last_name, first_name)
+    gname = member.name_key(last_name, first_name)
     alias = "{}{}".format(first_name, last_name)
     muttname = '{} {}'.format(first_name, last_name)
     return dict(
@@ -109,90 +269,175 @@ def gather_contacts_data(club):
     The attributes are :
         g_by_name: keyed by "name" /w values indexed as follows:
           ["email"] => email
-          ["groups"] => set of group memberships
+          ["groups"] => (frozen) set of group memberships
         g_by_group: keyed by group membership /w values
         each a set of "names" of contacts sharing that group membership.
+        (A GroupIndex: the sets are kept as bitsets.)
     """
-    club.gmail_by_name = dict()  # => string
-    club.groups_by_name = dict()  # => set
+    (club.gmail_by_name,  # => string
+     club.groups_by_name,  # => set
+     club.g_by_group,  # >set of names
+     ) = load_contacts_data(club.CONTACTS_SPoT)
 
-    club.g_by_group = dict()  # >set of names
+
+def load_contacts_data(contacts_spot):
+    """
+    Does the work of gather_contacts_data, returning its three
+    dicts as a tuple: (gmail_by_name, groups_by_name, g_by_group).
+    """
+    gmail_by_name = dict()
+    groups_by_name = dict()
+    g_by_group = GroupIndex()
 
     # Traverse contacts.csv => g_by_name
-    with open(club.CONTACTS_SPoT, 'r', encoding='utf-8') as file_obj:
-        google_reader = csv.DictReader(file_obj)
-        print('DictReading Google contacts file "{}".'.format(
+    with open(contacts_spot, 'r', encoding='utf-8',
+              newline='') as file_obj:
+        print('Reading Google contacts file "{}".'.format(
                                                     file_obj.name))
-        for g_rec in google_reader:
+        for g_rec in projected_records(file_obj, CONTACTS_FIELDS):
             g_dict = get_gmail_record(g_rec)
 
+            gmail_by_name[g_dict['gname']] = g_dict['g_email']
+            groups_by_name[g_dict['gname']] = g_dict['groups']
+
+            g_by_group.add(g_dict["gname"], g_dict["groups"])
+    return gmail_by_name, groups_by_name, g_by_group
+
+
+# Parsing of the text SPoTs (applicants, sponsors and extra fees):
+# each line is parsed into one of the following (named) tuples or,
+# if it can't be, a ParseError is collected (see parse_lines.)
+ApplicantEntry = collections.namedtuple(
+    "ApplicantEntry", "name status dates")  # dates: a tuple
+SponsorEntry = collections.namedtuple(
+    "SponsorEntry", "name sponsors")  # sponsors: a tuple
+FeeEntry = collections.namedtuple("FeeEntry", "name category amount")
+ParseError = collections.namedtuple(
+    "ParseError", "spot line_number line message")
+
+NAME_RE = re.compile(r"(\S+)\s+(\S+)")  # First Last
+SPONSOR_RE = re.compile(r"([^:]+):(.*)$")  # First Last: sponsors
+SPONSORS_SPLIT_RE = re.compile(r"\s*,\s*")
+FEE_RE = re.compile(r"([^:]+):\s*([-+]?\d+)$")  # First Last: amount
+FEE_CATEGORIES = ("Kayak", "Dock", "Mooring")
+
+# Applicant status (and how many of the fields are meeting dates)
+# by the number of fields of a line of the applicant SPoT: name,
+# application date, fee payment date, meeting dates, date of
+# induction and date dues paid (=> member.)
+APPLICANT_STATI_BY_N_FIELDS = {
+    1: ("zaa", 0),  # see member.STATUS_KEY_VALUES
+    2: ("a-", 0),   # for meanings
+    3: ("a0", 0),
+    4: ("a1", 1),
+    5: ("a2", 2),
+    6: ("a3", 3),
+    7: ("ai", 3),
+    8: ("m", 0),
+    }
+
+
+def parse_name(words):
+    """
+    Returns the name key ("Last, First") of <words>: "First Last".
+    """
+    match = NAME_RE.match(words.strip())
+    if not match:
+        raise ValueError("Expected 'First Last', got '{}'"
+                         .format(words.strip()))
+    return member.name_key(match.group(2), match.group(1))
 
-            club.gmail_by_name[g_dict['gname']] = g_dict['g_email']
-            club.groups_by_name[g_dict['gname']] = g_dict['groups']
 
-            for key in g_dict["groups"]:
-                _ = club.g_by_group.setdefault(key, set())
-                club.g_by_group[key].add(g_dict["gname"])
+def parse_applicant_line(line):
+    """
+    Returns an ApplicantEntry for a line of the applicant SPoT.
+    Expired (or withdrawn) applications have status 'zae'; those
+    who've become members, 'm'.
+    Raises ValueError if <line> can't be parsed.
+    """
+    fields = [field.strip() for field in line.split(glbs.SEPARATOR)]
+    if len(fields) > 1 and not fields[-1]:  # trailing separator
+        fields.pop()
+    name = parse_name(fields[0])
+    if fields[-1].startswith("Appl"):
+        return ApplicantEntry(name, "zae", ())
+    try:
+        status, n_dates = APPLICANT_STATI_BY_N_FIELDS[len(fields)]
+    except KeyError:
+        raise ValueError("{} fields (expect no more than {})".format(
+            len(fields), max(APPLICANT_STATI_BY_N_FIELDS)))
+    return ApplicantEntry(name, status, tuple(fields[3:3 + n_dates]))
+
+
+def parse_sponsor_line(line):
+    """
+    Returns a SponsorEntry for a line of the sponsors SPoT.
+    Raises ValueError if <line> can't be parsed.
+    """
+    match = SPONSOR_RE.match(line)
+    if not match:
+        raise ValueError("Expected 'First Last: sponsor, sponsor'")
+    return SponsorEntry(
+        parse_name(match.group(1)),
+        tuple(SPONSORS_SPLIT_RE.split(match.group(2).strip())))
 
 
-def parse_applicant_line4dates(line,
-                               bad_line_list=None,
-                               expired_applicant_list=None,
-                               former_applicant_list=None):
+def parse_fee_line(line, category):
     """
-    !!Expect redaction in favour of parse_applicant_data_line!!
-    Takes a line from the applicant SPoT file and returns either
-    None (if not a valid applicant line) or
-    a tuple: first element is the name and meeting dates make up
-    the remaining elements.
-    Also adds to lists if provided.
+    Returns a FeeEntry for a (non header) line of the extra fees
+    SPoT: 'First Last: amount' under the <category> header.
+    Raises ValueError if <line> can't be parsed.
     """
-    parts = [part.strip() for part in line.split(
-                            glbs.SEPARATOR)]
-    if not parts and bad_line_list is not None:
-        bad_line_list.append(line)
-        return
-    names = parts[0].split()
-    if len(names) == 2:
-        name = ", ".join((names[1], names[0]))
-        parts = parts[1:]
-    else:
-        if bad_line_list is not None:
-            bad_line_list.append(line)
-        return
-    if parts and not parts[-1]:  # Get rid of empty field
-        parts = parts[:-1]       # if trailing SEPARATOR.
-    if parts and parts[-1].startswith("Application"):
-        if expired_applicant_list is not None:
-            expired_applicant_list.append(name)
-        return
-    if len(parts) < 2:  # application received; fee paid
-        if bad_line_list is not None:
-            bad_line_list.append(line)
-        return
-    else:
-        parts = parts[2:]
-        nparts = len(parts)
-    status = ''
-    if nparts == 5:
-        if parts[nparts-1] == 'aw':
-            status = 'aw'
-            parts = parts[:-1]
-        else:
-            if former_applicant_list is not None:
-                former_applicant_list.append(line)
-            return  # no longer an appliant
-    if not status:
-        try:
-            status = member.APPLICANT_STATI[nparts]
-        except IndexError:
-            if bad_line_list is not None:
-                bad_line_list.append(
-                    "IndexError: {}".format(line))  # got none
-            return
-    if len(parts) > 3:  # waste dates of induction and membership.
-        parts = parts[:3]
-    return (name, parts)
+    if not category:
+        raise ValueError("Fee listed before any category header")
+    match = FEE_RE.match(line)
+    if not match:
+        raise ValueError("Expected 'First Last: amount'")
+    return FeeEntry(parse_name(match.group(1)), category,
+                    int(match.group(2)))
+
+
+def parse_lines(spot, parse_line, errors=None):
+    """
+    A generator: yields what <parse_line> returns for each useful
+    (not blank nor commented) line of the file <spot>.
+    Lines for which it raises ValueError are skipped (and, if an
+    <errors> list is provided, added to it as ParseErrors.)
+    """
+    with open(spot, 'r') as src:
+        print('Reading file "{}"...'.format(src.name))
+        for n, line in enumerate(src, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                yield parse_line(line)
+            except ValueError as err:
+                if errors is not None:
+                    errors.append(ParseError(spot, n, line, str(err)))
+
+
+def parse_fee_lines(spot, errors=None):
+    """
+    A generator: yields a FeeEntry for each fee listed in the extra
+    fees SPoT <spot> (see parse_lines re <errors>.) Header lines
+    (ending in ':' and containing one of the FEE_CATEGORIES) set
+    the category of the fees which follow.
+    """
+    state = dict(category="")
+
+    def parse_line(line):
+        if line.endswith(':'):
+            for word in line[:-1].split():
+                if word in FEE_CATEGORIES:
+                    state["category"] = word
+                    return None
+            raise ValueError("Header without a known category")
+        return parse_fee_line(line, state["category"])
+
+    for entry in parse_lines(spot, parse_line, errors):
+        if entry is not None:
+            yield entry
 
 
 def parse_applicant_data_line(line):
@@ -203,40 +448,16 @@ def parse_applicant_data_line(line):
     t1 is "last, first" name
     t2 is a tuple the first item of which is status possibly
     followed by dates (if application is active.)
-    Status can be any of those listed in the if elif listing:
+    Status can be any of those listed in APPLICANT_STATI_BY_N_FIELDS.
     Notice absence of:
         'a' which is distinguished from 'a0' only re welcoming letter
         'aw' which has to do with vacancy, they'll show up as 'm'
-    Fails if encounters an invalid line!!!
-    ...or should we just return None???
-    """
-    parts = line.split(glbs.SEPARATOR)
-    if not parts[-1]: parts = parts[:-1]  # trailing separator?
-    parts = [part.strip() for part in parts]
-    l = len(parts)
-    names = parts[0].split()
-    key = "{}, {}".format(names[1], names[0]) 
-    if parts[-1].startswith("Appl"):
-        ret = (key, ("zae",))  # see members.STATUS_KEY_VALUES
-    elif l == 1:               # for meanings
-        ret = key, ("zaa",)
-    elif l == 2:
-        ret = key, ("a-",)
-    elif l == 3:
-        ret = key, ("a0",)
-    elif l == 4:
-        ret = key, ("a1", parts[3])
-    elif l == 5:
-        ret = key, ("a2", parts[3], parts[4])
-    elif l == 6:
-        ret = key, ("a3", parts[3], parts[4], parts[5])
-    elif l == 7:
-        ret = key, ("ai", parts[3], parts[4], parts[5])
-    elif l == 8:
-        ret = key, ("m")
-        ret = None
-    else: assert(False)
-    return ret
+    Raises ValueError if encounters an invalid line.
+    """
+    entry = parse_applicant_line(line)
+    if entry.status == 'm':
+        return None
+    return entry.name, (entry.status,) + entry.dates
 
 
 def parse_sponsor_data_line(line):
@@ -245,58 +466,36 @@ def parse_sponsor_data_line(line):
     returns a 2 tuple: (for subsequent use as a key/value pair)
     t1 is "last, first" name
     t2 is a tuple of sponsors ('first last')
-    Fails if encounters an invalid line!!!
-    """
-    parts = line.split(":")
-    sponsored = parts[0].strip()
-    names = sponsored.split()
-    name = '{}, {}'.format(names[1], names[0])
-    part2 = parts[1]
-    sponsors = tuple([
-        sponsor.strip() for sponsor in parts[1].split(", ")])
-    ret = name, sponsors
-#   print("Parse line returning {}".format(repr(ret)))
-    return ret
-# above replaces ?buggy? following code
-    parts = line.split(":")
-    sponsored = parts[0].strip()
-    names = sponsored.split()
-    name = '{}, {}'.format(names[1], names[0])
-    sponsors = tuple([
-        sponsor.strip() for sponsor in parts[1].split(", ")])
-    key, value = name, sponsors
-    return (key, value)
+    Raises ValueError if encounters an invalid line.
+    """
+    return tuple(parse_sponsor_line(line))
 
 
-def get_sponsor_data(spot):
+def read_sponsor_data(spot):
+    """
+    Does the parsing for get_sponsor_data: returns the dict along
+    with a list of the ParseErrors.
+    """
+    errors = []
+    return ({entry.name: entry.sponsors
+             for entry in parse_lines(spot, parse_sponsor_line, errors)},
+            errors)
+
+
+def get_sponsor_data(spot, errors=None):
     """
     Returns a dict: keys are '2nd, 1st' names,
                     values are tuples of sponsors.
+    Lines which can't be parsed are skipped (and added, as
+    ParseErrors, to <errors> if it's provided.)
     """
-    ret = {}
-    with open(spot, 'r') as src:
-        print('Reading file "{}"...'.format(src.name))
-#       lines = [
-#           line for line in helpers.useful_lines(src, comment='#')]
-#       for line in lines:
-        for line in helpers.useful_lines(src, comment='#'):
-#           print("Line is '{}".format(line))
-            tup = parse_sponsor_data_line(line)
-#           print("tup is {}".format(repr(tup)))
-            (name, sponsors) = (tup[0], tup[1])
-            ret[name] = sponsors
-    return ret
-# Above replaces the following ?buggy? code
-    ret = {}
-    with open(spot, 'r') as src:
-        print('Reading file "{}"...'.format(src.name))
-        for name, sponsors in parse_sponsor_data_line(
-                            helpers.useful_lines(src, comment='#')):
-            ret[name] = sponsors
+    ret, spot_errors = read_sponsor_data(spot)
+    if errors is not None:
+        errors.extend(spot_errors)
     return ret
 
 
-def get_applicant_data(spot, sponsor_file=None):
+def get_applicant_data(spot, sponsor_file=None, errors=None):
     """
     Reads spot, the applicant data file +/- the sponsor file.
     Returns a dict keyed by applicant names ("last, first").
@@ -308,32 +507,37 @@ def get_applicant_data(spot, sponsor_file=None):
         "dates" (value a string of dates) and (if 'sponsor_file)
         "sponsors" (value a tuple of strings- names of sponsors.
     UNDER DEVELOPMENT_ TO REPLACE gather_applicant_data().
-    Will probably want to change "dates" value to a tuple (vs string
-    of dates) to be consistent with "sponsors".
+    Lines which can't be parsed are skipped (and added, as
+    ParseErrors, to <errors> if it's provided.)
     """
-    ret = {}
-    with open(spot, 'r') as src:
-        print('Reading file "{}"...'.format(src.name))
-        if sponsor_file:
-            sponsors = get_sponsor_data(sponsor_file)
-            sponsored_members = sponsors.keys()
-        for line in helpers.useful_lines(src, comment='#'):
-            res = parse_applicant_data_line(line)  # Returns None
-            if res: key, value = res               # if no longer
-            else: continue                         # an applicant.
-#           print("app_data: {} {}".format(key, repr(value)))
-            status = value[0]
-            if status.startswith('z'):
-                continue
-            ret[key] = {'status': status}
-            if len(value) > 1:  # active applicant
-                ret[key]['dates'] = value[1:]
-        for applicant in ret.keys():
-            if sponsor_file and 'dates' in ret[applicant].keys():
-                ret[applicant]["sponsors"] = sponsors[applicant]
+    ret, spot_errors = read_applicant_data(spot, sponsor_file)
+    if errors is not None:
+        errors.extend(spot_errors)
     return ret
 
 
+def read_applicant_data(spot, sponsor_file=None):
+    """
+    Does the parsing for get_applicant_data: returns the dict along
+    with a list of the ParseErrors (those of <sponsor_file> too.)
+    """
+    ret = {}
+    errors = []
+    sponsor_errors = []
+    if sponsor_file:
+        sponsors = get_sponsor_data(sponsor_file, sponsor_errors)
+    for entry in parse_lines(spot, parse_applicant_line, errors):
+        if entry.status == 'm' or entry.status.startswith('z'):
+            continue  # no longer an applicant.
+        ret[entry.name] = {'status': entry.status}
+        if entry.dates:  # active applicant
+            ret[entry.name]['dates'] = entry.dates
+    for applicant in ret.keys():
+        if sponsor_file and 'dates' in ret[applicant].keys():
+            ret[applicant]["sponsors"] = sponsors[applicant]
+    return ret, errors + sponsor_errors
+
+
 def get_applicants_by_status(applicant_data):
     """
     Param is what's returned by get_applicant_data.
@@ -378,7 +582,7 @@ def gather_applicant_data(in_file,
                 continue
             names = parts[0].split()
             if len(names) == 2:
-                name = ", ".join((names[1], names[0]))
+                name = member.name_key(names[1], names[0])
                 parts = parts[1:]
                 if not parts:
                     status = 'zaa'
@@ -442,58 +646,266 @@ def get_sponsors(infile):
     """
     Read file typified by Data/sponsors.txt
     and return a dict keyed by 'last, first' names
-    with each value a list of sponsors.
+    with each value a (', ' separated) listing of sponsors.
     """
-    ret = {}
-    with open(infile, 'r') as source:
-        print('Reading file "{}"...'.format(source.name))
-        for line in helpers.useful_lines(source, comment='#'):
-            parts = line.split(':')
-            names = parts[0].split()
-            name = "{}, {}".format(names[1], names[0])
-            try:
-                sponsors = parts[1].split(',')
-            except IndexError:
-                print("IndexError: {} sponsors???".format(name))
-                sys.exit()
-            sponsors = ', '.join(
-                [sponsor.strip() for sponsor in sponsors])
-            ret[name] = sponsors
-    return ret
+    return {entry.name: ', '.join(entry.sponsors)
+            for entry in parse_lines(infile, parse_sponsor_line)}
+
+
+APPLICANT_EVENTS = ("applied", "fee_paid",
+                    "meeting1", "meeting2", "meeting3",
+                    "inducted")  # in order of the applicant SPoT fields
+
+
+def parse_spot_date(date_string):
+    """
+    Returns a datetime.date for a SPoT date ('yymmdd' or 'yyyymmdd')
+    or None if it isn't one (eg: '??????'.)
+    """
+    try:
+        if len(date_string) == 6:
+            return datetime.datetime.strptime(date_string,
+                                              "%y%m%d").date()
+        if len(date_string) == 8:
+            return datetime.datetime.strptime(date_string,
+                                              "%Y%m%d").date()
+    except ValueError:
+        pass
+    return None
+
+
+def parse_applicant_events(line):
+    """
+    Returns (ApplicantEntry, events) for a line of the applicant
+    SPoT: events is a tuple of dates (or None) one for each of the
+    APPLICANT_EVENTS.
+    Raises ValueError if <line> can't be parsed.
+    """
+    entry = parse_applicant_line(line)
+    fields = [field.strip() for field in line.split(glbs.SEPARATOR)]
+    fields = fields[1:len(APPLICANT_EVENTS) + 1]
+    fields.extend([''] * (len(APPLICANT_EVENTS) - len(fields)))
+    return entry, tuple(parse_spot_date(field) for field in fields)
+
+
+class ApplicantTimeline(object):
+    """
+    The dates (datetime.date) of the events (see APPLICANT_EVENTS)
+    of each applicant listed in the applicant SPoT, each parsed
+    only once. Current applicants are also kept sorted by the date
+    of their last event so 'stalled' is a binary search.
+    """
+
+    def __init__(self, entries):
+        """
+        <entries>: (ApplicantEntry, events) as returned by
+        parse_applicant_events.
+        """
+        self.status = {}
+        self.events = {}
+        for entry, events in entries:
+            self.status[entry.name] = entry.status
+            self.events[entry.name] = events
+        pairs = sorted((max(date for date in self.events[name] if date),
+                        name) for name in self.active()
+                       if any(self.events[name]))
+        self.last_event = ([date for date, _ in pairs],
+                           [name for _, name in pairs])
+
+    def active(self):
+        """
+        Returns the names of current applicants: not yet members
+        nor with an expired (or withdrawn) application.
+        """
+        return sorted(name for name, status in self.status.items()
+                      if status != 'm' and not status.startswith('z'))
+
+    def meetings(self, name):
+        """
+        Returns the dates of the meetings <name> has attended.
+        """
+        return tuple(date for date in self.events[name][2:5] if date)
+
+    def stalled(self, days=183, as_of=None):
+        """
+        Returns (sorted) the names of current applicants with
+        nothing recorded for more than <days> before <as_of>
+        (default: today.)
+        """
+        if as_of is None:
+            as_of = datetime.date.today()
+        dates, names = self.last_event
+        cutoff = as_of - datetime.timedelta(days=days)
+        return sorted(names[:bisect.bisect_left(dates, cutoff)])
+
+
+def get_applicant_timeline(spot):
+    """
+    Returns the ApplicantTimeline of the applicant SPoT <spot>.
+    Lines which can't be parsed are skipped: see ck_spot_errors.
+    """
+    return ApplicantTimeline(parse_lines(spot, parse_applicant_events))
 
 
 def get_meeting_dates(infile):
     """
-    Returns a dict keyed by member name with each value
-    being a list of dates of meetings attended.
+    Returns a dict keyed by (current) applicant name with each
+    value being a (', ' separated) listing of dates of meetings
+    attended. See get_applicant_timeline.
     """
-    ret = {}
-    with open(infile, 'r') as file_obj:
-        print("Reading {}...".format(file_obj.name))
-        for line in file_obj:
-            res = parse_applicant_line4dates(line)
-            #                                 ,
-            #                                 bad_line_list,
-            #                                 expired_applicant_list,
-            #                                 former_applicant_list)
-            if res:
-                ret[res[0]] = ', '.join(
-                    [helpers.expand_date(date) for date in res[1]])
-
-    # if sponsor_file:
-    #    sponsors = gather_sponsors(sponsor_file)
-    #    for key in sponsors:
-    #        ret[key]['sponsors'] = sponsors[key]
-    return ret
+    timeline = get_applicant_timeline(infile)
+    return {name: ', '.join(date.isoformat()
+                            for date in timeline.meetings(name))
+            for name in timeline.active()}
 
 
-def gather_extra_fees_data(extra_fees_spot, json_file=None):
+class ExtraFees(collections.abc.Mapping):
     """
-    Reads in_file and returns a dict with keys:
+    The fees listed in an extra fees SPoT: <entries> is a tuple of
+    FeeEntry (in file order.) The two views:
         Club.NAME_KEY: a dict keyed by name with
-            each a set of (category, amount) tuples[1].
+            each a list of (category, amount) tuples.
         Club.CATEGORY_KEY: a dict keyed by category with
-            each a set of (last_first, amount) tuples.
+            each a list of (last_first, amount) tuples.
+    are only built when first asked for (as attributes or by key,
+    as from the dict gather_extra_fees_data used to return.)
+    Instances are shared (see get_extra_fees) so the views must not
+    be modified.
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self._by_name = None
+        self._by_category = None
+
+    @property
+    def by_name(self):
+        if self._by_name is None:
+            by_name = {}
+            for entry in self.entries:
+                _ = by_name.setdefault(entry.name, [])
+                by_name[entry.name].append((entry.category,
+                                            entry.amount))
+            self._by_name = by_name
+        return self._by_name
+
+    @property
+    def by_category(self):
+        if self._by_category is None:
+            by_category = {category: [] for category in FEE_CATEGORIES}
+            for entry in self.entries:
+                by_category[entry.category].append((entry.name,
+                                                    entry.amount))
+            self._by_category = by_category
+        return self._by_category
+
+    def __getitem__(self, key):
+        if key == Club.NAME_KEY:
+            return self.by_name
+        if key == Club.CATEGORY_KEY:
+            return self.by_category
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter((Club.NAME_KEY, Club.CATEGORY_KEY))
+
+    def __len__(self):
+        return 2
+
+
+_extra_fees = {}  # keyed by file name: (signature, ExtraFees)
+
+
+def get_extra_fees(extra_fees_spot,
+                   compiled_file=Club.EXTRA_FEES_COMPILED, errors=None):
+    """
+    Returns the ExtraFees of <extra_fees_spot>: parsed only once per
+    process (unless the file changes.) Also kept in <compiled_file>
+    (json: the entries and ParseErrors along with the size, mtime
+    and hash of the file they came from) which is used in place of
+    parsing when it matches the file. Quietly does without it if it
+    can't be used; an existing file not of this format is never
+    overwritten.
+    Lines which can't be parsed are added, as ParseErrors, to
+    <errors> if it's provided.
+    """
+    stat = os.stat(extra_fees_spot)
+    signature = (os.path.abspath(extra_fees_spot),
+                 stat.st_mtime_ns, stat.st_size)
+    memo = _extra_fees.get(extra_fees_spot)
+    if memo and memo[0] == signature:
+        extra_fees, spot_errors = memo[1:]
+    else:
+        extra_fees, spot_errors = read_compiled_extra_fees(
+            extra_fees_spot, signature, compiled_file)
+        _extra_fees[extra_fees_spot] = (signature, extra_fees,
+                                        spot_errors)
+    if errors is not None:
+        errors.extend(spot_errors)
+    return extra_fees
+
+
+def read_compiled_extra_fees(extra_fees_spot, signature, compiled_file):
+    """
+    Returns (ExtraFees, ParseErrors) for get_extra_fees: from
+    <compiled_file> if it matches the <signature> (or content) of
+    <extra_fees_spot>, otherwise by parsing it (and then updating
+    <compiled_file>.)
+    """
+    compiled = {}
+    if compiled_file:
+        try:
+            with open(compiled_file, 'r') as file_obj:
+                compiled = json.load(file_obj)
+        except OSError:  # Not there (yet.)
+            pass
+        except ValueError:
+            compiled = None
+        else:
+            if not (isinstance(compiled, dict)
+                    and "signature" in compiled):
+                compiled = None
+        if compiled is None:  # Someone else's file: leave it be.
+            compiled_file = None
+            compiled = {}
+    usable = "errors" in compiled  # Written before errors were kept?
+    if usable and compiled.get("signature") == list(signature):
+        return (ExtraFees(FeeEntry(*entry)
+                          for entry in compiled["entries"]),
+                [ParseError(*error) for error in compiled["errors"]])
+    sha1 = snapshot.file_hash(extra_fees_spot)
+    if (usable and compiled.get("sha1") == sha1
+            and compiled.get("spot") == signature[0]):
+        extra_fees = ExtraFees(FeeEntry(*entry)
+                               for entry in compiled["entries"])
+        spot_errors = [ParseError(*error)
+                       for error in compiled["errors"]]
+    else:
+        spot_errors = []
+        extra_fees = read_extra_fees(extra_fees_spot, spot_errors)
+    if compiled_file:
+        try:
+            with open(compiled_file, 'w') as file_obj:
+                json.dump(dict(spot=signature[0],
+                               signature=signature,
+                               sha1=sha1,
+                               entries=extra_fees.entries,
+                               errors=spot_errors),
+                          file_obj)
+        except OSError:
+            pass
+    return extra_fees, spot_errors
+
+
+def gather_extra_fees_data(extra_fees_spot, json_file=None,
+                           errors=None):
+    """
+    Reads in_file and returns an ExtraFees instance: can be used
+    as a dict with keys:
+        Club.NAME_KEY: a dict keyed by name with
+            each a list of (category, amount) tuples[1].
+        Club.CATEGORY_KEY: a dict keyed by category with
+            each a list of (last_first, amount) tuples.
 
     Input file must have three header lines each containing
     one of the following words: Mooring, Dock, Kayak,
@@ -505,47 +917,23 @@ def gather_extra_fees_data(extra_fees_spot, json_file=None):
     [1] The 'by_name' component can be converted so that its
     values are all a single string using the json_fees_by_name
     function.
+    The file is only parsed once: see get_extra_fees (also re
+    <errors>.)
     """
-    by_name = {}
-    by_category = dict(  # json version of input file
-        Kayak=[],
-        Dock=[],
-        Mooring=[],
-        )
-    categories = [key for key in by_category.keys()]
-
-    with open(extra_fees_spot, 'r') as f_obj:
-        print('Reading file "{}"...'.format(f_obj.name))
-        category = ""
-        for line in helpers.useful_lines(f_obj, comment='#'):
-            category_change = False
-            if line[-1] == ':':  # line ending in ':' means
-                                 # there's been acategory change
-                words = line[:-1].split()
-                for word in words:
-                    if word in categories:
-                        category = word
-                        category_change = True
-                        continue
-            else:  # Expect a name with fee for current category...
-#               print("line: {}".format(line))
-                parts = line.split(':')
-                fee = int(parts[1])
-                names = parts[0].split()
-                first_name = names[0]
-                last_name = names[1]
-                name_key = "{}, {}".format(last_name, first_name)
-                _ = by_name.setdefault(name_key, [])
-                _ = by_category.setdefault(category, [])
-                by_name[name_key].append((category, fee))
-                by_category[category].append((name_key, fee))
+    extra_fees = get_extra_fees(extra_fees_spot, errors=errors)
     if json_file:
-        helpers.dump2json_file(by_name, json_file, verbose=True)
+        helpers.dump2json_file(extra_fees[Club.NAME_KEY], json_file,
+                               verbose=True)
     #   else:
     #       print("No json file specified.")
-    return {Club.NAME_KEY: by_name,
-            Club.CATEGORY_KEY: by_category,
-            }
+    return extra_fees
+
+
+def read_extra_fees(extra_fees_spot, errors=None):
+    """
+    Does the parsing for get_extra_fees (which see.)
+    """
+    return ExtraFees(parse_fee_lines(extra_fees_spot, errors))
 
 
 def gather_sponsors(infile):
@@ -558,8 +946,7 @@ def gather_sponsors(infile):
     with open(infile, 'r') as file_obj:
         for line in helpers.useful_lines(file_obj, comment='#'):
             parts = line.split(':')
-            names = parts[0].split()
-            name = "{}, {}".format(names[1], names[0])
+            name = member.name_key_from_words(parts[0])
             sponsors = parts[1].strip()
             ret[name] = sponsors
     return ret
@@ -713,174 +1100,304 @@ def ck_applicants(
 '''
 
 
-def ck_data(club,
-            fee_details=False):
+def load_ck_data_sources(club):
     """
-    Check integrity/consistency of of the Club's data bases:
-    1.  MEMBERSHIP_SPoT  # the main club data base
-    2.  CONTACTS_SPoT    # csv downloaded from gmail
-    3.  APPLICANT_SPoT   #
-    4.  SPONSORS_SPoT    #
-    5.  EXTRA_FEES_SPoT  #
-        ...
-    The first 4 of the above all contain applicant data
-    and must be checked for consistency.
-    Data in each of the 2nd and 5th are compared with
-    the first and checked.
-    Returns a report in the form of an array of lines.
-    <fee_details> if set to True extends the output to include
-    any discrepencies between what's billed each year vs what is
-    still owed; expected after payments begin to come in.
+    Runs the loaders ck_data depends on concurrently (in threads so
+    the club attributes populated by gather_membership_data remain
+    visible) and waits for them all.
+    Sets up the club attributes of gather_membership_data and
+    gather_contacts_data and returns a dict of what isn't kept by
+    <club>: "extra_fees" (see gather_extra_fees_data),
+    "applicants" (see get_applicants_by_status) and "spot_errors"
+    (the ParseErrors of the applicant, sponsor and extra fees SPoTs,
+    collected as they're read, in that order.)
+    """
+    applicant_errors, sponsor_errors, fee_errors = [], [], []
+    with concurrent.futures.ThreadPoolExecutor(5) as executor:
+        membership = executor.submit(gather_membership_data, club)
+        contacts = executor.submit(load_contacts_data,
+                                   club.CONTACTS_SPoT)
+        extra_fees = executor.submit(gather_extra_fees_data,
+                                     club.extra_fees_spot, None,
+                                     fee_errors)
+        applicants = executor.submit(get_applicant_data,
+                                     club.APPLICANT_SPoT, None,
+                                     applicant_errors)
+        sponsors = executor.submit(get_sponsor_data,
+                                   club.SPONSORS_SPoT, sponsor_errors)
+        membership.result()
+        (club.gmail_by_name, club.groups_by_name, club.g_by_group,
+         ) = contacts.result()
+        sponsors.result()  # Only read for its errors.
+        return dict(
+            extra_fees=extra_fees.result(),
+            applicants=get_applicants_by_status(applicants.result()),
+            spot_errors=applicant_errors + sponsor_errors + fee_errors,
+            )
+
+
+def ck_gmail_groups(club, sources, fee_details):
+    """
+    Checks that google groups match club data.
+    Each of the ck_... functions (see CK_DATA_CHECKS) returns a
+    dict with any of the following keys:
+        "problems": lines to report,
+        "ok": what was found to be in order,
+        "notice": an acceptable inconsistency,
+        "disparities": lines detailing fee amounts that differ,
+        "diffs": keyed_diff results (see helpers.keyed_diff.)
+    They only read <club> and <sources> (so the order in which they
+    are run doesn't matter.)
     """
-    ret = []
-    ok = []
-    temp_list = []
-    varying_amounts = []
-    helpers.add_header2list("Report Regarding Data Integrity",
-                            ret, underline_char='#', extra_line=True)
-    # Collect data from csv files ==> club attributes:
-    gather_membership_data(club)
-    gather_contacts_data(club)  # Sets up and populates:
-    # club.gmail_by_name (string)
-    # club.groups_by_name (set)     # club.g_by_group (set)
-
-
-    ## First check that google groups match club data:
     # Deal with applicants...
-    applicant_missmatches = helpers.check_sets(
-        club.g_by_group['applicant'],
+    applicant_missmatches = club.g_by_group.check_sets(
+        club.APPLICANT_GROUP,
         club.applicant_with_email_set,
         "Applicant(s) in Google Contacts not in Member Listing",
         "Applicant(s) in Member Listing not in Google Contacts"
         )
     # Deal with members...
-    member_missmatches = helpers.check_sets(
-        club.g_by_group['LIST'],
+    member_missmatches = club.g_by_group.check_sets(
+        club.MEMBER_GROUP,
         club.member_with_email_set,
         "Member(s) in Google Contacts not in Member Listing",
         "Member(s) in Member Listing not in Google Contacts"
         )
-
     if applicant_missmatches or member_missmatches:
+        problems = []
         helpers.add_header2list(
             "Missmatch: Gmail groups vs Club data",
-            ret, underline_char='=', extra_line=True)
-        ret.extend(member_missmatches + applicant_missmatches)
-    else:
-        ok.append("No Google Groups vs Member/Applicant Missmatch.")
+            problems, underline_char='=', extra_line=True)
+        return dict(problems=problems +
+                    member_missmatches + applicant_missmatches)
+    return dict(ok=["No Google Groups vs Member/Applicant Missmatch."])
+
 
-    # Collect data from custom files ==> local variables
-    extra_fees_info = gather_extra_fees_data(club.extra_fees_spot)
-    a_applicants = get_applicants_by_status(
-        get_applicant_data(club.APPLICANT_SPoT))
+def ck_spot_errors(club, sources, fee_details):
+    """
+    Reports lines of the text SPoTs which couldn't be parsed.
+    """
+    if not sources["spot_errors"]:
+        return dict(ok=["No unparsable SPoT lines."])
+    problems = []
+    helpers.add_header2list("Unparsable SPoT Lines", problems,
+                            underline_char='=', extra_line=True)
+    problems.extend("{}:{}: {} ({})".format(*error)
+                    for error in sources["spot_errors"])
+    return dict(problems=problems)
 
-    # Deal with MEMBERSHIP data-
-    # First check for malformed records:
+
+def ck_malformed(club, sources, fee_details):
+    """
+    Checks for malformed membership records.
+    """
     if not club.malformed:
-        ok.append("No malformed records found.")
-    else:
-        print("Found Malformed Records.")
-        helpers.add_sub_list("Malformed Records", club.malformed, ret)
+        return dict(ok=["No malformed records found."])
+    print("Found Malformed Records.")
+    problems = []
+    helpers.add_sub_list("Malformed Records", club.malformed, problems)
+    return dict(problems=problems)
 
 
-    # Compare gmail vs memlist emails and then memlist vs gmail
-    # now that both listings have names rather than sets of names:
-    email_problems = []
-    missing_emails = []
-    non_member_contacts = []
-    emails_missing_from_contacts = []
-    common_emails = []
+def get_contact_emails(club):
+    """
+    Returns the set of (canonical) emails of the gmail contacts.
+    """
+    return {member.canonical_email(email)
+            for email in club.gmail_by_name.values()}
+
 
+def ck_emails_missing_from_contacts(club, sources, fee_details):
+    """
+    Compares memlist (member) emails with those of gmail contacts.
+    Emails are compared in their canonical form (see
+    member.canonical_email) but reported as found in memlist
+    (club.email_by_m.)
+    """
+    contact_emails = get_contact_emails(club)
+    emails_missing_from_contacts = [
+        "{}: {}".format(name, club.email_by_m.get(name, email))
+        for email, names in club.ms_by_email.items()
+        if email != member.NO_EMAIL_KEY and email not in contact_emails
+        for name in names if name in club.member_with_email_set]
     if emails_missing_from_contacts:
+        problems = []
         helpers.add_sub_list("Emails Missing from Google Contacts",
-                             emails_missing_from_contacts, ret)
-    else:
-        ok.append("No emails missing from gmail contacts.")
+                             emails_missing_from_contacts, problems)
+        return dict(problems=problems)
+    return dict(ok=["No emails missing from gmail contacts."])
 
 
-    g_members = club.g_by_group[club.MEMBER_GROUP]
-    g_applicants = club.g_by_group[club.APPLICANT_GROUP]
-#   keys = [key for sorted(key in club.ms_by_status.keys())]
-    keys = sorted(club.ms_by_status.keys(), reverse=True)
-#   temp_ret = []
-    for key in keys:
-        if not (key in member.APPLICANT_SET):
-            val = (club.ms_by_status.pop(key))
-#           temp_ret.append(key)
-#   if temp_ret:
-#       ret.append("\nNon Applicant Stati: {}"
-#           .format(','.join(temp_ret)))
-    a_applicantsets = helpers.lists2sets(a_applicants)
-    ms_by_statusets = helpers.lists2sets(club.ms_by_status)
-    if a_applicantsets != ms_by_statusets:
-        ret.append("\nApplicant problem:")
-        ret.append("The following data from applicant SPoT-")
-        ret.extend(helpers.show_dict(a_applicants, extra_line=False))
-        ret.append("- does not match the following membership SPot-")
-        ret.extend(helpers.show_dict(club.ms_by_status,
-                   extra_line=False))
-        ret.append("- End of comparison -")
-    else:
-        ok.append("No applicant problem.")
+def ck_shared_emails(club, sources, fee_details):
+    """
+    Reports emails (compared in canonical form) shared by more than
+    one record of the membership SPoT, each name followed by its
+    email as found in memlist (club.email_by_m.)
+    """
+    shared = member.get_shared_emails(club.ms_by_email)
+    if shared:
+        problems = []
+        helpers.add_sub_list(
+            "Emails Shared by More than One Record",
+            ['; '.join("{} <{}>".format(name,
+                                        club.email_by_m.get(name, email))
+                       for name in sorted(names))
+             for email, names in shared.items()], problems)
+        return dict(problems=problems)
+    return dict(ok=["No emails shared by more than one record."])
 
+
+def ck_applicants(club, sources, fee_details):
+    """
+    Compares the applicant SPoT with the applicant stati of the
+    membership SPoT. (club.ms_by_status is left as is.)
+    """
+    a_applicants = sources["applicants"]
+    m_applicants = {key: value for key, value
+                    in club.ms_by_status.items()
+                    if key in member.APPLICANT_SET}
+    if (helpers.lists2sets(a_applicants) !=
+            helpers.lists2sets(m_applicants)):
+        problems = ["\nApplicant problem:",
+                    "The following data from applicant SPoT-"]
+        problems.extend(helpers.show_dict(a_applicants,
+                                          extra_line=False))
+        problems.append("- does not match the following membership SPot-")
+        problems.extend(helpers.show_dict(m_applicants, extra_line=False))
+        problems.append("- End of comparison -")
+        return dict(problems=problems)
+    return dict(ok=["No applicant problem."])
+
+
+def ck_non_member_contacts(club, sources, fee_details):
+    """
+    Checks that the email of each contact in the gmail members'
+    group (club.MEMBER_GROUP) is that of a member.
+    Emails are compared in their canonical form but reported as
+    found in the contacts.
+    """
+    non_member_contacts = []
+    for name in club.g_by_group.get(club.MEMBER_GROUP, set()):
+        email = club.gmail_by_name.get(name, '')
+        if not any(m_name in club.member_with_email_set
+                   for m_name in club.ms_by_email.get(
+                       member.canonical_email(email), ())):
+            non_member_contacts.append("{}: {}".format(name, email))
     if non_member_contacts:
+        problems = []
         helpers.add_sub_list(
             "Contacts without a corresponding Member email",
-            non_member_contacts, ret)
-    else:
-        ok.append('No contacts that are not members.')
+            non_member_contacts, problems)
+        return dict(problems=problems)
+    return dict(ok=['No contacts that are not members.'])
 
-    # Now check fees: mem list vs extra fees SPoT
-    # Keep in mind that after payment amounts won't match
+
+def ck_fees_by_category(club, sources, fee_details):
+    """
+    Checks fees (by category): mem list vs extra fees SPoT.
+    Keep in mind that after payment amounts won't match.
+    """
+    diff = helpers.keyed_diff(sources["extra_fees"][club.CATEGORY_KEY],
+                              club.ms_by_fee_category)
+    diffs = dict(fees_by_category=diff)
+    if not any(diff.values()):
+        return dict(ok=["No fees by category problem."], diffs=diffs)
+    if not (diff["missing_left"] or diff["missing_right"]):
+        # traverse keys and report by name later
+        return dict(notice="Fee amounts (by category) don't match",
+                    diffs=diffs)
+    return dict(problems=["\nFees problem (by fee category):"] +
+                helpers.diff_lines(diff, "extra fees SPoT",
+                                   "membership SPoT"),
+                diffs=diffs)
+
+
+def ck_fees_by_name(club, sources, fee_details):
+    """
+    Checks fees (by name): mem list vs extra fees SPoT.
+    Amounts that differ are only itemized if <fee_details>.
+    """
+    diff = helpers.keyed_diff(sources["extra_fees"][club.NAME_KEY],
+                              club.fee_category_by_m)
+    diffs = dict(fees_by_name=diff)
+    if not any(diff.values()):
+        return dict(ok=["No fees by name problem."], diffs=diffs)
+    if not (diff["missing_left"] or diff["missing_right"]):
+        if not fee_details:
+            return dict(notice=(
+                "Fee amounts don't match (try -d option for details)"),
+                diffs=diffs)
+        # specify which amounts don't match
+        return dict(notice="Fee amounts don't match",
+                    disparities=helpers.diff_lines(diff),
+                    diffs=diffs)
+    return dict(problems=["\nFees problem (by name):"] +
+                helpers.diff_lines(diff, "extra fees SPoT",
+                                   "membership SPoT"),
+                diffs=diffs)
+
+
+# The order in which the checks are reported:
+CK_DATA_CHECKS = (
+    ck_gmail_groups,
+    ck_spot_errors,
+    ck_malformed,
+    ck_emails_missing_from_contacts,
+    ck_shared_emails,
+    ck_applicants,
+    ck_non_member_contacts,
+    ck_fees_by_category,
+    ck_fees_by_name,
+    )
+
+
+def ck_data(club,
+            fee_details=False,
+            json_file=None):
+    """
+    Check integrity/consistency of of the Club's data bases:
+    1.  MEMBERSHIP_SPoT  # the main club data base
+    2.  CONTACTS_SPoT    # csv downloaded from gmail
+    3.  APPLICANT_SPoT   #
+    4.  SPONSORS_SPoT    #
+    5.  EXTRA_FEES_SPoT  #
+        ...
+    The first 4 of the above all contain applicant data
+    and must be checked for consistency.
+    Data in each of the 2nd and 5th are compared with
+    the first and checked.
+    Returns a report in the form of an array of lines.
+    <fee_details> if set to True extends the output to include
+    any discrepencies between what's billed each year vs what is
+    still owed; expected after payments begin to come in.
+    The files are loaded concurrently (see load_ck_data_sources)
+    and then the checks listed in CK_DATA_CHECKS are run in turn;
+    their reports are merged in the order listed.
+    If <json_file> is provided the (machine readable) fee diffs are
+    written to it.
+    """
+    ret = []
+    ok = []
     not_matching_notice = ''
-    if (extra_fees_info[club.CATEGORY_KEY] !=
-            club.ms_by_fee_category):
-        club_keys = set(extra_fees_info[club.CATEGORY_KEY].keys())
-        file_keys = set(club.ms_by_fee_category.keys())
-        if club_keys == file_keys:
-            not_matching_notice = (
-                "Fee amounts (by category) don't match")
-            # traverse keys and report by name later
-        else:
-            ret.append("\nFees problem (by fee category):")
-            ret.append("extra_fees_info[club.CATEGORY_KEY]:")
-            ret.append(repr(extra_fees_info[club.CATEGORY_KEY]))
-            ret.append("###  !=  ###")
-            ret.append("club.ms_by_fee_category:")
-            ret.append(repr(club.ms_by_fee_category))
-    else:
-        ok.append("No fees by category problem.")
-
-    if (extra_fees_info[club.NAME_KEY] != club.fee_category_by_m):
-        club_keys = set(extra_fees_info[club.NAME_KEY].keys())
-        file_keys = set(club.fee_category_by_m.keys())
-        if club_keys == file_keys:
-            if fee_details:
-                not_matching_notice = "Fee amounts don't match"
-                # traverse keys and specify which amounts don't match
-                club_keys = sorted([key for key in club_keys])
-                for key in club_keys:
-                    if (extra_fees_info[club.NAME_KEY][key] !=
-                            club.fee_category_by_m[key]):
-                        varying_amounts.append('{}: {} != {}'.format(
-                                key,
-                                extra_fees_info[club.NAME_KEY][key],
-                                club.fee_category_by_m[key]
-                                ))
-            else:
-                not_matching_notice = (
-                    "Fee amounts don't match (try -d option for details)")
-        else:
-            print(sorted(club_keys))
-            print(sorted(file_keys))
-            ret.append("\nFees problem (by name):")
-            ret.append("extra_fees_info[club.NAME_KEY]:")
-            ret.append(repr(extra_fees_info[club.NAME_KEY]))
-            ret.append("###  !=  ###")
-            ret.append("club.fee_category_by_m:")
-            ret.append(repr(club.fee_category_by_m))
-    else:
-        ok.append("No fees by name problem.")
+    varying_amounts = []
+    diffs = {}
+    helpers.add_header2list("Report Regarding Data Integrity",
+                            ret, underline_char='#', extra_line=True)
+    # Collect data from csv files ==> club attributes
+    # and from custom files ==> sources:
+    sources = load_ck_data_sources(club)
+    for check in CK_DATA_CHECKS:
+        report = check(club, sources, fee_details)
+        ret.extend(report.get("problems", []))
+        ok.extend(report.get("ok", []))
+        not_matching_notice = (report.get("notice") or
+                               not_matching_notice)
+        varying_amounts.extend(report.get("disparities", []))
+        diffs.update(report.get("diffs", {}))
+    if json_file:
+        with open(json_file, 'w') as json_obj:
+            print('Writing diffs to "{}".'.format(json_obj.name))
+            json.dump(diffs, json_obj, indent=2)
 
     if ok:
         helpers.add_sub_list("No Problems with the Following", ok, ret)
@@ -894,29 +1411,17 @@ def ck_data(club,
             "Fee Disparities: probably some have paid",
             ret, underline_char='-', extra_line=True)
         ret.extend(varying_amounts)
-#   if True:
-    if False:
-        ret.append("\nFees problem (by fee category):")
-        ret.append("extra_fees_info[club.CATEGORY_KEY]:")
-        ret.append(repr(extra_fees_info[club.CATEGORY_KEY]))
-        ret.append("###  !=  ###")
-        ret.append("club.ms_by_fee_category:")
-        ret.append(repr(club.ms_by_fee_category))
-        ret.append("\nFees problem (by name):")
-        ret.append("extra_fees_info[club.NAME_KEY]:")
-        ret.append(repr(extra_fees_info[club.NAME_KEY]))
-        ret.append("###  !=  ###")
-        ret.append("club.fee_category_by_m:")
-        ret.append(repr(club.fee_category_by_m))
     return ret
 
 
 def restore_fees(club):
     """
-    Sets up and leaves a new list of records in club.new_db:
-    Dues and relevant fees are applied to each member's record.
+    Writes a new version of the membership data base (club.infile)
+    into club.outfile: dues and relevant fees are applied to each
+    member's record as it streams through (see pipeline.py.)
     Also populates the following:
-        <club.name_set>   
+        <club.non0balance>
+        <club.name_set>
         <club.errors>
     The <club.errors> list is populated by names that are found
     in the <fees_json_file> but not in the <membership_csv_file>.
@@ -928,17 +1433,26 @@ def restore_fees(club):
     print(
         "  1st check that no one is still owing ...")
     club.errors = []
-    club.new_db = []
-    club.non0balance = {}
-    club.name_set = set()
+    columns = money.load_columns(club.infile)  # see money.py
+    club.non0balance = money.get_non0balance(columns)
+    owing = money.still_owing(columns)
+    if owing:
+        warning = "{} member(s) still owing a total of ${}:".format(
+            len(owing), money.get_totals(columns)['total'][0])
+        print(warning)
+        club.errors.append(warning)
+        club.errors.extend("\t" + name for name in owing)
     club.by_name = gather_extra_fees_data(club.extra_fees_spot
                                          )[Club.NAME_KEY]
     club.extra_fee_names = set([key for key in club.by_name.keys()])
-    err_code = member.traverse_records(club.infile, (
-        member.populate_non0balance_func,
-        member.populate_name_set_func,
-        member.add_dues_fees2new_db_func,
-        ), club)
+    club.name_set = set()
+    n = pipeline.csv_sink(
+        pipeline.pipe(pipeline.csv_source(club.infile),
+                      pipeline.tee(member.populate_name_set_func, club),
+                      pipeline.map_with(member.add_dues_fees, club)),
+        club.outfile, club.fieldnames)
+    print("Updated membership data ({} records) is in file '{}'."
+          .format(n, club.outfile))
     names_not_members = club.extra_fee_names - club.name_set
     if names_not_members:
         warning = "Not all in extra fees listing are members!"
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+# File: database.py
+
+"""
+An (optional) SQLite storage backend.
+The membership SPoT (memlist.csv) is imported into a 'members'
+table (one column per csv field) with indexes on name, email and
+the money fields; each record's stati go into an indexed 'stati'
+table. The text SPoTs (applicants, sponsors and extra fees) are
+kept line for line (in 'spot_lines') and, once parsed by the
+data.py loaders, in their own tables so they too can be queried.
+member.traverse_records accepts a data base file (see is_database)
+in place of the csv file so the traversal based commands run
+against it unchanged. Export back to csv (and to the text SPoTs)
+is lossless so archive.py and hand editing keep working.
+"""
+
+import csv
+import json
+import sqlite3
+import contextlib
+import member
+import sys_globals as glbs
+
+SUFFIXES = ('.db', '.sqlite')
+TEXT_SPOTS = ('applicants', 'sponsors', 'extra_fees')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS stati (row_no INTEGER, status TEXT);
+CREATE INDEX IF NOT EXISTS stati_status ON stati (status, row_no);
+CREATE TABLE IF NOT EXISTS spot_lines (
+    spot TEXT, n INTEGER, line TEXT, PRIMARY KEY (spot, n));
+CREATE TABLE IF NOT EXISTS applicants (
+    name TEXT PRIMARY KEY, status TEXT, dates TEXT);
+CREATE TABLE IF NOT EXISTS sponsors (name TEXT, sponsor TEXT);
+CREATE INDEX IF NOT EXISTS sponsors_name ON sponsors (name);
+CREATE TABLE IF NOT EXISTS extra_fees (
+    name TEXT, category TEXT, amount INTEGER);
+CREATE INDEX IF NOT EXISTS extra_fees_name ON extra_fees (name);
+CREATE INDEX IF NOT EXISTS extra_fees_category
+    ON extra_fees (category);
+"""
+
+
+def is_database(infile):
+    """
+    True if <infile> is to be treated as an SQLite data base.
+    """
+    return infile.endswith(SUFFIXES)
+
+
+def quoted(name):
+    """
+    Returns <name> quoted for use as an SQL identifier.
+    """
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def connect(db_file):
+    """
+    Returns a connection to <db_file> with the schema in place.
+    """
+    connection = sqlite3.connect(db_file)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def get_fieldnames(connection):
+    """
+    Returns the (csv) field names of the members table.
+    """
+    value = connection.execute(
+        "SELECT value FROM meta WHERE key = 'fieldnames'").fetchone()
+    return json.loads(value[0]) if value else []
+
+
+def import_csv(csv_file, db_file):
+    """
+    (Re)places the members of <db_file> with the records of
+    <csv_file> (typically Club.MEMBERSHIP_SPoT.)
+    Short rows are kept short and any surplus fields are kept
+    (as json, in the 'extra' column) so export_csv is lossless.
+    """
+    with open(csv_file, 'r', newline='') as file_obj:
+        first_line = file_obj.readline()
+        file_obj.seek(0)
+        reader = csv.reader(file_obj)
+        fieldnames = next(reader, [])
+        rows = [row for row in reader]
+    lineterminator = '\r\n' if first_line.endswith('\r\n') else '\n'
+    n_fields = len(fieldnames)
+    columns = ', '.join(quoted(name) for name in fieldnames)
+    with contextlib.closing(connect(db_file)) as connection:
+        with connection:
+            connection.execute("DROP TABLE IF EXISTS members")
+            connection.execute("DELETE FROM stati")
+            connection.execute(
+                "CREATE TABLE members (row_no INTEGER PRIMARY KEY, " +
+                "{}, n_values INTEGER, extra TEXT)".format(', '.join(
+                    "{} TEXT".format(quoted(name))
+                    for name in fieldnames)))
+            if 'last' in fieldnames and 'first' in fieldnames:
+                connection.execute("CREATE INDEX members_name " +
+                                   "ON members (last, first)")
+            if 'email' in fieldnames:
+                connection.execute("CREATE INDEX members_email " +
+                                   "ON members (email)")
+            for key in member.MONEY_KEYS:
+                if key in fieldnames:
+                    connection.execute(
+                        ("CREATE INDEX members_{0} ON members " +
+                         "(CAST({0} AS INTEGER))").format(key))
+            connection.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                (('fieldnames', json.dumps(fieldnames)),
+                 ('lineterminator', lineterminator)))
+            insert = ("INSERT INTO members (row_no, {}, n_values, " +
+                      "extra) VALUES (?, {}?, ?)").format(
+                          columns, '?, ' * n_fields)
+            status_n = (fieldnames.index('status')
+                        if 'status' in fieldnames else None)
+            for row_no, row in enumerate(rows):
+                values = (row + [None] * n_fields)[:n_fields]
+                extra = (json.dumps(row[n_fields:])
+                         if len(row) > n_fields else None)
+                connection.execute(insert, [row_no] + values +
+                                   [len(row), extra])
+                if status_n is not None and values[status_n]:
+                    connection.executemany(
+                        "INSERT INTO stati VALUES (?, ?)",
+                        ((row_no, status) for status in
+                         values[status_n].split(glbs.SEPARATOR)
+                         if status))
+    print("Imported {} rows from {} into {}"
+          .format(len(rows), csv_file, db_file))
+
+
+def read_rows(db_file):
+    """
+    A generator: yields the header and then each row, as lists of
+    strings just as a csv.reader of the exported file would.
+    """
+    with contextlib.closing(sqlite3.connect(db_file)) as connection:
+        fieldnames = get_fieldnames(connection)
+        yield list(fieldnames)
+        n_fields = len(fieldnames)
+        query = "SELECT {}, n_values, extra FROM members ORDER BY row_no"
+        for values in connection.execute(query.format(
+                ', '.join(quoted(name) for name in fieldnames))):
+            row = list(values[:n_fields])
+            del row[values[n_fields]:]
+            if values[n_fields + 1]:
+                row.extend(json.loads(values[n_fields + 1]))
+            yield row
+
+
+def write_csv(db_file, file_obj):
+    """
+    Writes the members of <db_file> to (the open) <file_obj> in the
+    format of the membership SPoT. Returns the number of (data) rows.
+    """
+    with contextlib.closing(sqlite3.connect(db_file)) as connection:
+        value = connection.execute("SELECT value FROM meta " +
+                                   "WHERE key = 'lineterminator'"
+                                   ).fetchone()
+    lineterminator = value[0] if value else '\n'
+    writer = csv.writer(file_obj, lineterminator=lineterminator)
+    n_rows = -1
+    for n_rows, row in enumerate(read_rows(db_file)):
+        writer.writerow(row)
+    return n_rows
+
+
+def export_csv(db_file, csv_file):
+    """
+    Writes the members of <db_file> to <csv_file> in the format of
+    the membership SPoT.
+    """
+    with open(csv_file, 'w', newline='') as file_obj:
+        n_rows = write_csv(db_file, file_obj)
+    print("Exported {} rows from {} to {}"
+          .format(n_rows, db_file, csv_file))
+
+
+def import_spot(db_file, spot, spot_file, parsed=None):
+    """
+    Keeps the lines of <spot_file> (one of the TEXT_SPOTS) in
+    <db_file> and, if provided, what the data.py loader made of it:
+    <parsed> is what get_applicant_data, get_sponsor_data or
+    gather_extra_fees_data returns (as appropriate.)
+    """
+    assert spot in TEXT_SPOTS
+    with open(spot_file, 'r') as file_obj:
+        lines = file_obj.read().split('\n')
+    with contextlib.closing(connect(db_file)) as connection:
+        with connection:
+            connection.execute("DELETE FROM spot_lines WHERE spot = ?",
+                               (spot,))
+            connection.executemany(
+                "INSERT INTO spot_lines VALUES (?, ?, ?)",
+                ((spot, n, line) for n, line in enumerate(lines)))
+            if parsed is None:
+                return
+            connection.execute("DELETE FROM {}".format(spot))
+            if spot == 'applicants':
+                connection.executemany(
+                    "INSERT INTO applicants VALUES (?, ?, ?)",
+                    ((name, value['status'],
+                      json.dumps(value.get('dates', [])))
+                     for name, value in parsed.items()))
+            elif spot == 'sponsors':
+                connection.executemany(
+                    "INSERT INTO sponsors VALUES (?, ?)",
+                    ((name, sponsor) for name, sponsors in parsed.items()
+                     for sponsor in sponsors))
+            else:
+                connection.executemany(
+                    "INSERT INTO extra_fees VALUES (?, ?, ?)",
+                    ((name, category, amount) for name, fees in
+                     parsed["by_name"].items()
+                     for category, amount in fees))
+
+
+def export_spot(db_file, spot, spot_file):
+    """
+    Writes out (unchanged) the lines kept by import_spot.
+    """
+    with contextlib.closing(sqlite3.connect(db_file)) as connection:
+        lines = [line for (line, ) in connection.execute(
+            "SELECT line FROM spot_lines WHERE spot = ? ORDER BY n",
+            (spot,))]
+    with open(spot_file, 'w') as file_obj:
+        file_obj.write('\n'.join(lines))
+
+
+def query(db_file, sql, params=()):
+    """
+    Returns a list of the rows (tuples) selected by <sql>.
+    """
+    with contextlib.closing(sqlite3.connect(db_file)) as connection:
+        return connection.execute(sql, params).fetchall()
+
+
+def owing(db_file, key):
+    """
+    Returns [(last, first, amount), ...] for those with a positive
+    value in the money field <key> (eg: who owes dock fees.)
+    Uses the members_<key> index.
+    """
+    assert key in member.MONEY_KEYS
+    return query(db_file,
+                 ("SELECT last, first, CAST({0} AS INTEGER) FROM members"
+                  + " WHERE CAST({0} AS INTEGER) > 0 ORDER BY row_no"
+                  ).format(key))
+
+
+def with_status(db_file, status):
+    """
+    Returns [(last, first), ...] for those with <status>
+    (eg: 'a2' for applicants with 2 meetings.)
+    Uses the stati_status index.
+    """
+    return query(db_file,
+                 "SELECT last, first FROM stati JOIN members USING " +
+                 "(row_no) WHERE stati.status = ? ORDER BY row_no",
+                 (status,))
+
+
+def with_email(db_file, email):
+    """
+    Returns [(last, first), ...] for those with <email>.
+    """
+    return query(db_file,
+                 "SELECT last, first FROM members WHERE email = ? " +
+                 "ORDER BY row_no", (email,))
+
+
+if __name__ == "__main__":
+    print("database.py compiles OK.")
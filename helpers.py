@@ -386,6 +386,94 @@ def display_mismatches(mismatches,
     return ret
 
 
+def get_fields(value):
+    """
+    Returns <value> as a dict of fields (for keyed_diff) or None if
+    it's to be compared as a whole: a dict as is; a list of
+    (field, value) pairs (such as club.fee_category_by_m values)
+    as a dict, the values of any repeated field gathered (sorted)
+    into a tuple.
+    """
+    if isinstance(value, dict):
+        return value
+    if not (isinstance(value, (list, tuple)) and
+            all(isinstance(pair, (list, tuple)) and len(pair) == 2
+                for pair in value)):
+        return None
+    grouped = {}
+    for field, field_value in value:
+        _ = grouped.setdefault(field, [])
+        grouped[field].append(field_value)
+    return {field: values[0] if len(values) == 1
+            else tuple(sorted(values))
+            for field, values in grouped.items()}
+
+
+def keyed_diff(left, right, key=None):
+    """
+    Hash joins <left> and <right>: dicts (keyed by name) or, if a
+    <key> function is provided, iterables of records (keyed by
+    key(record); the last of any duplicates is used.)
+    Returns a (json serializable) dict:
+        "missing_left": keys found only in <right>,
+        "missing_right": keys found only in <left>,
+        "changed": a list of {"key": key, "fields": {field: [left,
+            right], ...}} for keys found in both but with differing
+            values; values that aren't dicts (or lists of pairs- see
+            get_fields) are given as {"key": key, "left": left,
+            "right": right} instead.
+    All empty if the two match. Runs in time linear in their size
+    (plus sorting of the keys reported.)
+    """
+    if key is not None:
+        left = {key(record): record for record in left}
+        right = {key(record): record for record in right}
+    ret = {"missing_left": sorted(k for k in right if k not in left),
+           "missing_right": sorted(k for k in left if k not in right),
+           "changed": [],
+           }
+    for k in sorted(k for k in left if k in right
+                    and left[k] != right[k]):
+        left_fields = get_fields(left[k])
+        right_fields = get_fields(right[k])
+        if left_fields is None or right_fields is None:
+            ret["changed"].append(
+                {"key": k, "left": left[k], "right": right[k]})
+            continue
+        fields = {}
+        for field in sorted(left_fields.keys() | right_fields.keys()):
+            left_value = left_fields.get(field)
+            right_value = right_fields.get(field)
+            if left_value != right_value:
+                fields[field] = [left_value, right_value]
+        if fields:  # Could only differ by order.
+            ret["changed"].append({"key": k, "fields": fields})
+    return ret
+
+
+def diff_lines(diff, left_name="left", right_name="right"):
+    """
+    Returns a (human readable) listing of a keyed_diff result.
+    """
+    ret = []
+    if diff["missing_right"]:
+        ret.append("In {} but not {}:".format(left_name, right_name))
+        ret.extend("    {}".format(k) for k in diff["missing_right"])
+    if diff["missing_left"]:
+        ret.append("In {} but not {}:".format(right_name, left_name))
+        ret.extend("    {}".format(k) for k in diff["missing_left"])
+    for change in diff["changed"]:
+        if "fields" in change:
+            for field, (left_value, right_value) in (
+                    change["fields"].items()):
+                ret.append("{}: {}: {} != {}".format(
+                    change["key"], field, left_value, right_value))
+        else:
+            ret.append("{}: {} != {}".format(
+                change["key"], change["left"], change["right"]))
+    return ret
+
+
 def show_json(json, underlinechar=''):
     """
     Returns a human readable representation of json data
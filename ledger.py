@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+# File: ledger.py
+
+"""
+Keeps track of the money taken in (or refunded) as entered by hand
+into the receipts file (Club.RECEIPTS_FILE.) Its format:
+    'Date: ...' lines each begin a block of entries,
+    entry lines: payer, amount and (optionally) category, the
+        amount written in (or at least overlapping) columns 23 to 27
+        (counting from 0): wider amounts may start further left
+        (right aligned) or run on to the right,
+    subtotal lines have '---' in columns 24 to 26 (see report.)
+Any other line is kept in <invalid_lines>.
+The receipts are parsed into ReceiptEntry tuples and totaled as
+they are read. A checkpoint (the Ledger, pickled into
+Club.LEDGER_FILE) records how far into the file it got along with a
+hash of what was read so later runs only parse appended lines.
+If the file has been changed other than by appending, it's reread.
+"""
+
+import os
+import re
+import hashlib
+import collections
+import helpers
+import snapshot
+
+ReceiptEntry = collections.namedtuple(
+    "ReceiptEntry", "date payer category amount")
+
+AMOUNT_COLUMNS = (23, 28)  # The amount must overlap these.
+AMOUNT_RE = re.compile(r"(?<!\S)[-+]?\d+(?!\S)")
+
+
+def is_date_line(line):
+    return line[:5] == "Date:"
+
+
+def is_subtotal_line(line):
+    return line[24:27] == "---"
+
+
+def parse_receipt_line(line, date=''):
+    """
+    Returns a ReceiptEntry for an entry <line> of the receipts file
+    (made within the block of <date>) or None if it isn't one.
+    """
+    if is_date_line(line):
+        return None
+    start, end = AMOUNT_COLUMNS
+    for match in AMOUNT_RE.finditer(line):
+        if match.start() >= end:
+            break
+        if match.end() > start:  # Wider amounts may start earlier.
+            return ReceiptEntry(date,
+                                line[:match.start()].strip(),
+                                line[match.end():].strip(),
+                                int(match.group()))
+    return None
+
+
+def subtotal_line(amount):
+    return ("    SubTotal            --- {:>10}"
+            .format(helpers.format_dollar_value(amount)))
+
+
+class Ledger(object):
+    """
+    The receipts (entries) of <receipts_file> read so far (up to
+    <offset>) with their totals:
+        total: grand total,
+        subtotals: those of the completed blocks (see report),
+        subtotal: that of the block in progress,
+        by_category: keyed by category (as entered.)
+    """
+
+    def __init__(self, receipts_file):
+        self.receipts_file = receipts_file
+        self.offset = 0
+        self.prefix_hash = hashlib.sha1().hexdigest()
+        self.date = ''
+        self.entries = []
+        self.invalid_lines = []
+        self.subtotals = []
+        self.subtotal = 0
+        self.total = 0
+        self.by_category = {}
+
+    def add_line(self, line):
+        """
+        Takes account of (a newline stripped) <line> of the file.
+        """
+        line = line.rstrip()
+        if is_date_line(line):
+            self.date = line
+        if is_subtotal_line(line) and self.subtotal:
+            self.subtotals.append(self.subtotal)
+            self.subtotal = 0
+        entry = parse_receipt_line(line, self.date)
+        if entry is None:
+            self.invalid_lines.append(line)
+            return
+        self.entries.append(entry)
+        self.total += entry.amount
+        self.subtotal += entry.amount
+        self.by_category[entry.category] = (
+            self.by_category.get(entry.category, 0) + entry.amount)
+
+    def copy(self):
+        """
+        Returns a copy which can be added to without changing self.
+        """
+        ret = Ledger(self.receipts_file)
+        ret.__dict__.update(self.__dict__)
+        for name in ("entries", "invalid_lines", "subtotals"):
+            setattr(ret, name, list(getattr(self, name)))
+        ret.by_category = dict(self.by_category)
+        return ret
+
+    def update(self):
+        """
+        Reads the lines appended to the receipts file since the
+        checkpoint (all of it if what was read before has changed.)
+        Returns the Ledger for the whole file: self, unless the
+        file doesn't end with a newline in which case the last
+        line is added to a copy (self only goes up to the last
+        complete line.)
+        """
+        with open(self.receipts_file, 'rb') as file_obj:
+            print('Reading from file "{}".'.format(file_obj.name))
+            sha1 = hashlib.sha1()
+            remaining = self.offset
+            while remaining > 0:
+                chunk = file_obj.read(min(remaining, 1 << 16))
+                if not chunk:
+                    break
+                sha1.update(chunk)
+                remaining -= len(chunk)
+            if remaining or sha1.hexdigest() != self.prefix_hash:
+                self.__init__(self.receipts_file)  # Start over.
+                file_obj.seek(0)
+                sha1 = hashlib.sha1()
+            appended = file_obj.read()
+        complete, newline, tail = appended.rpartition(b'\n')
+        if newline:
+            for line in complete.decode('utf-8').split('\n'):
+                self.add_line(line)
+            sha1.update(complete + newline)
+            self.offset += len(complete + newline)
+            self.prefix_hash = sha1.hexdigest()
+        if not tail:
+            return self
+        ret = self.copy()
+        ret.add_line(tail.decode('utf-8'))
+        return ret
+
+    def report(self):
+        """
+        Returns a list of strings: subtotals and grand total.
+        """
+        res = ["Fees taken in to date:"]
+        res.extend(subtotal_line(amount) for amount in self.subtotals)
+        if self.subtotal:
+            res.append(subtotal_line(self.subtotal))
+        res.append("\nGrand Total to Date:    --- ---- {:>10}"
+                   .format(helpers.format_dollar_value(self.total)))
+        return res
+
+
+def get_ledger(receipts_file, checkpoint_file=None):
+    """
+    Returns the (up to date) Ledger of <receipts_file> starting
+    from where the one kept in <checkpoint_file> left off. The
+    checkpoint is then brought up to date.
+    """
+    key = os.path.abspath(receipts_file)
+    checkpoints = {}
+    if checkpoint_file:
+        checkpoints = snapshot.read_pickle(checkpoint_file, {})
+    ledger = checkpoints.get(key)
+    if not isinstance(ledger, Ledger):
+        ledger = Ledger(receipts_file)
+    ledger.receipts_file = receipts_file
+    ret = ledger.update()
+    if checkpoint_file:
+        checkpoints[key] = ledger
+        snapshot.write_pickle(checkpoints, checkpoint_file)
+    return ret
+
+
+if __name__ == "__main__":
+    print("ledger.py compiles OK.")
@@ -13,13 +13,26 @@ A many need to store data so those will get an extra
 """
 
 import os
+import sys
 import csv
-import json
+import bisect
+import array
+import locale
+import pickle
+import threading
+import zlib
+import hashlib
+import contextlib
+import concurrent.futures
 import helpers
+import database
+import pipeline
+import snapshot
 import sys_globals as glbs
 from rbc import Club
 
 NO_EMAIL_KEY = 'no_email'
+GMAIL_DOMAINS = {'gmail.com', 'googlemail.com'}
 STATUS_KEY_VALUES = {
     "a-": "Application received without fee", #0
     "a" : "Application complete but not yet acknowledged",  # not yet welcomed
@@ -53,8 +66,55 @@ MISCELANEOUS_STATI = "m|w|be"
 NON_MEMBER_SET = APPLICANT_SET | {"h", 't', 'zaa', 'zae'}  # bitwise OR
 NON_FEE_PAYING_STATI = {"w", "t", "r", "h"}
 
+# Each of the known STATI is assigned a bit so the stati of a
+# record can be represented (and tested) as an integer bitmask.
+# Stati not listed in STATUS_KEY_VALUES don't show up in the mask.
+STATUS_BITS = {status: 1 << n for n, status in enumerate(STATI)}
+
+
+def stati2mask(stati):
+    """
+    Returns the bitmask representing the (known) <stati>.
+    """
+    mask = 0
+    for status in stati:
+        mask |= STATUS_BITS.get(status, 0)
+    return mask
+
+
+APPLICANT_MASK = stati2mask(APPLICANT_SET)
+NON_MEMBER_MASK = stati2mask(NON_MEMBER_SET)
+NON_FEE_PAYING_MASK = stati2mask(NON_FEE_PAYING_STATI)
+SPECIAL_NOTICE_MASK = stati2mask(SPECIAL_NOTICE_STATI)
+INTERESTED_BIT = STATUS_BITS['zaa']
+NEW_APPLICANT_BIT = STATUS_BITS['a']
+WAITING_BIT = STATUS_BITS['aw']
+INDUCTEE_BIT = STATUS_BITS['ai']
+NEW_MEMBER_BIT = STATUS_BITS['m']
+HONORARY_BIT = STATUS_BITS['h']
+RETIRING_BIT = STATUS_BITS['r']
+TERMINATED_BIT = STATUS_BITS['t']
+BAD_EMAIL_BIT = STATUS_BITS['be']
+BAD_ADDRESS_BIT = STATUS_BITS['ba']
+
+# Tests applied to a status mask, used by classify_file:
+MASK_TESTS = dict(
+    member=lambda mask: not mask & NON_MEMBER_MASK,
+    applicant=lambda mask: mask & APPLICANT_MASK,
+    dues_paying=lambda mask: not mask & NON_FEE_PAYING_MASK and (
+        not mask & NON_MEMBER_MASK or mask & INDUCTEE_BIT),
+    honorary=lambda mask: mask & HONORARY_BIT,
+    inductee=lambda mask: mask & INDUCTEE_BIT,
+    waiting=lambda mask: mask & WAITING_BIT,
+    new_member=lambda mask: mask & NEW_MEMBER_BIT,
+    retiring=lambda mask: mask & RETIRING_BIT,
+    terminated=lambda mask: mask & TERMINATED_BIT,
+    special_notice=lambda mask: mask & SPECIAL_NOTICE_MASK,
+    )
+
 N_FIELDS = 14  # Only when unable to use len(dict_reader.fieldnames).
 MONEY_KEYS = ("dues", "dock", "kayak", "mooring")
+MONEY_INDEX = {key: n for n, key in enumerate(MONEY_KEYS)}
 MONEY_KEYS_CAPPED = [item.capitalize() for item in MONEY_KEYS]
 FEES_KEYS = MONEY_KEYS[1:]
 MONEY_HEADERS = {
@@ -86,6 +146,106 @@ All is well.  "Trust me!"
 func_dict = {}
 
 
+class MemberRecord(dict):
+    """
+    The dict provided (in place of csv.DictReader's) for each record
+    of the membership SPoT: <fields> (field names, in file order)
+    are zipped with the <values> of a row read by csv.reader. As
+    with csv.DictReader, missing values are None and extra values
+    are kept (as a list) under the None key.
+    Being a plain dict, "...".format(**record) and dict(record) run
+    at full speed.
+    What is parsed out of a record is only parsed when first asked
+    for and is then kept:
+        <money>: a tuple (an int or None for each of the MONEY_KEYS),
+        <stati>: a frozenset of the record's stati,
+        <status_mask>: an int (see STATUS_BITS),
+        <name_key>: its "last, first" name key (see get_name_key.)
+    Assigning to a field (record[key] = value) discards what had
+    been parsed from it.
+    Use get_money(), get_status_set(), get_status_mask() and
+    get_name_key() rather than accessing these directly since
+    records may also be plain dicts.
+    """
+
+    __slots__ = ('_money', '_stati', '_status_mask', 'name_key')
+
+    def __init__(self, fields, values):
+        n_fields = len(fields)
+        if len(values) == n_fields:
+            super().__init__(zip(fields, values))
+        elif len(values) < n_fields:
+            super().__init__(zip(fields,
+                                 values + [None] * (n_fields - len(values))))
+        else:
+            super().__init__(zip(fields, values))
+            self[None] = values[n_fields:]
+        self._money = self._stati = self._status_mask = None
+        self.name_key = None
+
+    @property
+    def money(self):
+        if self._money is None:
+            self._money = parse_money(self)
+        return self._money
+
+    @property
+    def stati(self):
+        if self._stati is None:
+            self._stati = status_set(self.get('status'))
+        return self._stati
+
+    @property
+    def status_mask(self):
+        if self._status_mask is None:
+            self._status_mask = stati2mask(self.stati)
+        return self._status_mask
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key in MONEY_INDEX:
+            self._money = None
+        elif key == 'status':
+            self._stati = self._status_mask = None
+        elif key in ('last', 'first'):
+            self.name_key = None
+
+    def __repr__(self):
+        return "MemberRecord({})".format(super().__repr__())
+
+
+def parse_money(record):
+    """
+    Returns a tuple: the value of each of the MONEY_KEYS of <record>
+    as an int, or None if it is missing, blank or malformed.
+    """
+    money = []
+    for key in MONEY_KEYS:
+        amount = record.get(key)
+        if amount:
+            try:
+                amount = int(amount)
+            except ValueError:
+                amount = None
+        else:
+            amount = None
+        money.append(amount)
+    return tuple(money)
+
+
+def get_records(rows, fieldnames):
+    """
+    A generator: yields a MemberRecord for each of the <rows>
+    (as provided by a csv.reader positioned after the header
+    line) using <fieldnames> as keys.
+    Like csv.DictReader, blank rows are skipped.
+    """
+    index = {name: n for n, name in enumerate(fieldnames)}
+    for row in rows:
+        if row:
+            yield MemberRecord(index, row)
+
+
 def traverse_records(infile, custom_funcs, club):
     """
     Opens <infile> for dict_reading (and in the process
@@ -98,19 +258,386 @@ def traverse_records(infile, custom_funcs, club):
     setup_required_attributes function (see end of module.)
     Also assigns club.fieldnames and club.n_fields which are
     sometimes useful.
+    Each record is a MemberRecord (see above.)
+    <infile> can also be an SQLite data base (see database.py.)
+    If club.incremental is set and all of <custom_funcs> are among
+    the INCREMENTAL_FUNCS, traverse_records_incrementally takes over.
     """
     if callable(custom_funcs):  # If only one function provided
         custom_funcs = [custom_funcs]  # place it into a list.
+    if club.incremental and INCREMENTAL_FUNCS.issuperset(custom_funcs):
+        return traverse_records_incrementally(infile, custom_funcs, club)
+    setup_required_attributes(custom_funcs, club)
+    print("DictReading {}".format(infile))
+    if database.is_database(infile):  # An SQLite version of the SPoT.
+        apply_funcs(database.read_rows(infile), custom_funcs, club)
+    else:
+        with open(infile, 'r', newline='') as file_object:
+            apply_funcs(csv.reader(file_object), custom_funcs, club)
+
+
+def read_rows(infile):
+    """
+    Returns a list of the rows (header included) of the csv <infile>.
+    """
+    with open(infile, 'r', newline='') as file_object:
+        return list(csv.reader(file_object))
+
+
+def apply_funcs(reader, custom_funcs, club):
+    """
+    Assigns club.fieldnames (from the first row provided by
+    <reader>) and then applies <custom_funcs> to each record.
+    """
+    # fieldnames is used by get_usps and restore_fees cmds.
+    club.fieldnames = next(reader, [])
+    club.n_fields = len(club.fieldnames)  # to check db integrity
+    for record in get_records(reader, club.fieldnames):
+        for custom_func in custom_funcs:
+            custom_func(record, club)
+
+
+def traverse_fused(infile, func_lists, club, parallel=False):
+    """
+    Runs the collectors of several traversals in a single pass
+    over <infile>.
+    <func_lists> is an iterable each item of which is what would
+    otherwise have been passed (as <custom_funcs>) to its own call
+    of traverse_records.
+    A collector appearing in more than one of the lists is only run
+    once (in the position in which it is first encountered) so its
+    club attributes end up as they would after a traversal of its
+    own and are then shared by all clients.
+    If <parallel>, the pass is split among processes (see
+    traverse_records_in_parallel) so the collectors must all be
+    free of side effects.
+    Returns the (deduplicated) list of collectors that was run.
+    """
+    funcs = []
+    for func_list in func_lists:
+        if callable(func_list):
+            func_list = [func_list]
+        for func in func_list:
+            if func not in funcs:
+                funcs.append(func)
+    if parallel:
+        traverse_records_in_parallel(infile, funcs, club)
+    else:
+        traverse_records(infile, funcs, club)
+    return funcs
+
+
+def get_shards(infile, n_shards):
+    """
+    Returns a list of (start, end) byte offsets dividing the data
+    lines of <infile> (all but its header line) into at most
+    <n_shards> ranges, each beginning and ending on a line boundary.
+    Assumes (as is the case with the membership SPoT) that no
+    field contains a line break.
+    """
+    size = os.path.getsize(infile)
+    with open(infile, 'rb') as file_object:
+        file_object.readline()
+        boundaries = [file_object.tell()]
+        first = boundaries[0]
+        for n in range(1, n_shards):
+            offset = first + (size - first) * n // n_shards
+            file_object.seek(offset - 1)
+            file_object.readline()  # advance to the next line start
+            position = file_object.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def collect(records, custom_funcs, fieldnames, attributes):
+    """
+    Applies <custom_funcs> to <records> (a shard of the data base)
+    using a fresh Club instance initialized with <attributes>.
+    Returns a dict with the values of the collectors' containers
+    and what's needed to stitch the shards back together (see
+    merge_shards.)
+    """
+    club = Club()
+    club.__dict__.update(attributes)
+    setup_required_attributes(custom_funcs, club)
+    club.fieldnames = fieldnames
+    club.n_fields = len(fieldnames)
+    shard = dict(first_name=None, n_first_malformed=0,
+                 first_member_letter=None)
+    for record in records:
+        for custom_func in custom_funcs:
+            custom_func(record, club)
+        if shard['first_name'] is None:
+            shard['first_name'] = member_name(record, club)
+            shard['n_first_malformed'] = len(
+                                    getattr(club, 'malformed', ()))
+        if shard['first_member_letter'] is None and is_member(record):
+            shard['first_member_letter'] = record['last'][:1]
+    shard['previous_name'] = club.previous_name
+    shard['first_letter'] = club.first_letter
+    shard['containers'] = {
+        container.name: getattr(club, container.name)
+        for func in custom_funcs
+        for container in prerequisites.get(func, ())}
+    return shard
+
+
+def traverse_shard(infile, start, end, fieldnames,
+                   custom_funcs, attributes):
+    """
+    Runs in a worker process of traverse_records_in_parallel:
+    collects from the records found between the <start> and <end>
+    byte offsets of <infile>.
+    """
+    with open(infile, 'rb') as file_object:
+        file_object.seek(start)
+        text = file_object.read(end - start).decode(
+            locale.getpreferredencoding(False))  # as open() in read_rows
+    reader = csv.reader(text.splitlines(keepends=True))
+    return collect(get_records(reader, fieldnames), custom_funcs,
+                   fieldnames, attributes)
+
+
+def get_shard_attributes(club):
+    """
+    Returns a dict of the attributes of <club> with which to
+    initialize the Club instance used for each shard (see collect.)
+    Those which can't be pickled are left out as are those used
+    for ordering checks since each shard starts afresh.
+    """
+    attributes = {}
+    for key, value in vars(club).items():
+        if key in ('previous_name', 'first_letter'):
+            continue
+        try:
+            pickle.dumps(value)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            continue
+        attributes[key] = value
+    return attributes
+
+
+def merge_shard_values(values, top_level=True):
+    """
+    Returns the reduction of <values> (one per shard, in file order)
+    collected for a container: lists are concatenated, sets united
+    and dicts merged key by key (recursively.) At the top level,
+    integers (counters) are summed and strings keep the last non
+    empty value; otherwise, as in a serial traversal, the last one
+    wins. <values> are left as they are.
+    """
+    first = values[0]
+    if len(values) == 1:
+        return first
+    if isinstance(first, list):
+        return [item for value in values for item in value]
+    if isinstance(first, set):
+        return set().union(*values)
+    if isinstance(first, dict):
+        merged = {}
+        shared = set()  # keys found in more than one shard
+        for value in values:
+            shared.update(merged.keys() & value.keys())
+            merged.update(value)
+        for key in shared:
+            merged[key] = merge_shard_values(
+                [value[key] for value in values if key in value],
+                top_level=False)
+        return merged
+    if top_level and isinstance(first, int):
+        return sum(values)
+    if top_level:
+        non_empty = [value for value in values if value]
+        return non_empty[-1] if non_empty else first
+    return values[-1]
+
+
+def merge_shards(results, custom_funcs, club):
+    """
+    Merges <results> (what collect returned for each shard, in file
+    order) into the attributes of <club>.
+    Ordering checks (add2malformed) and the alphabetic grouping of
+    add2lists (club.for_web) are fixed up at the shard boundaries
+    so results are as for a serial traversal.
+    """
+    previous_name = club.previous_name
+    first_letter = club.first_letter
+    containers_list = []
+    for result in results:
+        containers = dict(result['containers'])
+        containers_list.append(containers)
+        if result['first_name'] is None:  # an empty shard
+            continue
+        if ('malformed' in containers
+                and result['first_name'] < previous_name):
+            containers['malformed'] = list(containers['malformed'])
+            containers['malformed'].insert(
+                result['n_first_malformed'],
+                "Record out of order: {}".format(result['first_name']))
+        if (getattr(club, 'for_web', False) and 'members' in containers
+                and result['first_member_letter'] == first_letter
+                and containers['members'][:1] == [""]):
+            containers['members'] = containers['members'][1:]
+        previous_name = result['previous_name']
+        if result['first_letter']:
+            first_letter = result['first_letter']
+    club.previous_name = previous_name
+    club.first_letter = first_letter
+    names = {container.name for func in custom_funcs
+             for container in prerequisites.get(func, ())}
+    for name in names:
+        values = [containers[name] for containers in containers_list]
+        if values:
+            setattr(club, name, merge_shard_values(values))
+
+
+def traverse_records_in_parallel(infile, custom_funcs, club,
+                                 n_workers=None):
+    """
+    Does what traverse_records does but splits <infile> into
+    shards (see get_shards) which are traversed by a pool of
+    <n_workers> (default: one per cpu) processes.
+    The collectors' containers (as declared in the prerequisites
+    dict) are then merged in file order (see merge_shards) into
+    the attributes of <club>.
+    Club attributes which can't be pickled (such as club.which)
+    aren't available to the workers so traversals depending on
+    them (and collectors with side effects) should remain serial.
+    An SQLite <infile> is traversed serially.
+    """
+    if callable(custom_funcs):
+        custom_funcs = [custom_funcs]
+    if database.is_database(infile):
+        return traverse_records(infile, custom_funcs, club)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
     setup_required_attributes(custom_funcs, club)
     with open(infile, 'r', newline='') as file_object:
-        print("DictReading {}".format(file_object.name))
-        dict_reader = csv.DictReader(file_object)
-        # fieldnames is used by get_usps and restore_fees cmds.
-        club.fieldnames = dict_reader.fieldnames
-        club.n_fields = len(club.fieldnames)  # to check db integrity
-        for record in dict_reader:
-            for custom_func in custom_funcs:
-                custom_func(record, club)
+        club.fieldnames = next(csv.reader(file_object), [])
+    club.n_fields = len(club.fieldnames)
+    shards = get_shards(infile, n_workers)
+    print("DictReading {} in {} shard(s)".format(infile, len(shards)))
+    attributes = get_shard_attributes(club)
+    with concurrent.futures.ProcessPoolExecutor(n_workers) as executor:
+        futures = [executor.submit(traverse_shard, infile, start, end,
+                                   club.fieldnames, custom_funcs,
+                                   attributes)
+                   for start, end in shards]
+        results = [future.result() for future in futures]
+    merge_shards(results, custom_funcs, club)
+
+
+_journal_lock = threading.Lock()  # see traverse_records_incrementally
+
+
+JOURNAL_BLOCK = 256  # Average number of rows per journaled block.
+
+
+def get_blocks(rows, block_size=JOURNAL_BLOCK):
+    """
+    A generator: divides (the non blank) <rows> into blocks and
+    yields a (digest, rows) tuple for each.
+    A block ends with any row the crc32 of which is a multiple of
+    <block_size> so block boundaries depend only on the rows
+    around them: adding, changing or deleting a row only changes
+    the digest of the block it's in.
+    """
+    block = []
+    lines = []
+    for row in rows:
+        if not row:
+            continue
+        line = '\x1f'.join(row).encode()
+        block.append(row)
+        lines.append(line)
+        if zlib.crc32(line) % block_size == 0:
+            yield hashlib.sha1(b'\n'.join(lines)).digest(), block
+            block = []
+            lines = []
+    if block:
+        yield hashlib.sha1(b'\n'.join(lines)).digest(), block
+
+
+def traverse_records_incrementally(infile, custom_funcs, club,
+                                   journal_file=Club.JOURNAL_FILE,
+                                   block_size=JOURNAL_BLOCK):
+    """
+    Does what traverse_records does but only applies <custom_funcs>
+    to the blocks of records (see get_blocks) which have been added
+    or changed since the last such traversal (of the same <infile>
+    with the same collectors and club attributes.)
+    What the collectors gathered from each block (see collect) is
+    kept in <journal_file> keyed by the block's digest; the results
+    for all current blocks are then merged (see merge_shards) so
+    deleted rows simply drop out. If <infile>'s mtime and size are
+    as they were, the journaled results are merged without reading
+    it at all.
+    A file of less than two blocks is simply traversed: the journal
+    couldn't pay off.
+    Only suitable for collectors without side effects: raises
+    ValueError unless all of <custom_funcs> are INCREMENTAL_FUNCS.
+    """
+    if callable(custom_funcs):
+        custom_funcs = [custom_funcs]
+    others = [func.__name__ for func in custom_funcs
+              if func not in INCREMENTAL_FUNCS]
+    if others:
+        raise ValueError("Can't traverse incrementally with: {}"
+                         .format(', '.join(others)))
+    setup_required_attributes(custom_funcs, club)
+    print("DictReading {} (incrementally)".format(infile))
+    attributes = get_shard_attributes(club)
+    key = (os.path.abspath(infile),
+           tuple(func.__qualname__ for func in custom_funcs))
+    settings = pickle.dumps(attributes)
+    stat = os.stat(infile)
+    stat = (stat.st_mtime_ns, stat.st_size)
+    with _journal_lock:  # Other threads may update the journal too.
+        journal = snapshot.read_pickle(journal_file, {})
+        entry = journal.get(key)
+        if entry and entry['settings'] != settings:
+            entry = None
+        if entry and entry['stat'] == stat:  # <infile> is as it was.
+            club.fieldnames = entry['fieldnames']
+            club.n_fields = len(club.fieldnames)
+            blocks = pickle.loads(zlib.decompress(entry['blocks']))
+            n_collected = 0
+        else:
+            if database.is_database(infile):
+                rows = list(database.read_rows(infile))
+            else:
+                rows = read_rows(infile)
+            if len(rows) - 1 < 2 * block_size:  # Not worth journaling.
+                if journal.pop(key, None) is not None:
+                    snapshot.write_pickle(journal, journal_file)
+                apply_funcs(iter(rows), custom_funcs, club)
+                return
+            club.fieldnames = rows[0]
+            club.n_fields = len(club.fieldnames)
+            previous = {}
+            if entry and entry['fieldnames'] == club.fieldnames:
+                previous = {digest: result for digest, n_rows, result
+                            in pickle.loads(zlib.decompress(entry['blocks']))}
+            blocks = []
+            n_collected = 0
+            for digest, block in get_blocks(rows[1:], block_size):
+                result = previous.get(digest)
+                if result is None:
+                    result = collect(get_records(block, club.fieldnames),
+                                     custom_funcs, club.fieldnames,
+                                     attributes)
+                    n_collected += len(block)
+                blocks.append((digest, len(block), result))
+            journal[key] = dict(  # blocks compress about five fold
+                settings=settings, stat=stat, fieldnames=club.fieldnames,
+                blocks=zlib.compress(pickle.dumps(
+                    blocks, pickle.HIGHEST_PROTOCOL), 1))
+            snapshot.write_pickle(journal, journal_file)
+    print("...{} of {} records (re)processed."
+          .format(n_collected, sum(n_rows for _, n_rows, _ in blocks)))
+    merge_shards([result for _, _, result in blocks], custom_funcs, club)
 
 
 def member_name(record, club):
@@ -118,14 +645,98 @@ def member_name(record, club):
     Returns a string formated as defined by club.PATTERN.
     Default <PATTERN> is "{last}, {first}"...
     (see Club.__init__() in rbc.py)
-    !! Plan to replace the above with functions  !!
-    !! get_first_last() and get_last_first().    !!
+    in which case the record's name key is returned.
     """
+    if club.PATTERN == LAST_FIRST:
+        return get_name_key(record)
     return club.PATTERN.format(**record)
 
 
+# Name keys:
+# All the SPoTs are joined on "last, first" name keys. These are
+# built by the following (rather than ad hoc) and interned so
+# they're equal, and hash, as cheaply as possible.
+LAST_FIRST = "{last}, {first}"
+
+
+def name_key(last, first):
+    """
+    Returns the (interned) "last, first" name key.
+    """
+    return sys.intern("{}, {}".format(last, first))
+
+
+def name_key_from_words(name):
+    """
+    Returns the name key of <name>: "First Last" (as found in the
+    applicant, sponsor and extra fees SPoTs.)
+    """
+    names = name.split()
+    return name_key(names[1], names[0])
+
+
+def get_name_key(record):
+    """
+    Returns the name key of <record>: computed only once if it's
+    a MemberRecord.
+    """
+    if isinstance(record, MemberRecord):
+        if record.name_key is None:
+            record.name_key = name_key(record['last'], record['first'])
+        return record.name_key
+    return name_key(record['last'], record['first'])
+
+
 def get_last_first(record):
-    return "{last}, {first}".format(**record)
+    return get_name_key(record)
+
+
+class NameIndex(object):
+    """
+    Indexes <keys> (name keys, in file order):
+    <offsets> maps each key to the offset (row number, first if
+    there are duplicates) of its record and <sorted_keys> serves
+    prefix searches (with_prefix.)
+    See get_name_index (and utils.ck_names_in_membership.)
+    """
+
+    def __init__(self, keys):
+        self.offsets = {}
+        for offset, key in enumerate(keys):
+            self.offsets.setdefault(key, offset)
+        self.sorted_keys = sorted(self.offsets)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def with_prefix(self, prefix):
+        """
+        Returns the (sorted) keys beginning with <prefix>: eg. all
+        with a given last name (prefix "Last, ") or initial.
+        """
+        ret = []
+        n = bisect.bisect_left(self.sorted_keys, prefix)
+        while (n < len(self.sorted_keys)
+               and self.sorted_keys[n].startswith(prefix)):
+            ret.append(self.sorted_keys[n])
+            n += 1
+        return ret
+
+
+def get_name_index(infile):
+    """
+    Returns a NameIndex of the (non blank) records of <infile>.
+    """
+    if database.is_database(infile):
+        rows = database.read_rows(infile)
+    else:
+        rows = iter(read_rows(infile))
+    fieldnames = next(rows, [])
+    return NameIndex(get_name_key(record) for record in get_records(
+        (list(row) for row in rows), fieldnames))
 
 
 def get_first_last(record):
@@ -154,109 +765,167 @@ def ck_number_of_fields(record, club=None):
         report_error(possible_error, club)
 
 
+def status_set(status):
+    """
+    Returns a (frozen) set of the stati found in the
+    <status> field (which may be empty.)
+    """
+    if status:
+        return frozenset(status.split(glbs.SEPARATOR))
+    else: return frozenset()
+
+
 def get_status_set(record):
-    if record['status']:
-        return set(record['status'].split(glbs.SEPARATOR))
-        # above returns set of one empty string if status is empty
-    else: return set()
+    """
+    Returns the set of stati of <record>.
+    (Parsed only once if <record> is a MemberRecord.)
+    """
+    if isinstance(record, MemberRecord):
+        stati = record._stati
+        if stati is None:
+            stati = record.stati
+        return stati
+    return status_set(record['status'])
+
+
+def get_money(record, key):
+    """
+    Returns the value of the money field <key> (one of the
+    MONEY_KEYS) as an int, or None if it is blank or malformed.
+    (Parsed only once if <record> is a MemberRecord.)
+    """
+    if isinstance(record, MemberRecord):
+        money = record._money
+        if money is None:
+            money = record.money
+        return money[MONEY_INDEX[key]]
+    try:
+        return int(record[key])
+    except (TypeError, ValueError):
+        return None
+
+
+def get_status_mask(record):
+    """
+    Returns the bitmask representing the stati of <record>.
+    (Computed only once if <record> is a MemberRecord.)
+    """
+    if isinstance(record, MemberRecord):
+        mask = record._status_mask
+        if mask is None:
+            mask = record.status_mask
+        return mask
+    return stati2mask(status_set(record['status']))
+
+
+def has_status(record, status):
+    """
+    Tests whether <status> (one of STATI) is one of <record>'s stati.
+    """
+    return bool(get_status_mask(record) & STATUS_BITS[status])
 
 
 def is_interested(record):
     """has expressed an interest in joining"""
-    return 'zaa' in get_status_set(record)
+    return bool(get_status_mask(record) & INTERESTED_BIT)
 
 
 def is_applicant(record):
     """
     Tests whether or not <record> is an applicant.
     """
-    stati = get_status_set(record)
-    if stati & APPLICANT_SET:
-        return True
-    return False
+    return bool(get_status_mask(record) & APPLICANT_MASK)
 
 
 def is_new_applicant(record):
     """
     Hasn't yet attended any meetings
     """
-    stati = get_status_set(record)
-    if stati & {'a'}:
-        return True
-    else: return False
-
-
-def is_inductee(record):
-    '''
-    '''
-    stati = get_status_set(record)
-    if stati & {'ai', 'aw'}:
-        return True
-    else: return False
+    return bool(get_status_mask(record) & NEW_APPLICANT_BIT)
 
 
 def is_waiting(record):
     """
     """
-    return 'aw' in get_status_set(record)
+    return bool(get_status_mask(record) & WAITING_BIT)
 
 
 def is_member(record):
     """
-    Tries to determine if record is that of a member (based on
+    Determines if record is that of a member (based on
     status field.)
-    If there is a problem, will either append notice to
-    club.errors (if it exists) or print out a warning.
     """
-    if not record['status']:
-        return True
-    stati = get_status_set(record)
-    if stati.intersection(set(NON_MEMBER_SET)):
-        return False
-    if 'm' in stati:
-        return True
-    return True
+    return not get_status_mask(record) & NON_MEMBER_MASK
 
 
 def is_non_fee_paying(record):
     """
     """
-    if NON_FEE_PAYING_STATI & get_status_set(record):
-        return True
+    return bool(get_status_mask(record) & NON_FEE_PAYING_MASK)
 
 
 def is_dues_paying(record):
-    if is_non_fee_paying(record):
+    mask = get_status_mask(record)
+    if mask & NON_FEE_PAYING_MASK:
         return False
-    if is_member(record):
-        return True
-    stati = get_status_set(record)
-    if 'ai' in stati:
-        return True
+    return bool(not mask & NON_MEMBER_MASK or mask & INDUCTEE_BIT)
 
 
 def is_inductee(record):
     """
     """
-    return 'ai' in get_status_set(record)
+    return bool(get_status_mask(record) & INDUCTEE_BIT)
 
 
 def is_new_member(record):
     """
     """
-    return 'm' in get_status_set(record)
+    return bool(get_status_mask(record) & NEW_MEMBER_BIT)
 
 
 def is_honorary_member(record):
     """
     """
-    return 'h' in get_status_set(record)
+    return bool(get_status_mask(record) & HONORARY_BIT)
 
 
 def is_terminated(record):
     """
     """
-    return 't' in get_status_set(record)
+    return bool(get_status_mask(record) & TERMINATED_BIT)
+
+
+def get_status_masks(infile):
+    """
+    Reads the csv file <infile> and returns a 2 tuple:
+    a list of member names ("last, first") and an array of the
+    corresponding status masks.
+    """
+    names = []
+    masks = array.array('Q')
+    with open(infile, 'r', newline='') as file_object:
+        reader = csv.reader(file_object)
+        fieldnames = next(reader, [])
+        for record in get_records(reader, fieldnames):
+            names.append(get_last_first(record))
+            masks.append(record.status_mask)
+    return names, masks
+
+
+def classify_file(infile, categories=MASK_TESTS):
+    """
+    Classifies all the records of <infile> at once.
+    <categories> is a dict keyed by category with values that are
+    tests to be applied to a status mask (as in MASK_TESTS.)
+    Returns a dict keyed by category; each value is a list of the
+    names (in file order) of those belonging to that category.
+    """
+    names, masks = get_status_masks(infile)
+    ret = {}
+    for category, test in categories.items():
+        ret[category] = [name for name, mask in zip(names, masks)
+                         if test(mask)]
+    return ret
 
 
 def increment_napplicants(record, club):
@@ -280,7 +949,7 @@ def is_member_or_applicant(record, club=None):
 
 
 def has_valid_email(record, club=None):
-    if 'be' in get_status_set(record):
+    if get_status_mask(record) & BAD_EMAIL_BIT:
         return False
     if record["email"]:
         return True
@@ -289,7 +958,7 @@ def has_valid_email(record, club=None):
 
 
 def letter_returned(record, club=None):
-    return 'ba' in get_status_set(record)
+    return bool(get_status_mask(record) & BAD_ADDRESS_BIT)
 
 
 def get_usps(record, club):
@@ -305,7 +974,7 @@ def get_usps(record, club):
 
 
 def get_bad_emails(record, club):
-    if 'be' in get_status_set(record):
+    if get_status_mask(record) & BAD_EMAIL_BIT:
         club.bad_emails.append(demographic_f.format(**record))
 
 
@@ -322,15 +991,12 @@ def get_zeros_and_nulls(record, club):
     """
     Populates club.zeros and club.nulls lists.
     """
-    dues = record['dues']
-    try:
-        value = int(dues)
-    except ValueError:
+    value = get_money(record, 'dues')
+    if value is None:
         club.nulls.append("{last}, {first}: {dues}".format(**record))
-    else:
-        if value == 0:
-            club.zeros.append("{last}, {first}: {dues}".format(
-                                                    **record))
+    elif value == 0:
+        club.zeros.append("{last}, {first}: {dues}".format(
+                                                **record))
 
 
 # # Beginning of 'add2' functions:
@@ -360,19 +1026,44 @@ def add2db_emails(record, club):
     club.db_emails[name] = email
 
 
+def canonical_email(email):
+    """
+    Returns the form of <email> used for matching: trimmed and case
+    folded and, for gmail addresses, without dots or '+' alias in
+    the user name (all go to the same inbox- see
+    Pymail.send.pseudo_recipient.)
+    """
+    email = email.strip().casefold()
+    user, at, domain = email.rpartition('@')
+    if at and domain in GMAIL_DOMAINS:
+        user = user.split('+')[0].replace('.', '')
+        return user + '@gmail.com'
+    return email
+
+
 def add2ms_by_email(record, club):
     """
-    Populates club.ms_by_email, a dict keyed by emails one of which
-    is NO_EMAIL_KEY to capture members without an email address.
+    Populates club.ms_by_email, a dict keyed by (canonical- see
+    canonical_email) emails one of which is NO_EMAIL_KEY to capture
+    members without an email address.
     """
     name = member_name(record, club)
-    email = record['email']
+    email = canonical_email(record['email'])
     if not email:
         email = NO_EMAIL_KEY
     _ = club.ms_by_email.setdefault(email, [])
     club.ms_by_email[email].append(name)
 
 
+def get_shared_emails(ms_by_email):
+    """
+    Returns a dict of those entries of <ms_by_email> (as populated
+    by add2ms_by_email) with more than one name.
+    """
+    return {email: names for email, names in ms_by_email.items()
+            if len(names) > 1 and email != NO_EMAIL_KEY}
+
+
 redacted = '''
 def add2email_data(record, club):
     """
@@ -422,25 +1113,21 @@ def add2applicant_with_email_set(record, club):
 def add2fee_data(record, club):
     """
     Populates club.fee_category_by_m  and
-    club.ms_by_fee_category if these attributes exist.
+    club.ms_by_fee_category (both set up by traverse_records.)
     """
     name = member_name(record, club)
     # print(repr(FEES_KEYS))
     for key in FEES_KEYS:
         # print("Checking key '{}' for {}".format(key, name))
-        try:
-            fee = int(record[key])
-        except ValueError:
-            # print("'{}' => ValueError".format(record[key]))
+        fee = get_money(record, key)
+        if fee is None:
             continue
         capped = key.capitalize()
         # print("'{}' <=> {}".format(name, capped))
-        if hasattr(club, 'ms_by_fee_category'):
-            _ = club.ms_by_fee_category.setdefault(capped, [])
-            club.ms_by_fee_category[capped].append((name, fee))
-        if hasattr(club, 'fee_category_by_m'):
-            _ = club.fee_category_by_m.setdefault(name, [])
-            club.fee_category_by_m[name].append((capped, fee))
+        _ = club.ms_by_fee_category.setdefault(capped, [])
+        club.ms_by_fee_category[capped].append((name, fee))
+        _ = club.fee_category_by_m.setdefault(name, [])
+        club.fee_category_by_m[name].append((capped, fee))
 
 
 def add2malformed(record, club=None):
@@ -459,12 +1146,9 @@ def add2malformed(record, club=None):
         club.malformed.append("{}: Wrong # of fields.".format(name))
     for key in MONEY_KEYS:
         value = record[key]
-        if value:
-            try:
-                res = int(value)
-            except ValueError:
-                club.malformed.append("{}, {}:{}".format(
-                                        name, key, value))
+        if value and get_money(record, key) is None:
+            club.malformed.append("{}, {}:{}".format(
+                                    name, key, value))
     if record["email"] and '@' not in record["email"]:
         club.malformed.append("{}: {} Problem /w email.".format(
                                             name, record['email']))
@@ -562,15 +1246,12 @@ def modify_data(csv_in_file_name, func, club):
     csv file named <csv_in_file_name>.
     <club> provides a method of passing values prn.
     """
-    with open(csv_in_file_name, 'r') as file_obj:
-        reader = csv.DictReader(file_obj)
-        for rec in reader:
-            yield func(rec, club)
+    yield from pipeline.pipe(pipeline.csv_source(csv_in_file_name),
+                             pipeline.map_with(func, club))
 
 
 def get_name_key_from_line(line):
-    parts = line.split()
-    return "{1}, {0}".format(*parts)
+    return name_key_from_words(line)
 
 
 def show_by_status(by_status,
@@ -607,7 +1288,8 @@ def dues_owing(record, club=None):
     """
     Checks if there is a positive balance in the dues field.
     """
-    if record["dues"] and int(record["dues"]) > 0:
+    dues = get_money(record, "dues")
+    if dues and dues > 0:
         return True
     return False
 
@@ -617,7 +1299,8 @@ def not_paid_up(record, club=None):
     Checks if there is a positive balance in any of the money fields.
     """
     for key in MONEY_KEYS:
-        if record[key] and int(record[key]) > 0:
+        amount = get_money(record, key)
+        if amount and amount > 0:
             return True
     return False
 
@@ -632,9 +1315,10 @@ def get_statement_dict(record):
     ret = dict()
     ret['total'] = 0
     for key in MONEY_KEYS:
-        if record[key]:
-            ret[key] = int(record[key])
-            ret['total'] += ret[key]
+        amount = get_money(record, key)
+        if amount is not None:
+            ret[key] = amount
+            ret['total'] += amount
     return ret
 
 
@@ -704,14 +1388,14 @@ def get_payables(record, club):
     positives are added to club.still_owing,
     negatives to club.advance_payments.
     """
-    if 'r' in get_status_set(record):
+    if get_status_mask(record) & RETIRING_BIT:
         return
     name = "{last}, {first}: ".format(**record)
     line_positive = []
     line_negative = []
     for key in MONEY_KEYS:
-        if record[key]:
-            amount = int(record[key])
+        amount = get_money(record, key)
+        if amount:
             if amount > 0:
                 line_positive.append("{:<5}{:>4d}".format(
                     key, amount))
@@ -730,12 +1414,16 @@ def get_payables(record, club):
 
 
 def name_w_demographics(record, club):
+    """
+    Returns <record>'s demographics formatted by club.PATTERN4WEB.
+    Doesn't modify <record> (which may be shared by other
+    collectors.)
+    """
     stati = get_status_set(record)
-    if not record['email']:
-        record['email'] = 'no email'
-    if not record['phone']:
-        record['phone'] = 'no phone'
-    line = club.PATTERN4WEB.format(**record)
+    line = club.PATTERN4WEB.format(**dict(
+        record,
+        email=record['email'] or 'no email',
+        phone=record['phone'] or 'no phone'))
     if "be" in stati:
         line = line + " (bad email!)"
     if "ba" in stati:
@@ -750,8 +1438,9 @@ def add2lists(record, club):
               club.inductees and
               club.errors (initially empty lists)
     and increments club.nmembers,
-                   club.napplicants and
                    club.ninductees (initially set to 0.)
+    Applicants are counted by increment_napplicants which clients
+    needing club.napplicants must also include.
     <club> is an instance of rbc.Club.
     """
     line = name_w_demographics(record, club)
@@ -772,8 +1461,7 @@ def add2lists(record, club):
         assert len(status) == 1
 #       if 'a0' in status:
 #           print("{} found".format(member_name(record, club)))
-        club.napplicants += 1
-        s = status.pop()
+        s = next(iter(status))
         _ = club.by_n_meetings.setdefault(s, [])
         club.by_n_meetings[s].append(line)
         # add metadata here (dates of meetings; sponsors)
@@ -795,10 +1483,7 @@ def populate_non0balance_func(record, club):
     total = 0
     name = member_name(record, club)
     for key in MONEY_KEYS:
-        try:
-            money = int(record[key])
-        except ValueError:
-            money = 0
+        money = get_money(record, key)
         if money:
             _ = club.non0balance.setdefault(name, {})
             club.non0balance[name][key] = money
@@ -811,7 +1496,7 @@ def populate_name_set_func(record, club):
 def add_dues_fees2new_db_func(record, club):
     """
     Prerequisites: 
-        club.extra_fee_names: a dict-
+        club.by_name: a dict-
             key: sting- "last, first" name
             value: list of tuples- (category, amount)
         club.extra_fee_names: set of keys of above dict.
@@ -819,6 +1504,15 @@ def add_dues_fees2new_db_func(record, club):
     Each record processed is duplicated, dues/fees added (if provided)
     and then added to club.new_db.
     """
+    club.new_db.append(add_dues_fees(record, club))
+
+
+def add_dues_fees(record, club):
+    """
+    Returns a copy of <record> with dues and fees (if any) added.
+    (See add_dues_fees2new_db_func for prerequisites.)
+    Suitable for pipeline.map_with.
+    """
     new_record = {}
     for key in record.keys():
         new_record[key] = record[key]
@@ -833,13 +1527,13 @@ def add_dues_fees2new_db_func(record, club):
                 new_record[category] = helpers.str_add(
                     amount,
                     new_record[category])
-    club.new_db.append(new_record)
+    return new_record
 
 
 # #### Next group of methods deal with sending out mailings. #######
 # Clients must set up the following attributes of the 'club' parameter
 # typically an instance of the Membership class:
-#    email, letter, json_data,
+#    email, letter (content.Template instances), json_data,
 
 
 def append_email(record, club):
@@ -849,7 +1543,6 @@ def append_email(record, club):
     Returns a list of dicts.
     """
 #   print(club.email)
-    body = club.email.format(**record)
     sender = club.which['from']['email']
     email = {
         'From': sender,    # Mandatory field.
@@ -860,23 +1553,38 @@ def append_email(record, club):
         'Bcc': None,            # O or 1 comma separated list.
         'Subject': club.which['subject'],  # 0 or 1
         'attachments': [],
-        'body': body,
     }
     if club.cc:
         email['Cc'] = club.cc
     if club.bcc:
         email['Bcc'] = club.bcc
-    club.json_data.append(email)
+    if (isinstance(club.json_data, pipeline.TemplatedEmailSink)
+            and not club.email.indentation):  # Rendered when sent.
+        club.json_data.append_templated(email, club.email.text,
+                                        club.email.variables(record))
+    else:
+        email['body'] = club.email.render(record)
+        club.json_data.append(email)
 
 
 def file_letter(record, club):
-    entry = club.letter.format(**record)
-    path2write = os.path.join(club.MAILING_DIR,
-                              "_".join((record["last"],
-                                        record["first"])))
+    """
+    club.letter is a content.Template (already indented for the
+    printer.) The letter goes into club.spool if there is one (see
+    prepare_mailing) otherwise into its own file: written by
+    club.letter_writer if there is one.
+    """
+    name = "_".join((record["last"], record["first"]))
+    if club.letter_writer is not None:
+        club.letter_writer.submit(name, record)
+        return
+    entry = club.letter.render(record)
+    if club.spool is not None:
+        club.spool.add(name, entry)
+        return
+    path2write = os.path.join(club.MAILING_DIR, name)
     with open(path2write, 'w') as file_obj:
-        file_obj.write(helpers.indent(entry,
-                                      club.lpr["indent"]))
+        file_obj.write(entry)
 
 
 def q_mailing(record, club):
@@ -888,7 +1596,7 @@ def q_mailing(record, club):
     append_email
     """
     record["subject"] = club.which["subject"]
-    if (record['status'] and 'be' in record['status']
+    if (get_status_mask(record) & BAD_EMAIL_BIT
             and not club.which["e_and_or_p"] == "email"):
         # If only sending emails...
         # don't want to send a letter (even if known bad email.)
@@ -917,16 +1625,37 @@ def prepare_mailing(club):
                             utils.thank_cmd
     Both use utils.prepare4mailing to assign attributes to <club>
     (See Notes/call_flow.)
-    """
-    traverse_records(club.input_file_name,
-                     club.which["funcs"],
-                     club)  # 'which' comes from content
-    # No point in creating a json file if no emails:
-    if club.json_data:
+    Emails are written to club.json_file_name as they are
+    prepared (club.json_data is a pipeline.TemplatedEmailSink or, if
+    the file name ends in '.json', a JsonArraySink.)
+    If club.spool_file is set, letters are written into it (a
+    pipeline.LetterSpool) rather than a file each in the mail dir
+    (by a pipeline.LetterWriter.)
+    """
+    # No json file is created if there are no emails.
+    if club.spool_file:  # Letters all go into one file.
+        spool = pipeline.LetterSpool(club.spool_file)
+        writer = contextlib.nullcontext()
+    else:
+        spool = contextlib.nullcontext()
+        writer = pipeline.LetterWriter(club.MAILING_DIR, club.letter,
+                                       club.LETTER_WORKERS)
+    with pipeline.email_sink(club.json_file_name) as club.json_data, \
+            spool as club.spool, writer as club.letter_writer:
+        traverse_records(club.input_file_name,
+                         club.which["funcs"],
+                         club)  # 'which' comes from content
+    club.spool = club.letter_writer = None
+    if club.spool_file:
+        print('Spooled {} letter(s) into "{}".'.format(
+            spool.count, club.spool_file))
+    elif writer.count:
+        print('Filed {} letter(s) into "{}".'.format(
+            writer.count, club.MAILING_DIR))
+    if club.json_data.count:
         print("There is email to send.")
-        with open(club.json_file_name, 'w') as file_obj:
-            print('Dumping JSON to "{}".'.format(file_obj.name))
-            file_obj.write(json.dumps(club.json_data))
+        print('Wrote {} email(s) to "{}".'.format(
+            club.json_data.count, club.json_file_name))
     else:
         print("There are no emails to send.")
 
@@ -1025,127 +1754,145 @@ def send_attachment(record, club):
                        )
 
 
+class Container(object):
+    """
+    Declares a club attribute required by a collector:
+    <name> is the attribute's name and <factory> is called
+    (without arguments) to provide its initial value.
+    See the prerequisites dict (below.)
+    """
+
+    __slots__ = ('name', 'factory')
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+
+    def __repr__(self):
+        return "Container({!r}, {!r})".format(self.name, self.factory)
+
+    def bind(self, club):
+        """
+        Sets up (or resets) the attribute of <club>.
+        """
+        setattr(club, self.name, self.factory())
+
+
+ADD2LISTS_PATTERN = ("{first} {last}  [{phone}]  {address}, " +
+                     "{town}, {state} {postal_code} [{email}]")
+ADD2NAMES_PATTERN = "{last}, {first} {phone}"
+
 prerequisites = {   # collectors needed by the
                     # various traversing functions
-    add2db_emails: [
-        "club.db_emails = {}",
-        ],
-    ck_number_of_fields: [
-        "club.errors = []",
-        ],
-    increment_nmembers: [
-        "club.nmembers = 0",
-        ],
-    increment_napplicants: [
-        "club.napplicants = 0",
-        ],
-    get_usps: [
-        'club.usps_only = []',
-        ],
-    get_zeros_and_nulls: [
-        'club.nulls = []',
-        'club.zeros = []',
-        ],
-    add2email_by_m: [
-        'club.email_by_m = {}',
-        ],
-    add2ms_by_email: [
-        'club.ms_by_email = {}',
-        ],
-    add2stati_by_m: [
-        'club.stati_by_m = {}',
-        ],
-    # Next one is ??? being redacted?
-#   add2email_data: [
-#       'club.email_by_m = {}',
-#       'club.ms_by_email = {}',
-#       'club.without_email = []',
-#       ],
-    add2ms_by_status: [
-        'club.ms_by_status = {}',
-        ],
-    #   add2status_data: [
-    #       'club.ms_by_status = {}',
-    #       'club.napplicants = 0',
-    #       'club.stati_by_m = {}',
-    #       ],
-    add2member_with_email_set: [
-        'club.member_with_email_set = set()',
-        ],
-    add2applicant_with_email_set: [
-        'club.applicant_with_email_set = set()',
-        ],
-    add2demographics: [
-        'club.demographics = {}',
-        ],
-    add2fee_data: [
-        'club.fee_category_by_m = {}',
-        'club.ms_by_fee_category = {}',
-        ],
-    add2malformed: [
-        'club.malformed = []',
-        ],
-    add2lists: [
-        """club.pattern = ("{first} {last}  [{phone}]  {address}, " +
-                    "{town}, {state} {postal_code} [{email}]")""",
-        'club.members = []',
-        'club.nmembers = 0',
-        'club.honorary = []',
-        'club.nhonorary = 0',
-        'club.by_n_meetings = {}',
-        'club.napplicants = 0',
-        'club.errors = []',
-        ],
-    add2names: [
-        'club.pattern = ("{last}, {first} {phone}")',
-        'club.names = []',
-        'club.errors = []',
-        ],
-    get_payables: [
-        'club.still_owing = []',
-        'club.advance_payments = []',
-        ],
-    get_secretary: [
-        'club.secretary = ""',
-        ],
-    get_bad_emails: [
-        'club.bad_emails = []',
-        ],
-    #   dues_and_fees: [
-    #       'club.null_dues = []',
-    #       'club.members_owing = []',
-    #       'club.members_zero_or_cr = []',
-    #       'club.dues_balance = 0',
-    #       'club.fees_balance = 0',
-    #       'club.retiring = []',
-    #       'club.applicants = []',
-    #       'club.errors = []',
-    #       ],
-    populate_non0balance_func: [
-        "club.errors = []",
-        "club.non0balance = {}",
-        ],
-    populate_name_set_func: [
-        "club.name_set = set()",
-        ],
-    std_mailing_func: [
-        "club.json_data = []",
-        ],
-    db_apply_charges: [
-        "club.new_db = {}",
-        ],
-    add2statement_data: [
-        'club.statement_data = {}',
-        ],
-    #   add2status_data: [
-    #       'club.ms_by_status = {}',
-    #       ],
-    add_dues_fees2new_db_func: [
-        'club.new_db = []',
-        ]
+    add2db_emails: (
+        Container('db_emails', dict),
+        ),
+    ck_number_of_fields: (
+        Container('errors', list),
+        ),
+    increment_nmembers: (
+        Container('nmembers', int),
+        ),
+    increment_napplicants: (
+        Container('napplicants', int),
+        ),
+    get_usps: (
+        Container('usps_only', list),
+        ),
+    get_zeros_and_nulls: (
+        Container('nulls', list),
+        Container('zeros', list),
+        ),
+    add2email_by_m: (
+        Container('email_by_m', dict),
+        ),
+    add2ms_by_email: (
+        Container('ms_by_email', dict),
+        ),
+    add2stati_by_m: (
+        Container('stati_by_m', dict),
+        ),
+    add2ms_by_status: (
+        Container('ms_by_status', dict),
+        ),
+    add2member_with_email_set: (
+        Container('member_with_email_set', set),
+        ),
+    add2applicant_with_email_set: (
+        Container('applicant_with_email_set', set),
+        ),
+    add2demographics: (
+        Container('demographics', dict),
+        ),
+    add2fee_data: (
+        Container('fee_category_by_m', dict),
+        Container('ms_by_fee_category', dict),
+        ),
+    add2malformed: (
+        Container('malformed', list),
+        ),
+    add2lists: (
+        Container('pattern', lambda: ADD2LISTS_PATTERN),
+        Container('members', list),
+        Container('nmembers', int),
+        Container('honorary', list),
+        Container('nhonorary', int),
+        Container('by_n_meetings', dict),
+        Container('napplicants', int),
+        Container('errors', list),
+        ),
+    add2names: (
+        Container('pattern', lambda: ADD2NAMES_PATTERN),
+        Container('names', list),
+        Container('errors', list),
+        ),
+    get_payables: (
+        Container('still_owing', list),
+        Container('advance_payments', list),
+        ),
+    get_secretary: (
+        Container('secretary', str),
+        ),
+    get_bad_emails: (
+        Container('bad_emails', list),
+        ),
+    populate_non0balance_func: (
+        Container('errors', list),
+        Container('non0balance', dict),
+        ),
+    populate_name_set_func: (
+        Container('name_set', set),
+        ),
+    db_apply_charges: (
+        Container('new_db', dict),
+        ),
+    add2statement_data: (
+        Container('statement_data', dict),
+        ),
+    add_dues_fees2new_db_func: (
+        Container('new_db', list),
+        ),
     }
 
 
+# The collectors which only add to their own containers (see
+# prerequisites) and so can be run by traverse_records_incrementally:
+INCREMENTAL_FUNCS = frozenset((
+    add2db_emails,
+    add2email_by_m,
+    add2ms_by_email,
+    add2fee_data,
+    add2stati_by_m,
+    add2ms_by_status,
+    add2demographics,
+    increment_napplicants,
+    add2malformed,
+    add2member_with_email_set,
+    add2applicant_with_email_set,
+    get_payables,
+    ))
+
+
 func_dict['rm_email_only_field'] = (
     rm_email_only_field,
     ("first", "last", "phone", "address", "town", "state",
@@ -1160,12 +1907,12 @@ def setup_required_attributes(custom_funcs, club):
     Ensures that club has necessary attributes
     required by all the custom_funcs to be called.
     Relies on the above prerequisites dict.
+    Collectors can therefore count on their attributes
+    being present (no need for hasattr checks.)
     """
-    set_of_funcs = set(prerequisites.keys())
     for func in custom_funcs:
-        if func in set_of_funcs:
-            for code in prerequisites[func]:
-                exec(code)
+        for container in prerequisites.get(func, ()):
+            container.bind(club)
 
 
 if __name__ == "__main__":
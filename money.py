@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+# File: money.py
+
+"""
+A columnar view of the money fields (member.MONEY_KEYS) of the
+membership data base for the summaries the treasurer runs all
+the time: payables, zeros (and nulls), outstanding totals and
+the 'is anyone still owing' check done by data.restore_fees.
+The amounts are loaded once into an integer array (one column
+per money key, 0 where blank or invalid) with a parallel mask of
+nulls and a list of names, so these are computed array wide.
+Uses numpy if it's available; otherwise falls back on (slower
+but equivalent) lists.
+Output is as provided by the corresponding collectors in
+member.py (get_payables, get_zeros_and_nulls, ...)
+"""
+
+import member
+import database
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class MoneyColumns(object):
+    """
+    <names>: "last, first" for each record (in file order.)
+    <dues>: the dues field as found (for zeros and nulls.)
+    <amounts>: n x len(MONEY_KEYS) ints (0 if null.)
+    <nulls>: n x len(MONEY_KEYS) True where the field isn't an int.
+    <retiring>: n bools- those with the 'r' status.
+    With numpy the last three are arrays; otherwise lists of lists.
+    """
+
+    __slots__ = ('names', 'dues', 'amounts', 'nulls', 'retiring')
+
+    def __init__(self, names, dues, money, retiring):
+        self.names = names
+        self.dues = dues
+        amounts = [[amount or 0 for amount in row] for row in money]
+        nulls = [[amount is None for amount in row] for row in money]
+        if numpy is not None:
+            n_keys = len(member.MONEY_KEYS)
+            self.amounts = numpy.array(amounts, dtype=numpy.int64
+                                       ).reshape(-1, n_keys)
+            self.nulls = numpy.array(nulls, dtype=bool
+                                     ).reshape(-1, n_keys)
+            self.retiring = numpy.array(retiring, dtype=bool)
+        else:
+            self.amounts = amounts
+            self.nulls = nulls
+            self.retiring = retiring
+
+    def __len__(self):
+        return len(self.names)
+
+    def row(self, n):
+        """
+        Returns the amounts of the <n>th record as a list of ints.
+        """
+        if numpy is not None:
+            return self.amounts[n].tolist()
+        return self.amounts[n]
+
+
+def load_columns(infile):
+    """
+    Returns a MoneyColumns instance for the records of <infile>
+    (a csv file or an SQLite data base- see database.py.)
+    """
+    if database.is_database(infile):
+        rows = database.read_rows(infile)
+    else:
+        rows = iter(member.read_rows(infile))
+    fieldnames = next(rows, [])
+    names = []
+    dues = []
+    money = []
+    retiring = []
+    for record in member.get_records(rows, fieldnames):
+        names.append(member.get_name_key(record))
+        dues.append(record['dues'])
+        money.append(record.money)
+        retiring.append(
+            bool(member.get_status_mask(record) & member.RETIRING_BIT))
+    return MoneyColumns(names, dues, money, retiring)
+
+
+def rows_where(columns, sign):
+    """
+    Returns the indices of the (non retiring) records with at least
+    one amount of the given <sign> (1: owing, -1: credit.)
+    """
+    if numpy is not None:
+        selected = ((columns.amounts * sign) > 0).any(axis=1)
+        return numpy.flatnonzero(selected & ~columns.retiring).tolist()
+    return [n for n, row in enumerate(columns.amounts)
+            if not columns.retiring[n]
+            and any(amount * sign > 0 for amount in row)]
+
+
+def payables_lines(columns, sign):
+    """
+    Formats (as does member.get_payables) the lines for the
+    records selected by rows_where(columns, <sign>.)
+    """
+    ret = []
+    for n in rows_where(columns, sign):
+        ret.append("{:<30}".format(columns.names[n] + ": ") +
+                   ', '.join("{:<5}{:>4d}".format(key, amount)
+                             for key, amount in zip(member.MONEY_KEYS,
+                                                    columns.row(n))
+                             if amount * sign > 0))
+    return ret
+
+
+def get_payables(columns):
+    """
+    Returns (still_owing, advance_payments): what traversing with
+    member.get_payables leaves in the club attributes of the same
+    names.
+    """
+    return payables_lines(columns, 1), payables_lines(columns, -1)
+
+
+def get_zeros_and_nulls(columns):
+    """
+    Returns (zeros, nulls) as member.get_zeros_and_nulls would.
+    """
+    dues_n = member.MONEY_INDEX['dues']
+    if numpy is not None:
+        null = columns.nulls[:, dues_n]
+        zero = ~null & (columns.amounts[:, dues_n] == 0)
+        zeros = numpy.flatnonzero(zero).tolist()
+        nulls = numpy.flatnonzero(null).tolist()
+    else:
+        zeros = [n for n in range(len(columns))
+                 if not columns.nulls[n][dues_n]
+                 and columns.amounts[n][dues_n] == 0]
+        nulls = [n for n in range(len(columns))
+                 if columns.nulls[n][dues_n]]
+    return (["{}: {}".format(columns.names[n], columns.dues[n])
+             for n in zeros],
+            ["{}: {}".format(columns.names[n], columns.dues[n])
+             for n in nulls])
+
+
+def get_non0balance(columns):
+    """
+    Returns what member.populate_non0balance_func collects: a dict
+    keyed by name (of those with any non zero amount) of dicts
+    keyed by money key (non zero amounts only.)
+    """
+    if numpy is not None:
+        selected = numpy.flatnonzero(
+            (columns.amounts != 0).any(axis=1)).tolist()
+    else:
+        selected = [n for n, row in enumerate(columns.amounts)
+                    if any(row)]
+    ret = {}
+    for n in selected:
+        _ = ret.setdefault(columns.names[n], {})
+        ret[columns.names[n]].update(
+            (key, amount) for key, amount in
+            zip(member.MONEY_KEYS, columns.row(n)) if amount)
+    return ret
+
+
+def get_totals(columns):
+    """
+    Returns a dict keyed by MONEY_KEYS and 'total' with values
+    (owing, credit): the sums of the positive and negative amounts
+    of the non retiring records.
+    """
+    if numpy is not None:
+        amounts = columns.amounts[~columns.retiring]
+        owing = numpy.where(amounts > 0, amounts, 0).sum(axis=0)
+        credit = numpy.where(amounts < 0, amounts, 0).sum(axis=0)
+        owing, credit = owing.tolist(), credit.tolist()
+    else:
+        owing = [0] * len(member.MONEY_KEYS)
+        credit = [0] * len(member.MONEY_KEYS)
+        for n, row in enumerate(columns.amounts):
+            if columns.retiring[n]:
+                continue
+            for i, amount in enumerate(row):
+                if amount > 0:
+                    owing[i] += amount
+                else:
+                    credit[i] += amount
+    ret = {key: (owing[n], credit[n])
+           for n, key in enumerate(member.MONEY_KEYS)}
+    ret['total'] = (sum(owing), sum(credit))
+    return ret
+
+
+def still_owing(columns):
+    """
+    Returns the names of (non retiring) members with an amount owing.
+    """
+    return [columns.names[n] for n in rows_where(columns, 1)]
+
+
+if __name__ == "__main__":
+    print("money.py compiles OK.")
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+
+# File: pipeline.py
+
+"""
+A small pipeline API built on generators:
+    source => filter => map => tee => sink
+Records are pulled through one at a time so memory use doesn't
+grow with the number of records.  e.g.
+
+    n = csv_sink(pipe(csv_source(infile),
+                      filter_by(member.is_member),
+                      map_with(member.credit_payment_func, club)),
+                 outfile, fieldnames)
+
+Sources:  csv_source (membership data base, 2thank.csv, ...)
+          email_source (the file of emails prepared for sending:
+          jsonl_source or, for the older format, json_source.)
+Stages:   filter_by, map_with, tee (each returns a function which
+          takes and returns an iterable; see pipe.)
+Sinks:    csv_sink, json_sink (or JsonArraySink), jsonl_sink (or
+          JsonlSink; email_sink chooses, for the emails file, between
+          JsonArraySink and TemplatedEmailSink),
+          letters_sink (or LetterWriter), spool_sink (or LetterSpool)
+          and send_sink (Pymail/Bashmail send.)
+Sinks consume the records and return how many there were.
+"""
+
+import os
+import csv
+import json
+import collections
+import concurrent.futures
+import helpers
+
+
+# Sources:
+
+def csv_source(infile, club=None):
+    """
+    A generator: yields a dict for each record of the csv <infile>
+    (as csv.DictReader does.)  If <club> is provided, its fieldnames
+    attribute is assigned.
+    """
+    with open(infile, 'r', newline='') as file_obj:
+        reader = csv.DictReader(file_obj)
+        if club is not None:
+            club.fieldnames = reader.fieldnames
+        yield from reader
+
+
+def json_source(json_file, chunk_size=1 << 16):
+    """
+    A generator: yields, one at a time, the objects of the json
+    array (of objects) in <json_file> without reading in (or
+    decoding) the whole file at once.
+    """
+    decoder = json.JSONDecoder()
+    with open(json_file, 'r') as file_obj:
+        print('Reading JSON file "{}".'.format(file_obj.name))
+        buffer = ''
+        started = False
+        eof = False
+        while not eof:
+            chunk = file_obj.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos == len(buffer):
+                    break
+                if not started:
+                    if buffer[pos] != '[':
+                        raise ValueError('"{}" is not a json array.'
+                                         .format(json_file))
+                    started = True
+                    pos += 1
+                    continue
+                if buffer[pos] == ']':
+                    return
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    break  # Need more of the file.
+                yield item
+            buffer = buffer[pos:]
+        if started:
+            raise ValueError('"{}": unterminated json array.'
+                             .format(json_file))
+
+
+def jsonl_source(jsonl_file):
+    """
+    A generator: yields the object on each (non blank) line of
+    <jsonl_file>. A last line without its line feed is taken to be
+    one which was being written when the writer was interrupted so,
+    if it can't be decoded, it is reported and skipped.
+    """
+    with open(jsonl_file, 'r') as file_obj:
+        print('Reading JSONL file "{}".'.format(file_obj.name))
+        for line in file_obj:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise
+                print('Ignoring incomplete last line of "{}".'
+                      .format(jsonl_file))
+
+
+def is_json_array(json_file):
+    """
+    Returns True if <json_file> (an existing file) begins (ignoring
+    white space) with a '[' rather than with a line of JSONL.
+    """
+    with open(json_file, 'r') as file_obj:
+        for chunk in iter(lambda: file_obj.read(256), ''):
+            chunk = chunk.lstrip()
+            if chunk:
+                return chunk[0] == '['
+    return False
+
+
+def email_source(email_file):
+    """
+    A generator: yields the emails (dicts as prepared by
+    member.append_email) in <email_file> be it a JSONL file (the
+    bodies of templated emails are rendered: see render_emails) or
+    (as used to be written) a json array.
+    """
+    if is_json_array(email_file):
+        yield from json_source(email_file)
+    else:
+        yield from render_emails(jsonl_source(email_file))
+
+
+# Stages:
+
+def pipe(source, *stages):
+    """
+    Returns the iterable resulting from applying each of the
+    <stages> in turn to the <source> iterable.
+    """
+    for stage in stages:
+        source = stage(source)
+    return source
+
+
+def filter_by(test, *args):
+    """
+    Stage: passes on only the records for which
+    <test>(record, *args) is true.
+    """
+    def stage(records):
+        for record in records:
+            if test(record, *args):
+                yield record
+    return stage
+
+
+def map_with(func, *args):
+    """
+    Stage: passes on <func>(record, *args) for each record.
+    """
+    def stage(records):
+        for record in records:
+            yield func(record, *args)
+    return stage
+
+
+def tee(func, *args):
+    """
+    Stage: calls <func>(record, *args) (typically a collector such
+    as those in member.py) and passes the record on unchanged.
+    """
+    def stage(records):
+        for record in records:
+            func(record, *args)
+            yield record
+    return stage
+
+
+# Sinks:
+
+def drain(records):
+    """
+    Consumes <records> (for the sake of the side effects of the
+    stages) and returns how many there were.
+    """
+    n = 0
+    for n, _ in enumerate(records, 1):
+        pass
+    return n
+
+
+def csv_sink(records, outfile, fieldnames):
+    """
+    Writes <records> (dicts keyed by <fieldnames>) into a new csv
+    file named <outfile>.
+    """
+    n = 0
+    with open(outfile, 'w') as file_obj:
+        print("Opening {} for output...".format(file_obj.name))
+        writer = csv.DictWriter(file_obj, fieldnames)
+        writer.writeheader()
+        for n, record in enumerate(records, 1):
+            writer.writerow(record)
+    return n
+
+
+class JsonArraySink(object):
+    """
+    Writes items, as they are appended, into <json_file> as a json
+    array (identical to what json.dump of a list would produce.)
+    The file is only created once there's something to write so
+    <count> being 0 means there's no file.
+    To be used as a context manager (or close must be called.)
+    """
+
+    def __init__(self, json_file):
+        self.json_file = json_file
+        self.file_obj = None
+        self.count = 0
+
+    def append(self, item):
+        if self.file_obj is None:
+            self.file_obj = open(self.json_file, 'w')
+            self.file_obj.write('[')
+        else:
+            self.file_obj.write(', ')
+        self.file_obj.write(json.dumps(item))
+        self.count += 1
+
+    def close(self):
+        if self.file_obj is not None:
+            self.file_obj.write(']')
+            self.file_obj.close()
+            self.file_obj = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def json_sink(records, json_file):
+    """
+    Writes <records> into <json_file> as a json array.
+    """
+    with JsonArraySink(json_file) as sink:
+        for record in records:
+            sink.append(record)
+    return sink.count
+
+
+class JsonlSink(object):
+    """
+    As JsonArraySink but writes <jsonl_file>: one json object per
+    line. Each line is flushed as it is written so what's been
+    written so far can be read (see jsonl_source) even if the
+    writer is interrupted.
+    """
+
+    def __init__(self, jsonl_file):
+        self.json_file = jsonl_file
+        self.file_obj = None
+        self.count = 0
+
+    def write(self, item):
+        if self.file_obj is None:
+            self.file_obj = open(self.json_file, 'w')
+        self.file_obj.write(json.dumps(item) + '\n')
+        self.file_obj.flush()
+
+    def append(self, item):
+        self.write(item)
+        self.count += 1
+
+    def close(self):
+        if self.file_obj is not None:
+            self.file_obj.close()
+            self.file_obj = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def jsonl_sink(records, jsonl_file):
+    """
+    Writes <records> into <jsonl_file>, one json object per line.
+    """
+    with JsonlSink(jsonl_file) as sink:
+        for record in records:
+            sink.append(record)
+    return sink.count
+
+
+class TemplatedEmailSink(JsonlSink):
+    """
+    A JsonlSink for emails which, rather than the body of each, can
+    keep the template and the variables needed to render it. What
+    all the emails share (the template's text and the headers other
+    than each email's <own>) is written once, in a line with its
+    "_template" key, "text" and "headers"; each email's line then
+    has its "_template", its <own> headers and the "vars" of its
+    body. See append_templated and, to render them back,
+    render_emails.
+    Emails with a body can be appended as usual.
+    """
+
+    def __init__(self, jsonl_file):
+        JsonlSink.__init__(self, jsonl_file)
+        self.templates = {}  # (text, headers): key
+
+    def append_templated(self, email, text, variables, own=("To",)):
+        """
+        Appends <email> (without its body) to be rendered as
+        <text>.format(**<variables>.) Only its <own> headers are
+        kept with it; the others are kept with the template.
+        """
+        headers = {name: (None if name in own else value)
+                   for name, value in email.items()}
+        signature = (text, json.dumps(headers))
+        key = self.templates.get(signature)
+        if key is None:
+            key = self.templates[signature] = str(len(self.templates))
+            self.write({"_template": key, "text": text,
+                        "headers": headers})
+        item = {"_template": key}
+        item.update((name, email[name]) for name in own if name in email)
+        item["vars"] = variables
+        self.append(item)
+
+
+def render_emails(items):
+    """
+    A generator: yields the emails among <items> (as written by a
+    TemplatedEmailSink) each with its template's headers and its
+    body, rendered as it's yielded, in place of its "_template"
+    and "vars".
+    Items which aren't templated are passed on as is.
+    """
+    templates = {}
+    for item in items:
+        if "_template" not in item:
+            yield item
+        elif "vars" not in item:
+            templates[item["_template"]] = (item["text"],
+                                            item.get("headers", {}))
+        else:
+            text, headers = templates[item["_template"]]
+            email = dict(headers)
+            email.update(item)
+            del email["_template"]
+            email["body"] = text.format(**email.pop("vars"))
+            yield email
+
+
+def email_sink(email_file):
+    """
+    Returns the sink for the emails file: a JsonArraySink if
+    <email_file> ends in '.json' (the old format) otherwise a
+    TemplatedEmailSink.
+    """
+    if email_file.endswith('.json'):
+        return JsonArraySink(email_file)
+    return TemplatedEmailSink(email_file)
+
+
+def letters_sink(records, mail_dir, template, indent=0,
+                 name_pattern="{last}_{first}"):
+    """
+    Files a letter (<template>.format(**record), indented by
+    <indent> spaces) for each of the <records> into <mail_dir>.
+    """
+    n = 0
+    for n, record in enumerate(records, 1):
+        path2write = os.path.join(mail_dir,
+                                  name_pattern.format(**record))
+        with open(path2write, 'w') as file_obj:
+            file_obj.write(helpers.indent(template.format(**record),
+                                          indent))
+    return n
+
+
+class LetterWriter(object):
+    """
+    Renders (<template>.render(record)) and writes letters, each
+    into its own file in <mail_dir>, on a pool of <workers> threads
+    so the latency of opening and closing each file (significant on
+    networked home directories) overlaps that of the others.
+    At most <max_pending> letters are in progress at once: submit
+    waits for the oldest to be done before accepting another.
+    Letters are accounted for (<written>, <count>) and any error is
+    raised in the order they were submitted.
+    To be used as a context manager (or close must be called.)
+    """
+
+    def __init__(self, mail_dir, template, workers=8, max_pending=None):
+        self.mail_dir = mail_dir
+        self.template = template
+        self.max_pending = max_pending or 4 * workers
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+        self.pending = collections.deque()
+        self.written = []  # Paths, in the order submitted.
+        self.count = 0
+
+    def write(self, path2write, record):
+        letter = self.template.render(record)
+        with open(path2write, 'w') as file_obj:
+            file_obj.write(letter)
+        return path2write
+
+    def submit(self, name, record):
+        """
+        Queues the letter to <record> to be written into <name>.
+        The record is copied since the caller may go on to change it.
+        """
+        while len(self.pending) >= self.max_pending:
+            self.complete()
+        self.pending.append(self.executor.submit(
+            self.write, os.path.join(self.mail_dir, name), dict(record)))
+
+    def complete(self):
+        """
+        Waits for the oldest letter in progress.
+        """
+        self.written.append(self.pending.popleft().result())
+        self.count += 1
+
+    def close(self):
+        try:
+            while self.pending:
+                self.complete()
+        finally:
+            for future in self.pending:
+                future.cancel()
+            self.pending.clear()
+            self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def spool_index_file(spool_file):
+    """
+    Returns the name of the index file of <spool_file>.
+    """
+    return spool_file + '.idx'
+
+
+class LetterSpool(object):
+    """
+    Writes letters, as they are added, into the single <spool_file>
+    separated by form feeds (helpers.FORMFEED) so they can all be
+    printed as one job:  $ lpr <spool_file>
+    The (byte) offset and length of each letter is kept, by name,
+    in an index (json: see spool_index_file) so any can be
+    reprinted (see read_spool.)
+    To be used as a context manager (or close must be called.)
+    """
+
+    def __init__(self, spool_file):
+        self.spool_file = spool_file
+        self.file_obj = None
+        self.index = {}  # name: [[offset, length], ...]
+        self.count = 0
+
+    def add(self, name, letter):
+        if self.file_obj is None:
+            self.file_obj = open(self.spool_file, 'wb')
+        else:
+            self.file_obj.write(helpers.FORMFEED.encode('ascii'))
+        data = letter.encode('utf-8')
+        _ = self.index.setdefault(name, [])
+        self.index[name].append([self.file_obj.tell(), len(data)])
+        self.file_obj.write(data)
+        self.count += 1
+
+    def close(self):
+        if self.file_obj is not None:
+            self.file_obj.close()
+            self.file_obj = None
+            with open(spool_index_file(self.spool_file), 'w') as index:
+                json.dump(self.index, index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def spool_sink(records, spool_file, template,
+               name_pattern="{last}_{first}"):
+    """
+    As letters_sink but into a LetterSpool. <template> is a str or
+    a content.Template (already indented.)
+    """
+    with LetterSpool(spool_file) as spool:
+        for record in records:
+            spool.add(name_pattern.format(**record),
+                      template.format(**record))
+    return spool.count
+
+
+def read_spool(spool_file, names):
+    """
+    A generator: yields (name, letter) for each letter spooled
+    (by a LetterSpool) into <spool_file> for each of <names>.
+    Raises KeyError if a name isn't in the index.
+    """
+    with open(spool_index_file(spool_file), 'r') as index:
+        index = json.load(index)
+    with open(spool_file, 'rb') as file_obj:
+        for name in names:
+            for offset, length in index[name]:
+                file_obj.seek(offset)
+                yield name, file_obj.read(length).decode('utf-8')
+
+
+def send_sink(emails, emailer, mta, **kwargs):
+    """
+    Sends <emails> (dicts as prepared by member.append_email)
+    using <emailer>: Pymail.send.send or Bashmail.send.send.
+    """
+    n = [0]
+
+    def count(email):
+        n[0] += 1
+    emailer(pipe(emails, tee(count)), mta, **kwargs)
+    return n[0]
+
+
+if __name__ == "__main__":
+    print("pipeline.py compiles OK.")
@@ -84,11 +84,16 @@ class Club(object):
 
     # Intermediate &/or temporary files used:
     EXTRA_FEES_JSON = 'Data/extra_fees.json'
+    EXTRA_FEES_COMPILED = 'Data/extra_fees.compiled.json'  # see data.get_extra_fees
     EXTRA_FEES_TBL = 'Data/extra_fees.tbl'  # not used!
     TEMP_MEMBERSHIP_SPoT = 'Data/new_memlist.csv'
     OUTPUT2READ = 'Data/2read.txt'  # } generally goes to stdout.
     MAILING_DIR = 'Data/MailingDir'
-    JSON_FILE_NAME4EMAILS = 'Data/emails.json'
+    LETTER_WORKERS = 8  # see pipeline.LetterWriter
+    JSON_FILE_NAME4EMAILS = 'Data/emails.jsonl'  # see pipeline.email_sink
+    JOURNAL_FILE = 'Data/journal.pickle'  # see member.py
+    LEDGER_FILE = 'Data/ledger.pickle'  # see ledger.py
+    TEMPLATES_FILE = 'Data/templates.pickle'  # see content.py
     PATTERN = '{last}, {first}'
     PATTERN4WEB = ('{first} {last} [{phone}] {address}, {town},' +
                    ' {state}, {postal_code} [{email}]')
@@ -105,6 +110,10 @@ class Club(object):
         self.previous_name = ''              # } Used to
         self.previous_name_tuple = ('', '')  # } check
         self.first_letter = ''               # } ordering.
+        self.incremental = False  # see member.traverse_records
+        self.spool_file = None  # } see member.prepare_mailing
+        self.spool = None       # }
+        self.letter_writer = None  # }
 
     def fee_totals(self, infile=RECEIPTS_FILE):
         """
@@ -112,44 +121,14 @@ class Club(object):
         Sets up and populates self.invalid_lines ....
         (... the only reason it's a class method
         rather than a function or a static method.)
-        NOTE: Money taken in (or refunded) must appear
-        within line[23:28]! i.e. maximum 5 digits (munus sign
-        and only 4 digits if negatime).
+        NOTE: Money taken in (or refunded) must start
+        within line[23:28] (see ledger.py.) Only lines appended
+        since the last call are parsed.
         """
-        res = ["Fees taken in to date:"]
-        self.invalid_lines = []
-
-        total = 0
-        subtotal = 0
-        date = ''
-
-        with open(infile, "r") as file_obj:
-            print('Reading from file "{}".'.format(file_obj.name))
-            for line in file_obj:
-                line = line.rstrip()
-                if line[:5] == "Date:":
-                    date = line
-                if (line[24:27] == "---") and subtotal:
-                    res.append("    SubTotal            --- {:>10}"
-                               .format(helpers.format_dollar_value(subtotal)))
-                    subtotal = 0
-                try:
-                    amount = int(line[23:28])
-                except (ValueError, IndexError):
-                    self.invalid_lines.append(line)
-                    continue
-#               res.append("Adding ${}.".format(amount))
-                total += amount
-                subtotal += amount
-#               print(" adding {}, running total is {}"
-#                   .format(amount, total))
-        if subtotal:
-            res.append("    SubTotal            --- {:>10}"
-                       .format(helpers.format_dollar_value(subtotal)))
-        res.append("\nGrand Total to Date:    --- ---- {:>10}"
-                   .format(helpers.format_dollar_value(total)))
-#       print("returning {}".format(res))
-        return res
+        import ledger  # Not at the top: ledger imports rbc.
+        receipts = ledger.get_ledger(infile, self.LEDGER_FILE)
+        self.invalid_lines = receipts.invalid_lines
+        return receipts.report()
 
     def check_mail_dir(self, mail_dir):
         """
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# File: snapshot.py
+
+"""
+Keeps snapshots (pickles) of state carried over from one command to
+the next: the traversal journal (member.py), the receipts ledger
+(ledger.py) and the compiled templates (content.py.)
+Snapshots are replaced atomically and with the permissions any
+other file written into Data/ would have.
+(The SPoT files themselves are simply parsed each time: caching
+what's parsed out of them saved too little to be worth it.)
+"""
+
+import os
+import pickle
+import hashlib
+import tempfile
+
+_umask = os.umask(0)  # There's no way to read it without setting it
+os.umask(_umask)      # so it's done once, when first imported.
+
+
+def file_hash(path):
+    """
+    Returns the sha1 hex digest of the content of <path>.
+    """
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as file_obj:
+        for chunk in iter(lambda: file_obj.read(1 << 16), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def read_pickle(path, default=None):
+    """
+    Returns what's pickled in <path> or <default> if it
+    can't be read.
+    """
+    try:
+        with open(path, 'rb') as file_obj:
+            return pickle.load(file_obj)
+    except (OSError, EOFError, pickle.UnpicklingError,
+            AttributeError, ImportError):
+        return default
+
+
+def write_pickle(obj, path):
+    """
+    Pickles <obj> into <path> (via a temporary file of its own, in
+    the same directory, so as never to leave a partially written
+    file even if several writers are at it.) It keeps the mode
+    <path> had or, if new, gets that of any newly created file.
+    Quietly gives up on OSError.
+    """
+    directory, name = os.path.split(path)
+    try:
+        file_obj = tempfile.NamedTemporaryFile(
+            dir=directory or '.', prefix=name + '.', suffix='.tmp',
+            delete=False)
+    except OSError:
+        return
+    try:
+        with file_obj:
+            pickle.dump(obj, file_obj, pickle.HIGHEST_PROTOCOL)
+        try:  # Not the temporary file's 0600.
+            mode = os.stat(path).st_mode & 0o777
+        except OSError:
+            mode = 0o666 & ~_umask
+        os.chmod(file_obj.name, mode)
+        os.replace(file_obj.name, path)
+    except OSError:
+        pass
+    finally:
+        if os.path.exists(file_obj.name):  # Not replaced.
+            os.remove(file_obj.name)
+
+
+if __name__ == "__main__":
+    print("snapshot.py compiles OK.")
@@ -15,27 +15,31 @@ Consult the README file for further info.
 
 Usage:
   ./utils.py [ ? | --help | --version]
-  ./utils.py ck_data [-O -d -i <infile> -A <app_spot> -S <sponsors_spot> -X <fees_spot> -C <contacts_spot> -o <outfile>]
+  ./utils.py ck_data [-O -d -I -i <infile> -A <app_spot> -S <sponsors_spot> -X <fees_spot> -C <contacts_spot> -j <json_file> -o <outfile>]
   ./utils.py show [-O -i <infile> -A <applicant_spot> -S <sponsors_spot> -o <outfile> ]
   ./utils.py names_only [-O -w <width> -i <infile> -o <outfile> ]
   ./utils.py report [-O -i <infile> -A <applicant_spot> -S <sponsors_spot> -o <outfile> ]
-  ./utils.py stati [-O -D -M -B --mode <mode> -i <infile> -A <applicant_spot> -S <sponsors_spot> -o <outfile>]
+  ./utils.py stati [-O -I -D -M -B --mode <mode> -i <infile> -A <applicant_spot> -S <sponsors_spot> -o <outfile>]
   ./utils.py zeros [-O -i <infile> -o <outfile]
   ./utils.py usps [-O -i <infile> -o <outfile>]
+  ./utils.py batch [-O -T -D -M -B --parallel --mode <mode> -w <width> -i <infile> -A <applicant_spot> -S <sponsors_spot> -o <outfile>] REPORTS...
   ./utils.py extra_charges [-O -w <width> -f <format> -i <infile> -o <outfile> -j <jsonfile>]
-  ./utils.py payables [-O -T -w <width> -i <infile> -o <outfile>]
+  ./utils.py payables [-O -I -T -w <width> -i <infile> -o <outfile>]
   ./utils.py show_mailing_categories [-O -T -w <width> -o <outfile>]
-  ./utils.py prepare_mailing --which <letter> [-O --oo -p <printer> -i <infile> -j <json_file> --dir <mail_dir> --cc <cc> --bcc <bcc> ATTACHMENTS...]
-  ./utils.py thank [-t <2thank> -O -p <printer> -i <infile> -j <json_file> --dir <mail_dir> -o <temp_membership_file> -e <error_file>]
+  ./utils.py prepare_mailing --which <letter> [-O --oo -p <printer> -i <infile> -j <json_file> --dir <mail_dir> --spool <spool_file> --cc <cc> --bcc <bcc> ATTACHMENTS...]
+  ./utils.py thank [-t <2thank> -O -p <printer> -i <infile> -j <json_file> --dir <mail_dir> --spool <spool_file> -o <temp_membership_file> -e <error_file>]
   ./utils.py display_emails [-O] -j <json_file> [-o <txt_file>]
   ./utils.py send_emails [-O --mta <mta> --emailer <emailer>] -j <json_file>
   ./utils.py print_letters --dir <mail_dir> [-O --separator <separator> -o outfile]
+  ./utils.py reprint --spool <spool_file> [-O -o <outfile>] NAMES...
   ./utils.py emailing [-O -i <infile> -F <muttrc>] --subject <subject> -c <content> [ATTACHMENTS...]
   ./utils.py restore_fees [-O -i <membership_file> -X <fees_spot> -o <temp_membership_file> -e <error_file>]
   ./utils.py fee_intake_totals [-O -i <infile> -o <outfile> -e <error_file>]
   ./utils.py (labels | envelopes) [-O -i <infile> -P <params> -o <outfile> -x <file>]
   ./utils.py wip [-O -o 2check]
   ./utils.py new_db -F function [-O -i <membership_file> -o <new_membership_file> -e <error_file>]
+  ./utils.py sql_import [-O -i <infile> -A <app_spot> -S <sponsors_spot> -X <fees_spot> --db <db_file>]
+  ./utils.py sql_export [-O --db <db_file> -o <outfile>]
 
 Options:
   -h --help  Print this docstring. Best piped through pager.
@@ -45,6 +49,8 @@ Options:
   --cc <cc>   Comma separated listing of cc recipients
   -c <content>  The name of a file containing the body of an email.
   -C <contacts_spot>  Contacts data file.
+  --db <db_file>  SQLite data base (see database.py.)
+                                    [default: Data/memlist.db]
   -d   Include details: fee inconsistency for ck_data,
   --dir <mail_dir>  The directory (to be created and/or read)
                     containing letters for batch printing.
@@ -59,6 +65,9 @@ Options:
             'listings' side by side lists (best use landscape mode.)
         [default: table]
   -F <function>  Name of function to apply. (new_db command)
+  -I  Incremental: only records added or changed since the last
+        such run are processed. (ck_data, stati and payables; only
+        traversals using member.INCREMENTAL_FUNCS are affected.)
   -i <infile>  Specify file used as input. Usually defaults to
                 the MEMBERSHIP_SPoT attribute of the Club class.
   -D   include demographic data  } These pertain
@@ -81,6 +90,8 @@ Options:
                 the name of a file. [default: stdout]
   --oo   Owing_Only: Only consider members with dues/fees outstanding.
             (Sets owing_only attribute of instance of Club.)
+  --parallel  Split the traversal of the batch command among
+            processes (one per cpu.) Only its reports are batchable.
   -P <params>  This option will probably be redacted since old
             methods of mailing are no longer used.
             Defaults are A5160 for labels & E000 for envelopes.
@@ -90,6 +101,8 @@ Options:
             member.SEPARATOR.
   -S <sponsor_SPoL>  Specify file from which to retrieve sponsors.
   --separator <separator>  A string. [default: \f]
+  --spool <spool_file>  Put all letters into this one file (separated
+            by form feeds) rather than one file each into <mail_dir>.
   --subject <subject>  The subject line of an email.
   -t <2thank>  A csv file in same format as memlist.csv showing
             recent payments.  Input for thank_cmd.
@@ -111,6 +124,8 @@ Commands:
         contacts list. Options:
         | -d  Include fee inconsistencies (which are expected
         when some have paid.)
+        | -j <json_file>  Also write the fee discrepancies (as
+        keyed diffs) to <json_file>.
     show: Returns membership demographics a copy of which can then
         be sent to the web master for display on the web site.
     names_only: Returns a listing of members and applicants- names
@@ -128,6 +143,11 @@ Commands:
         members without an email address who therefore receive Club
         minutes by post. Also includes any one with a 'be' or an 's'
         status (... a mechanism for sending a copy to the secretary.)
+    batch: Prepares each of the REPORTS listed (any of report, stati,
+        payables, zeros and usps) from a single pass through the
+        membership data base. Output of the various reports is
+        separated by form feeds. Options are those of the individual
+        commands.
     extra_charges: Reports on members paying extra charges (for
         kayak storage, mooring &/or dock usage.)
         | -f <format>  -specify listing, listings or table format.
@@ -152,8 +172,14 @@ Commands:
         to all members (including those with credit or 0 balance.
         '-p <printer>' specifies printer to be used for letters.
         '-i <infile>' membership data csv file.
-        '-j <json_file>' where to dump prepared emails.
+        '-j <json_file>' where to dump prepared emails: one json
+        object per line (JSONL, written as each is prepared) with
+        the email template kept only once and, for each email, the
+        values needed to render it; unless the name ends in '.json'
+        (a json array of complete emails, as it used to be.)
         '--dir <mail_dir>' where to file letters.
+        '--spool <spool_file>' put the letters into one file instead
+        (print it with $ lpr <spool_file>; see reprint.)
     thank:  Reads the file specified by -t <thank>, applies payments
         specified there in to the -i <infile> and prepares thank you
         letter/email acknowledging receipt of payment and showing
@@ -161,6 +187,7 @@ Commands:
         details.
     display_emails: Provides an opportunity to proof read the emails.
     send_emails: Sends out the emails found in the -j <json_file>.
+        It (and display_emails) reads either format.
         Each mta has its own security requirements and each emailer
         has its own way of implementing them. Check the
         Notes/emailREADME for details.  Note that not all
@@ -170,6 +197,9 @@ Commands:
     print_letters: Sends the files contained in the directory
         specified by the --dir parameter.  Depricated in favour of
         simply using the lpr utility: $ lpr ./Data/MailDir/*
+    reprint: Sends (to -o <outfile>) the letters spooled by
+        prepare_mailing/thank's --spool option for each of the
+        NAMES (Last_First, as the letters in <mail_dir> are named.)
     restore_fees: Use this command to populate each member's record
         with what they will owe for the next club year. Respects any
         existing credits. Best done after all dues and fees have been
@@ -190,12 +220,20 @@ Commands:
     labels: print labels.       | default: -P A5160  | Both
     envelopes: print envelopes. | default: -P E000   | redacted.
     wip: "work in progress" Used for development/testing.
+    sql_import: Imports the membership data base (and the applicant,
+        sponsor and extra fees SPoTs) into the --db <db_file> SQLite
+        data base which can then be specified (-i) in place of the
+        membership csv file.
+    sql_export: Writes the membership data in the --db <db_file>
+        back out in csv format: to -o <outfile> if specified,
+        otherwise to stdout. (Confirmation is asked for before
+        the membership SPoT is overwritten.)
 """
 
 import os
 import shutil
-import csv
 import codecs
+import copy
 import sys
 import time
 import random
@@ -207,6 +245,9 @@ import member
 import helpers
 import content
 import data
+import database
+import money
+import pipeline
 import Pymail.send
 import Bashmail.send
 from rbc import Club
@@ -315,6 +356,31 @@ def output(data, destination=args["-o"], announce_write=True):
                 print('Data written to "{}".'.format(fileobj.name))
 
 
+def output_lines(lines, destination=args["-o"], announce_write=True):
+    """
+    As output('\n'.join(<lines>)) but <lines> (an iterable of lines
+    without their line feeds) are written out as they come rather
+    than all at once.
+    """
+    if destination == 'stdout':
+        for line in lines:
+            print(line)
+        return
+    file_name = TEMP_FILE if destination == 'printer' else destination
+    with open(file_name, "w") as fileobj:
+        separator = ''
+        for line in lines:
+            fileobj.write(separator + line)
+            separator = '\n'
+    if destination == 'printer':
+        print('Data written to temp file "{}".'.format(file_name))
+        subprocess.run(["lpr", TEMP_FILE])
+        subprocess.run(["rm", TEMP_FILE])
+        print('Temp file "{}" deleted after printing.'.format(file_name))
+    elif announce_write:
+        print('Data written to "{}".'.format(file_name))
+
+
 # Medium specific classes:
 # e.g. labels, envelopes, ...
 # These classes, one for each medium, need never be instantiated.
@@ -428,9 +494,11 @@ media = dict(  # keep the classes in a dict
 def ck_data_cmd(args=args):
     print("Checking for data consistency...")
     club = Club()
+    club.incremental = args['-I']
     assign_default_files(club, args)
     confirm_file_present_and_up2date(club.CONTACTS_SPoT)
-    output("\n".join(data.ck_data(club, fee_details=args['-d'])))
+    output("\n".join(data.ck_data(club, fee_details=args['-d'],
+                                   json_file=args['-j'])))
 
 
 def show_cmd(args=args):
@@ -440,7 +508,9 @@ def show_cmd(args=args):
     print("Preparing membership listings...")
     err_code = member.traverse_records(
         club.infile,
-        [member.add2lists, ],
+        [member.add2lists,
+         member.increment_napplicants,
+         ],
         club)
     ret = ["""FOR MEMBER USE ONLY
 
@@ -494,15 +564,28 @@ def names_only_cmd(args=args):
 
 
 
+# Collectors used by the commands which can also be run
+# together by the batch command (see batchable below.)
+REPORT_FUNCS = (member.add2lists,
+                member.add2ms_by_status,
+                member.increment_napplicants,
+                )
+STATI_FUNCS = (member.add2stati_by_m,
+               member.add2demographics,
+               member.add2ms_by_status,
+               member.increment_napplicants,
+               )
+ZEROS_FUNCS = (member.get_zeros_and_nulls, )
+USPS_FUNCS = (member.get_usps,
+              member.get_secretary,
+              member.get_bad_emails,
+              )
+PAYABLES_FUNCS = (member.get_payables, )
+
+
 def collect_stati_data(club):
     err_code = member.traverse_records(
-        club.infile,
-        [member.add2stati_by_m,
-         member.add2demographics,
-         member.add2ms_by_status,
-         member.increment_napplicants,
-         ],
-        club)
+        club.infile, STATI_FUNCS, club)
 
 
 def assign_applicant_files(club):
@@ -542,6 +625,8 @@ def setup4stati(club):
     if club.include_dates:
         club.meeting_dates = data.get_meeting_dates(
                                     club.applicant_spot)
+        club.stalled_applicants = set(data.get_applicant_timeline(
+                                    club.applicant_spot).stalled())
 
 
 def show_stati(club):
@@ -553,6 +638,7 @@ def show_stati(club):
         +/- napplicants
         +/- demographics
         +/- meeting_dates
+        +/- stalled_applicants
         +/- sponsors
         +/- special_notices_by_m
     See client: stati_cmd() (+/- show_cmd and others?)
@@ -596,6 +682,8 @@ def show_stati(club):
                                    format(club.meeting_dates[applicant]))
                     # else:
                     #     ret.append('\tNo meetings yet.')
+                if applicant in getattr(club, 'stalled_applicants', ()):
+                    ret.append('\tNothing recorded for over six months.')
                 if hasattr(club, 'sponsors'):
                     ret.append('\tSponsors: {}'.
                                format(club.sponsors[applicant]))
@@ -624,11 +712,17 @@ def report_cmd(args=args):
     club.for_web = False
     print("Preparing Membership Report ...")
     err_code = member.traverse_records(
-        club.infile,
-        [member.add2lists,
-         member.add2ms_by_status,
-        ],
-        club)
+        club.infile, REPORT_FUNCS, club)
+    output(membership_report(club))
+    print("...results sent to {}.".format(args['-o']))
+
+
+def membership_report(club):
+    """
+    Returns the 'Membership Report' as a string.
+    Assumes <club> has been through a traversal including
+    the REPORT_FUNCS (with club.for_web set to False.)
+    """
     report = []
     helpers.add_header2list("Membership Report (prepared {})"
                             .format(helpers.date),
@@ -647,6 +741,13 @@ def report_cmd(args=args):
         club.meeting_dates = data.get_meeting_dates(
                                     club.applicant_spot)
         report.extend(member.show_by_status(club.by_n_meetings, club=club))
+        stalled = data.get_applicant_timeline(club.applicant_spot).stalled()
+        if stalled:
+            report.append('')
+            helpers.add_header2list(
+                "Applicants with nothing recorded for over six months",
+                report, underline_char='-')
+            report.extend(stalled)
     if 'r' in club.ms_by_status:
         header = ('Members ({} in number) retiring from the Club:'
                   .format(len(club.ms_by_status['r'])))
@@ -697,16 +798,25 @@ next (July 1, 2021-June 30, 2022) membership year.
         ['',
          'PS Zoom ID: 527 109 8273; Password: 999620',
         ])
-    output("\n".join(report))
-    print("...results sent to {}.".format(args['-o']))
+    return "\n".join(report)
 
 
 def stati_cmd(args=args):
     club = Club()
+    club.incremental = args['-I']
     collect_stati_data(club)
+    output(stati_report(club))
+
+
+def stati_report(club):
+    """
+    Returns the 'Stati' report as a string.
+    Assumes <club> has been through a traversal
+    including the STATI_FUNCS.
+    """
     setup4stati(club)
     print("Preparing 'Stati' Report ...")
-    output('\n'.join(show_stati(club)))
+    return '\n'.join(show_stati(club))
 
 
 def zeros_cmd(args=args):
@@ -717,15 +827,23 @@ def zeros_cmd(args=args):
     if not infile:
         infile = Club.MEMBERSHIP_SPoT
     club = Club()
-    err_code = member.traverse_records(
-        infile, [member.get_zeros_and_nulls, ], club)
+    club.zeros, club.nulls = money.get_zeros_and_nulls(
+        money.load_columns(infile))
+    output(zeros_report(club))
+
+
+def zeros_report(club):
+    """
+    Assumes <club> has been through a traversal
+    including the ZEROS_FUNCS.
+    """
     res = ["Nulls:",
            "======", ]
     res.extend(club.nulls)
     res.extend(["\nZeros:",
                "======", ])
     res.extend(club.zeros)
-    output('\n'.join(res))
+    return '\n'.join(res)
 
 
 def usps_cmd(args=args):
@@ -739,11 +857,15 @@ def usps_cmd(args=args):
         infile = Club.MEMBERSHIP_SPoT
     club = Club()
     club.usps_only = []
-    err_code = member.traverse_records(infile, [
-                member.get_usps,
-                member.get_secretary,
-                member.get_bad_emails,
-                ], club)
+    err_code = member.traverse_records(infile, USPS_FUNCS, club)
+    return usps_report(club)
+
+
+def usps_report(club):
+    """
+    Assumes <club> has been through a traversal
+    including the USPS_FUNCS.
+    """
     print("There are {} members without an email address."
           .format(len(club.usps_only)))
     res = []
@@ -808,12 +930,23 @@ def payables_cmd(args=args):
     if not infile:
         infile = Club.MEMBERSHIP_SPoT
     club = Club()
-    club.still_owing = []
-    club.advance_payments = []
+    club.incremental = args['-I']
+    if club.incremental:
+        err_code = member.traverse_records(infile,
+                                           PAYABLES_FUNCS,
+                                           club)
+    else:  # The columnar version (see money.py) is faster.
+        club.still_owing, club.advance_payments = money.get_payables(
+            money.load_columns(infile))
+    return payables_report(club)
+
+
+def payables_report(club):
+    """
+    Assumes <club> has been through a traversal
+    including the PAYABLES_FUNCS.
+    """
     output = []
-    err_code = member.traverse_records(infile,
-                                       member.get_payables,
-                                       club)
     if club.still_owing:
         helpers.add_header2list(
             "Members owing ({} in number)"
@@ -834,6 +967,40 @@ def payables_cmd(args=args):
     return '\n'.join(output)
 
 
+batchable = dict(  # name: (collectors, report function)
+    report=(REPORT_FUNCS, membership_report),
+    stati=(STATI_FUNCS, stati_report),
+    zeros=(ZEROS_FUNCS, zeros_report),
+    usps=(USPS_FUNCS, usps_report),
+    payables=(PAYABLES_FUNCS, payables_report),
+    )
+
+
+def batch_cmd(args=args):
+    """
+    Prepares several reports from a single traversal of the
+    membership data base: each report's collectors are run
+    (once only if shared) by member.traverse_fused.
+    Each report is given its own (shallow) copy of the club so
+    that attributes one report sets (ex. sponsors and meeting_dates
+    by membership_report) don't show up in another.
+    """
+    reports = args['REPORTS']
+    for report in reports:
+        if report not in batchable:
+            print('"{}" is not one of the batchable reports: {}'
+                  .format(report, ', '.join(sorted(batchable))))
+            sys.exit()
+    club = Club()
+    assign_default_files(club, args)
+    club.for_web = False
+    member.traverse_fused(club.infile,
+                          [batchable[report][0] for report in reports],
+                          club, parallel=args['--parallel'])
+    output(helpers.FORMFEED.join(
+        [batchable[report][1](copy.copy(club)) for report in reports]))
+
+
 def show_mailing_categories_cmd(args=args):
     """
     Needs to be rewritten to take advantage of the -T and -w <width>
@@ -860,9 +1027,11 @@ def prepare4mailing(club):
     else:
         club.which = content.content_types[args["--which"]]
     club.lpr = content.printers[args["-p"]]
-    club.email = content.prepare_email_template(club.which)
-    club.letter = content.prepare_letter_template(club.which,
-                                                  club.lpr)
+    club.email = content.compile_template(
+        content.prepare_email_template(club.which))
+    club.letter = content.compile_template(   # indented for printer
+        content.prepare_letter_template(club.which, club.lpr),
+        club.lpr["indent"])
     if not args["-i"]:
         args["-i"] = club.MEMBERSHIP_SPoT
     club.input_file_name = args['-i']
@@ -875,14 +1044,18 @@ def prepare4mailing(club):
     club.attachment = args['ATTACHMENTS']
     club.cc = args['--cc']
     club.bcc = args['--bcc']
+    club.spool_file = args['--spool']
     # *** Check that we don't overwright previous mailings:
     if club.which["e_and_or_p"] in ("both", "usps", "one_only"):
-        print("Checking for directory '{}'.".format(args["--dir"]))
-        club.check_mail_dir(club.mail_dir)
+        if club.spool_file:
+            print("Checking for file '{}'.".format(club.spool_file))
+            club.check_json_file(club.spool_file)
+        else:
+            print("Checking for directory '{}'.".format(args["--dir"]))
+            club.check_mail_dir(club.mail_dir)
     if club.which["e_and_or_p"] in ("both", "email", "one_only"):
         print("Checking for file '{}'.".format(club.json_file_name))
         club.check_json_file(club.json_file_name)
-        club.json_data = []
 
 
 def prepare_mailing_cmd(args=args):
@@ -918,6 +1091,23 @@ def setup4new_db(club):
     club.fieldnames = data.get_fieldnames(club.infile)
 
 
+def ck_names_in_membership(names, infile, source):
+    """
+    Reports any of the <names> (name keys from the file <source>)
+    not found in the membership data base <infile> along with any
+    members of the same last name. (Payments to such names would
+    otherwise quietly go uncredited.)
+    """
+    index = member.get_name_index(infile)
+    for name in sorted(names):
+        if name not in index:
+            same_last = index.with_prefix(name.split(', ')[0] + ', ')
+            print('"{}" (from {}) is not in {}{}'.format(
+                name, source, infile,
+                '; did you mean: {}?'.format(' or '.join(same_last))
+                if same_last else '.'))
+
+
 def thank_cmd(args=args):
     club = Club()
     club.thank_file = args["-t"]
@@ -928,17 +1118,19 @@ def thank_cmd(args=args):
                             club)
     # To implememnt: maintain a record of those thanked...
     club.statement_data_keys = club.statement_data.keys()
+    ck_names_in_membership(club.statement_data_keys,
+                           args['-i'] or Club.MEMBERSHIP_SPoT,
+                           club.thank_file)
     prepare4mailing(club)
     club.input_file_name = club.thank_file
     member.prepare_mailing(club)  # => thank_func,
     # Done with thanking; Must now update DB.
     setup4new_db(club)
-    dict_write(club.outfile,
-               club.fieldnames,
-               member.modify_data(club.infile,
-                                  member.credit_payment_func,
-                                  club)
-               )
+    pipeline.csv_sink(
+        pipeline.pipe(pipeline.csv_source(club.infile),
+                      pipeline.map_with(member.credit_payment_func,
+                                        club)),
+        club.outfile, club.fieldnames)
 
 
 def dict_write(f, fieldnames, iterable):
@@ -948,12 +1140,7 @@ def dict_write(f, fieldnames, iterable):
     Code writen in such a way that <iterable> could be
     a generator function. (See member.modify_data.)
     """
-    with open(f, 'w') as outfile_obj:
-        print("Opening {} for output...".format(outfile_obj.name))
-        dict_writer = csv.DictWriter(outfile_obj, fieldnames)
-        dict_writer.writeheader()
-        for record in iterable:
-            dict_writer.writerow(record)
+    pipeline.csv_sink(iterable, f, fieldnames)
 
 
 redacted = '''
@@ -982,18 +1169,17 @@ def new_db_cmd():
 
 
 def display_emails_cmd(args=args):
-    records = helpers.get_json(args['-j'], report=True)
-    all_emails = []
+    """
+    A generator: yields the lines of the emails in the -j <json_file>
+    (JSONL or json array) as they are read (see output_lines.)
+    """
     n_emails = 0
-    for record in records:
-        email = []
+    for record in pipeline.email_source(args['-j']):
         for field in record:
-            email.append("{}: {}".format(field, record[field]))
-        email.append('')
-        all_emails.extend(email)
+            yield "{}: {}".format(field, record[field])
+        yield ''
         n_emails += 1
     print("Processed {} emails...".format(n_emails))
-    return "\n".join(all_emails)
 
 
 def ck_lesssecureapps_setting():
@@ -1032,8 +1218,9 @@ def send_emails_cmd(args=args):
         sys.exit(1)
     wait = mta.endswith('g')
     message = None
-    data = helpers.get_json(args['-j'], report=True)
-    emailer(data, mta, include_wait=wait)
+    n_emails = pipeline.send_sink(pipeline.email_source(args['-j']),
+                                  emailer, mta, include_wait=wait)
+    print("{} emails processed.".format(n_emails))
 
 
 def print_letters_cmd(args=args):
@@ -1066,6 +1253,20 @@ def print_letters_cmd(args=args):
     output(report)
 
 
+def reprint_cmd(args=args):
+    """
+    Retrieves (by name) letters from a spool file (see
+    pipeline.LetterSpool) for reprinting.
+    """
+    try:
+        letters = [letter for name, letter in
+                   pipeline.read_spool(args['--spool'], args['NAMES'])]
+    except KeyError as err:
+        print("No letter spooled for {}.".format(err))
+        sys.exit(1)
+    output(helpers.FORMFEED.join(letters))
+
+
 def emailing_cmd(args=args):
     """
     Uses mutt (in member.send_attachment.)
@@ -1102,8 +1303,7 @@ def restore_fees_cmd(args=args):
     # ## Take into consideration the possibility of credit values. ###
     club = Club()
     setup4new_db(club)
-    data.restore_fees(club)  # Populates club.new_db & club.errors
-    data.save_db(club.new_db, club.outfile, club.fieldnames)
+    data.restore_fees(club)  # Writes club.outfile; populates club.errors
     if club.errors:
         output('\n'.join(
                ['Note the following irregularities:',
@@ -1231,6 +1431,44 @@ def mutt_send(recipient, subject, body, attachments=None):
             p.stdout, recipient))
 
 
+def sql_import_cmd(args=args):
+    """
+    Imports the SPoTs into the SQLite data base (see database.py.)
+    """
+    club = Club()
+    assign_default_files(club, args)
+    db_file = args['--db']
+    database.import_csv(club.infile, db_file)
+    database.import_spot(db_file, 'applicants', club.applicant_spot,
+                         data.get_applicant_data(club.applicant_spot))
+    database.import_spot(db_file, 'sponsors', club.sponsor_spot,
+                         data.get_sponsor_data(club.sponsor_spot))
+    database.import_spot(db_file, 'extra_fees', club.extra_fees_spot,
+                         data.gather_extra_fees_data(
+                             club.extra_fees_spot))
+
+
+def sql_export_cmd(args=args):
+    """
+    Exports the membership data from the SQLite data base to
+    -o <outfile> (stdout by default.) Asks before overwriting the
+    membership SPoT.
+    """
+    outfile = args['-o']
+    if outfile == 'stdout':
+        database.write_csv(args['--db'], sys.stdout)
+        return
+    if (os.path.exists(outfile)
+            and os.path.exists(Club.MEMBERSHIP_SPoT)
+            and os.path.samefile(outfile, Club.MEMBERSHIP_SPoT)):
+        response = input('Overwrite the membership SPoT "{}"? '
+                         .format(outfile))
+        if not (response and response[0] in "Yy"):
+            print("Nothing exported.")
+            sys.exit()
+    database.export_csv(args['--db'], outfile)
+
+
 if __name__ == "__main__":
     #   print(args)
 
@@ -1260,6 +1498,9 @@ if __name__ == "__main__":
         print("receive meeting minutes by mail. i.e. don't have (or")
         print("haven't provided) an email address (to the Club.)")
         output(usps_cmd())
+    elif args["batch"]:
+        print("Preparing reports: {}".format(', '.join(args['REPORTS'])))
+        batch_cmd()
     elif args["extra_charges"]:
         print("Selecting members with extra charges:")
         extra_charges_cmd()
@@ -1277,7 +1518,7 @@ if __name__ == "__main__":
         thank_cmd()
 #       print("...finished preparing thank you emails and/or letters.")
     elif args['display_emails']:
-        output(display_emails_cmd())
+        output_lines(display_emails_cmd())
     elif args["send_emails"]:
         print("Sending emails...")
         send_emails_cmd()
@@ -1286,6 +1527,8 @@ if __name__ == "__main__":
         print("Printing letters ...")
         print_letters_cmd()
         print("Done printing letters.")
+    elif args["reprint"]:
+        reprint_cmd()
     elif args['emailing']:
         emailing_cmd()
     elif args['restore_fees']:
@@ -1311,6 +1554,10 @@ if __name__ == "__main__":
     elif args["new_db"]:
         print("Creating a modified data base...")
         new_db_cmd()
+    elif args["sql_import"]:
+        sql_import_cmd()
+    elif args["sql_export"]:
+        sql_export_cmd()
     else:
         print("You've failed to select a command.")
         print("Try ./utils.py ?           # brief!  or ...")